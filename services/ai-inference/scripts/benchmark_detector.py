@@ -0,0 +1,266 @@
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from itertools import product
+from pathlib import Path
+
+import numpy as np
+import structlog
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from config import settings
+from detector import Detector, QUANTIZED_SUFFIX
+
+structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+
+def backend_for(model_path: str) -> tuple:
+    if model_path.endswith('.onnx'):
+        precision = "int8" if Path(model_path).stem.endswith(QUANTIZED_SUFFIX) else "fp32"
+        return "onnx", f"onnx-{precision}"
+    return "pytorch", "pytorch"
+
+
+def default_models(model_path: str) -> list:
+    base = Path(model_path).with_suffix('')
+    onnx_fp32 = Path(f"{base}_dynamic.onnx")
+    if not onnx_fp32.exists():
+        onnx_fp32 = base.with_suffix('.onnx')
+    return [str(base.with_suffix('.pt')), str(onnx_fp32), f"{base}{QUANTIZED_SUFFIX}.onnx"]
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+
+def load_frame(image: str = None, width: int = 1280, height: int = 720) -> np.ndarray:
+    if image:
+        import cv2
+        
+        frame = cv2.imread(image)
+        if frame is None:
+            raise FileNotFoundError(f"Could not read image {image}")
+        return frame
+    return np.random.default_rng(0).integers(0, 255, (height, width, 3), dtype=np.uint8)
+
+
+def run_config(config: dict) -> dict:
+    batch = config['batch']
+    settings.BATCH_MAX_SIZE = max(batch, 1)
+    
+    if config['backend'] == "pytorch" and config['threads'] > 0:
+        try:
+            import torch
+            torch.set_num_threads(config['threads'])
+        except ImportError:
+            pass
+    
+    detector = Detector(
+        model_path=config['model'],
+        backend=config['backend'],
+        intra_op_threads=config['threads'],
+        input_size=config['imgsz']
+    )
+    if detector.input_size != config['imgsz']:
+        return {**config, 'skipped': f"model input is fixed at {detector.input_size}"}
+    
+    frames = [load_frame(config['image'])] * batch
+    if batch == 1:
+        def run():
+            return detector.detect(frames[0])
+    else:
+        def run():
+            return detector.detect_batch(frames)
+    
+    for _ in range(config['warmup']):
+        run()
+    
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(config['iterations']):
+        t = time.perf_counter()
+        run()
+        latencies.append((time.perf_counter() - t) * 1000)
+    elapsed = time.perf_counter() - start
+    
+    latencies = np.array(latencies)
+    return {
+        **config,
+        'batched': detector.supports_batching,
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p95_ms': float(np.percentile(latencies, 95)),
+        'p99_ms': float(np.percentile(latencies, 99)),
+        'mean_ms': float(latencies.mean()),
+        'fps': batch * config['iterations'] / elapsed,
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+
+def run_metadata() -> dict:
+    def git(*args) -> str:
+        try:
+            return subprocess.run(
+                ["git", *args],
+                cwd=Path(__file__).resolve().parent,
+                capture_output=True,
+                text=True,
+                check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return ""
+    
+    versions = {}
+    for module in ("onnxruntime", "torch", "ultralytics", "numpy"):
+        try:
+            versions[module] = __import__(module).__version__
+        except ImportError:
+            pass
+    
+    return {
+        'commit': git("rev-parse", "--short", "HEAD"),
+        'dirty': bool(git("status", "--porcelain", "--untracked-files=no")),
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'host': platform.node(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+        'versions': versions
+    }
+
+
+def result_key(result: dict) -> tuple:
+    return (Path(result['model']).name, result['batch'], result['imgsz'], result['threads'])
+
+
+def compare(results: list, baseline_path: str):
+    with open(baseline_path, 'r') as f:
+        baseline = json.load(f)
+    previous = {result_key(r): r for r in baseline['results'] if 'p50_ms' in r}
+    
+    print(f"\nCompared with {baseline_path} (commit {baseline['meta'].get('commit') or 'unknown'})")
+    print("-" * 84)
+    print(f"{'backend':>10} | {'batch':>5} | {'imgsz':>5} | {'threads':>7} | {'p50 ms':>17} | {'fps':>19}")
+    print("-" * 84)
+    for result in results:
+        old = previous.get(result_key(result))
+        if old is None or 'p50_ms' not in result:
+            continue
+        p50_delta = (result['p50_ms'] / old['p50_ms'] - 1) * 100
+        fps_delta = (result['fps'] / old['fps'] - 1) * 100
+        print(f"{result['label']:>10} | {result['batch']:>5} | {result['imgsz']:>5} | {result['threads']:>7} | "
+              f"{result['p50_ms']:>8.2f} ({p50_delta:+5.1f}%) | {result['fps']:>9.1f} ({fps_delta:+6.1f}%)")
+    print("-" * 84)
+
+
+def benchmark(
+    models: list,
+    batch_sizes: list = None,
+    resolutions: list = None,
+    threads: list = None,
+    iterations: int = 50,
+    warmup: int = 5,
+    image: str = None,
+    output: str = None,
+    baseline: str = None
+):
+    available = []
+    for model in models:
+        if Path(model).exists():
+            available.append(model)
+        else:
+            print(f"Skipping {model} (not found)")
+    
+    configs = []
+    for model, batch, imgsz, thread_count in product(
+        available, batch_sizes or [1], resolutions or [640], threads or [0]
+    ):
+        backend, label = backend_for(model)
+        configs.append({
+            'model': model,
+            'backend': backend,
+            'label': label,
+            'batch': batch,
+            'imgsz': imgsz,
+            'threads': thread_count,
+            'iterations': iterations,
+            'warmup': warmup,
+            'image': image
+        })
+    
+    print(f"\nBenchmarking {len(configs)} configurations ({iterations} iterations, warmup: {warmup})")
+    print("-" * 104)
+    print(f"{'backend':>10} | {'batch':>5} | {'imgsz':>5} | {'threads':>7} | {'p50 ms':>8} | {'p95 ms':>8} | "
+          f"{'p99 ms':>8} | {'fps':>8} | {'peak RSS MB':>11}")
+    print("-" * 104)
+    
+    context = multiprocessing.get_context("spawn")
+    results = []
+    for config in configs:
+        with context.Pool(1) as pool:
+            try:
+                result = pool.apply(run_config, (config,))
+            except Exception as e:
+                result = {**config, 'error': str(e)}
+        results.append(result)
+        
+        prefix = f"{config['label']:>10} | {config['batch']:>5} | {config['imgsz']:>5} | {config['threads']:>7} |"
+        if 'p50_ms' in result:
+            print(f"{prefix} {result['p50_ms']:>8.2f} | {result['p95_ms']:>8.2f} | {result['p99_ms']:>8.2f} | "
+                  f"{result['fps']:>8.1f} | {result['peak_rss_mb']:>11.1f}")
+        else:
+            print(f"{prefix} {result.get('skipped') or 'error: ' + result['error']}")
+    
+    print("-" * 104)
+    
+    report = {'meta': run_metadata(), 'results': results}
+    if output:
+        Path(output).parent.mkdir(parents=True, exist_ok=True)
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {output}")
+    
+    if baseline:
+        compare(results, baseline)
+    
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the Detector across backends, batch sizes, resolutions and threads")
+    parser.add_argument("--model", "-m", default="../models/best.pt",
+                        help="Base model; benchmarks its .pt, ONNX FP32 and ONNX INT8 variants")
+    parser.add_argument("--models", nargs="+", help="Explicit model files (overrides --model)")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 8], help="Batch sizes")
+    parser.add_argument("--imgsz", type=int, nargs="+", default=[640], help="Input resolutions")
+    parser.add_argument("--threads", type=int, nargs="+", default=[0],
+                        help="Intra-op threads (0 = runtime default)")
+    parser.add_argument("--iterations", type=int, default=50, help="Timed iterations per configuration")
+    parser.add_argument("--warmup", type=int, default=5, help="Warmup iterations per configuration")
+    parser.add_argument("--image", help="Test image (default: synthetic 1280x720 frame)")
+    parser.add_argument("--output", "-o", help="Write results as JSON")
+    parser.add_argument("--baseline", help="Previous JSON results to compare against")
+    
+    args = parser.parse_args()
+    
+    benchmark(
+        args.models or default_models(args.model),
+        batch_sizes=args.batch_sizes,
+        resolutions=args.imgsz,
+        threads=args.threads,
+        iterations=args.iterations,
+        warmup=args.warmup,
+        image=args.image,
+        output=args.output,
+        baseline=args.baseline
+    )
@@ -0,0 +1,119 @@
+import argparse
+import time
+import sys
+from pathlib import Path
+
+import numpy as np
+import cv2
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from nms import nms_numpy
+
+
+def make_candidates(count: int, num_classes: int = 10, imgsz: int = 640, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    
+    num_objects = max(1, count // 100)
+    centers = rng.uniform(0, imgsz, (num_objects, 2))
+    sizes = rng.uniform(20, 160, (num_objects, 2))
+    object_classes = rng.integers(0, num_classes, num_objects)
+    
+    picks = rng.integers(0, num_objects, count)
+    xy = centers[picks] + rng.normal(0, 4, (count, 2))
+    wh = sizes[picks] * rng.uniform(0.85, 1.15, (count, 2))
+    
+    boxes = np.concatenate([xy - wh / 2, xy + wh / 2], axis=1).astype(np.float32)
+    scores = rng.uniform(0.25, 1.0, count).astype(np.float32)
+    class_ids = object_classes[picks]
+    
+    return boxes, scores, class_ids
+
+
+def time_it(fn, iterations: int, warmup: int) -> np.ndarray:
+    for _ in range(warmup):
+        fn()
+    
+    times = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return np.array(times)
+
+
+def benchmark(
+    counts: list,
+    iou_threshold: float = 0.45,
+    score_threshold: float = 0.25,
+    top_k: int = 300,
+    iterations: int = 200,
+    warmup: int = 20
+):
+    print(f"\nBenchmarking NMS with {iterations} iterations (warmup: {warmup})")
+    print("-" * 78)
+    print(f"{'boxes':>7} | {'numpy class-aware':>18} | {'cv2 NMSBoxes':>14} | {'cv2 batched':>12} | {'kept':>10}")
+    print("-" * 78)
+    
+    has_batched = hasattr(cv2.dnn, "NMSBoxesBatched")
+    results = {}
+    
+    for count in counts:
+        boxes, scores, class_ids = make_candidates(count)
+        xywh = np.concatenate([boxes[:, :2], boxes[:, 2:] - boxes[:, :2]], axis=1)
+        xywh_list = xywh.tolist()
+        scores_list = scores.tolist()
+        class_list = class_ids.tolist()
+        
+        numpy_times = time_it(
+            lambda: nms_numpy(boxes, scores, class_ids, iou_threshold, top_k=top_k),
+            iterations, warmup
+        )
+        cv2_times = time_it(
+            lambda: cv2.dnn.NMSBoxes(xywh_list, scores_list, score_threshold, iou_threshold),
+            iterations, warmup
+        )
+        
+        kept_numpy = len(nms_numpy(boxes, scores, class_ids, iou_threshold, top_k=top_k))
+        
+        batched_avg = float("nan")
+        kept_cv2 = None
+        if has_batched:
+            batched_times = time_it(
+                lambda: cv2.dnn.NMSBoxesBatched(xywh_list, scores_list, class_list,
+                                               score_threshold, iou_threshold),
+                iterations, warmup
+            )
+            batched_avg = float(np.mean(batched_times))
+            kept_cv2 = len(cv2.dnn.NMSBoxesBatched(xywh_list, scores_list, class_list,
+                                                   score_threshold, iou_threshold))
+        
+        results[count] = {
+            'numpy_ms': float(np.mean(numpy_times)),
+            'cv2_ms': float(np.mean(cv2_times)),
+            'cv2_batched_ms': batched_avg,
+            'kept_numpy': kept_numpy,
+            'kept_cv2_batched': kept_cv2
+        }
+        
+        kept = f"{kept_numpy}/{kept_cv2 if kept_cv2 is not None else '-'}"
+        print(f"{count:>7} | {results[count]['numpy_ms']:>15.3f}ms | "
+              f"{results[count]['cv2_ms']:>11.3f}ms | {batched_avg:>9.3f}ms | {kept:>10}")
+    
+    print("-" * 78)
+    print("cv2 NMSBoxes is class-agnostic; the kept column compares numpy vs cv2 batched.")
+    
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark vectorized NMS against OpenCV")
+    parser.add_argument("--counts", type=int, nargs="+", default=[100, 500, 1000, 3000, 8400],
+                        help="Candidate box counts to benchmark")
+    parser.add_argument("--iou", type=float, default=0.45, help="IoU threshold")
+    parser.add_argument("--top-k", type=int, default=300, help="Maximum boxes kept")
+    parser.add_argument("--iterations", type=int, default=200, help="Benchmark iterations")
+    
+    args = parser.parse_args()
+    
+    benchmark(args.counts, iou_threshold=args.iou, top_k=args.top_k, iterations=args.iterations)
@@ -0,0 +1,612 @@
+import argparse
+import http.client
+import json
+import os
+import queue
+import signal
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC_DIR))
+sys.path.insert(0, str(SRC_DIR / "proto"))
+
+try:
+    import grpc
+    import detection_pb2
+    import detection_pb2_grpc
+    GRPC_AVAILABLE = True
+except ImportError:
+    GRPC_AVAILABLE = False
+
+try:
+    from websockets.sync.client import connect as ws_connect
+    WEBSOCKETS_AVAILABLE = True
+except ImportError:
+    WEBSOCKETS_AVAILABLE = False
+
+from benchmark_detector import run_metadata
+
+PROTOCOLS = ("rest", "grpc", "grpc-stream", "ws")
+IMAGE_SUFFIXES = {'.jpg', '.jpeg', '.png', '.bmp'}
+CLK_TCK = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+
+
+class CameraStats:
+    
+    __slots__ = ('camera_id', 'latencies', 'sent', 'completed', 'dropped', 'rejected', 'failures', 'errors')
+    
+    def __init__(self, camera_id: str):
+        self.camera_id = camera_id
+        self.latencies: List[float] = []
+        self.sent = 0
+        self.completed = 0
+        self.dropped = 0
+        self.rejected = 0
+        self.failures = 0
+        self.errors: List[str] = []
+    
+    def record(self, latency_ms: float):
+        self.completed += 1
+        self.latencies.append(latency_ms)
+    
+    def fail(self, error: str):
+        self.failures += 1
+        if len(self.errors) < 20:
+            self.errors.append(error)
+
+
+def load_frames(sources: List[str], max_frames: int = 300, width: Optional[int] = None) -> List[bytes]:
+    frames = []
+    
+    def add(frame: np.ndarray):
+        if width and frame.shape[1] != width:
+            frame = cv2.resize(frame, (width, int(frame.shape[0] * width / frame.shape[1])))
+        ok, encoded = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 90])
+        if ok:
+            frames.append(encoded.tobytes())
+    
+    for source in sources:
+        path = Path(source)
+        if path.is_dir():
+            for image in sorted(p for p in path.iterdir() if p.suffix.lower() in IMAGE_SUFFIXES):
+                if len(frames) >= max_frames:
+                    break
+                frame = cv2.imread(str(image))
+                if frame is not None:
+                    add(frame)
+        elif path.suffix.lower() in IMAGE_SUFFIXES:
+            frame = cv2.imread(str(path))
+            if frame is None:
+                raise SystemExit(f"Cannot read image: {path}")
+            add(frame)
+        else:
+            capture = cv2.VideoCapture(str(path))
+            if not capture.isOpened():
+                raise SystemExit(f"Cannot open video: {path}")
+            while len(frames) < max_frames:
+                ok, frame = capture.read()
+                if not ok:
+                    break
+                add(frame)
+            capture.release()
+    
+    if not sources:
+        rng = np.random.default_rng(0)
+        background = rng.integers(0, 255, (720, 1280, 3), dtype=np.uint8)
+        for i in range(min(max_frames, 30)):
+            frame = background.copy()
+            x = 40 * i % 1100
+            cv2.rectangle(frame, (x, 200), (x + 120, 560), (0, 200, 255), -1)
+            add(frame)
+    
+    if not frames:
+        raise SystemExit("No frames loaded from the given sources")
+    return frames
+
+
+class ProcessSampler:
+    
+    def __init__(self, pid: int, interval_s: float = 0.5):
+        self.pid = pid
+        self.interval_s = interval_s
+        self.cpu_samples: List[float] = []
+        self.peak_rss_mb = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def _cpu_seconds(self) -> float:
+        with open(f"/proc/{self.pid}/stat", 'r') as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / CLK_TCK
+    
+    def _rss_mb(self) -> float:
+        with open(f"/proc/{self.pid}/status", 'r') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+        return 0.0
+    
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True, name="pipeline-sampler")
+        self._thread.start()
+    
+    def stop(self) -> Dict:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        return {
+            'cpu_percent_mean': float(np.mean(self.cpu_samples)) if self.cpu_samples else None,
+            'cpu_percent_max': float(np.max(self.cpu_samples)) if self.cpu_samples else None,
+            'peak_rss_mb': self.peak_rss_mb or None
+        }
+    
+    def _run(self):
+        try:
+            last_cpu, last_time = self._cpu_seconds(), time.perf_counter()
+            while not self._stop.wait(self.interval_s):
+                cpu, now = self._cpu_seconds(), time.perf_counter()
+                self.cpu_samples.append((cpu - last_cpu) / (now - last_time) * 100)
+                self.peak_rss_mb = max(self.peak_rss_mb, self._rss_mb())
+                last_cpu, last_time = cpu, now
+        except OSError:
+            pass
+
+
+def paced_loop(fps: float, duration_s: float, stats: CameraStats, step: Callable[[int], None]):
+    interval = 1.0 / fps if fps > 0 else 0.0
+    start = time.perf_counter()
+    next_tick = start
+    index = 0
+    
+    while True:
+        now = time.perf_counter()
+        if now - start >= duration_s:
+            break
+        if interval:
+            if now < next_tick:
+                time.sleep(next_tick - now)
+            missed = int((time.perf_counter() - next_tick) // interval)
+            if missed > 0:
+                stats.dropped += missed
+                next_tick += missed * interval
+            next_tick += interval
+        
+        step(index)
+        index += 1
+
+
+def multipart_body(image: bytes) -> Tuple[bytes, str]:
+    boundary = uuid.uuid4().hex
+    body = (
+        f"--{boundary}\r\n"
+        f"Content-Disposition: form-data; name=\"file\"; filename=\"frame.jpg\"\r\n"
+        f"Content-Type: image/jpeg\r\n\r\n"
+    ).encode() + image + f"\r\n--{boundary}--\r\n".encode()
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+def run_rest_camera(target: str, stats: CameraStats, frames: List[bytes], offset: int, fps: float, duration_s: float):
+    host, port = target.rsplit(':', 1)
+    connection = http.client.HTTPConnection(host, int(port), timeout=30)
+    bodies = [multipart_body(frame) for frame in frames]
+    
+    def step(index: int):
+        body, content_type = bodies[(offset + index) % len(bodies)]
+        stats.sent += 1
+        start = time.perf_counter()
+        try:
+            connection.request(
+                "POST", f"/detect?camera_id={stats.camera_id}", body=body,
+                headers={"Content-Type": content_type}
+            )
+            response = connection.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException) as e:
+            stats.fail(f"{type(e).__name__}: {e}")
+            connection.close()
+            return
+        if response.status == 200:
+            stats.record((time.perf_counter() - start) * 1000)
+        elif response.status in (429, 503):
+            stats.rejected += 1
+        else:
+            stats.fail(f"HTTP {response.status}")
+    
+    try:
+        paced_loop(fps, duration_s, stats, step)
+    finally:
+        connection.close()
+
+
+def run_grpc_camera(channel, stats: CameraStats, frames: List[bytes], offset: int, fps: float, duration_s: float):
+    stub = detection_pb2_grpc.DetectionServiceStub(channel)
+    
+    def step(index: int):
+        request = detection_pb2.DetectRequest(
+            image_data=frames[(offset + index) % len(frames)],
+            camera_id=stats.camera_id
+        )
+        stats.sent += 1
+        start = time.perf_counter()
+        try:
+            response = stub.Detect(request, timeout=30)
+        except grpc.RpcError as e:
+            if e.code() == grpc.StatusCode.RESOURCE_EXHAUSTED:
+                stats.rejected += 1
+            else:
+                stats.fail(f"{e.code().name}: {e.details()}")
+            return
+        if response.error:
+            stats.fail(response.error)
+        else:
+            stats.record((time.perf_counter() - start) * 1000)
+    
+    paced_loop(fps, duration_s, stats, step)
+
+
+def run_grpc_stream_camera(
+    channel,
+    stats: CameraStats,
+    frames: List[bytes],
+    offset: int,
+    fps: float,
+    duration_s: float,
+    inflight: int = 1
+):
+    stub = detection_pb2_grpc.DetectionServiceStub(channel)
+    slots = threading.Semaphore(max(1, inflight))
+    sent_at: Dict[int, float] = {}
+    
+    outgoing: queue.Queue = queue.Queue()
+    
+    def step(index: int):
+        if not slots.acquire(blocking=fps <= 0):
+            stats.dropped += 1
+            return
+        sequence = index + 1
+        sent_at[sequence] = time.perf_counter()
+        stats.sent += 1
+        outgoing.put(detection_pb2.StreamFrame(
+            camera_id=stats.camera_id,
+            sequence=sequence,
+            image_data=frames[(offset + index) % len(frames)]
+        ))
+    
+    def produce():
+        paced_loop(fps, duration_s, stats, step)
+        outgoing.put(None)
+    
+    def requests():
+        while True:
+            item = outgoing.get()
+            if item is None:
+                return
+            yield item
+    
+    threading.Thread(target=produce, daemon=True).start()
+    try:
+        for response in stub.DetectStream(requests(), timeout=duration_s + 30):
+            start = sent_at.pop(response.sequence, None)
+            slots.release()
+            if response.error:
+                stats.fail(response.error)
+            elif start is not None:
+                stats.record((time.perf_counter() - start) * 1000)
+    except grpc.RpcError as e:
+        stats.fail(f"{e.code().name}: {e.details()}")
+
+
+def run_ws_camera(target: str, stats: CameraStats, frames: List[bytes], offset: int, fps: float, duration_s: float):
+    with ws_connect(f"ws://{target}/ws/{stats.camera_id}", max_size=None, open_timeout=10) as socket:
+        def step(index: int):
+            stats.sent += 1
+            start = time.perf_counter()
+            socket.send(frames[(offset + index) % len(frames)])
+            try:
+                message = json.loads(socket.recv(timeout=30))
+            except TimeoutError:
+                stats.fail("timeout")
+                return
+            if message.get("type") == "error":
+                if message.get("retry"):
+                    stats.rejected += 1
+                else:
+                    stats.fail(message.get("error", "error"))
+            else:
+                stats.record((time.perf_counter() - start) * 1000)
+        
+        paced_loop(fps, duration_s, stats, step)
+
+
+def fmt(value, spec: str) -> str:
+    if value is None:
+        return "-".rjust(int(spec.lstrip('>').split('.')[0]))
+    return format(value, spec)
+
+
+def summarize(protocol: str, cameras: List[CameraStats], elapsed: float, fps: float, server: Dict) -> Dict:
+    latencies = np.array([latency for c in cameras for latency in c.latencies]) if any(c.latencies for c in cameras) else None
+    per_camera_fps = [c.completed / elapsed for c in cameras]
+    ticks = sum(c.sent + c.dropped for c in cameras)
+    failed = sum(c.dropped + c.rejected + c.failures for c in cameras)
+    
+    def pct(q: float) -> Optional[float]:
+        return float(np.percentile(latencies, q)) if latencies is not None else None
+    
+    return {
+        'protocol': protocol,
+        'cameras': len(cameras),
+        'target_fps': fps,
+        'duration_s': round(elapsed, 3),
+        'completed': sum(c.completed for c in cameras),
+        'sent': sum(c.sent for c in cameras),
+        'dropped': sum(c.dropped for c in cameras),
+        'rejected': sum(c.rejected for c in cameras),
+        'errors': sum(c.failures for c in cameras),
+        'drop_rate': failed / ticks if ticks else 0.0,
+        'fps_per_camera_mean': float(np.mean(per_camera_fps)),
+        'fps_per_camera_min': float(np.min(per_camera_fps)),
+        'fps_total': sum(per_camera_fps),
+        'p50_ms': pct(50),
+        'p95_ms': pct(95),
+        'p99_ms': pct(99),
+        'max_ms': float(latencies.max()) if latencies is not None else None,
+        'server': server,
+        'per_camera': [
+            {
+                'camera_id': c.camera_id,
+                'fps': c.completed / elapsed,
+                'completed': c.completed,
+                'dropped': c.dropped,
+                'rejected': c.rejected,
+                'failures': c.failures,
+                'p95_ms': float(np.percentile(c.latencies, 95)) if c.latencies else None,
+                'errors': c.errors
+            }
+            for c in cameras
+        ]
+    }
+
+
+def run_protocol(
+    protocol: str,
+    frames: List[bytes],
+    cameras: int,
+    fps: float,
+    duration_s: float,
+    rest_target: str,
+    grpc_target: str,
+    inflight: int = 1,
+    pid: Optional[int] = None
+) -> Dict:
+    if protocol.startswith("grpc") and not GRPC_AVAILABLE:
+        raise SystemExit("grpcio and generated stubs are required for gRPC protocols")
+    if protocol == "ws" and not WEBSOCKETS_AVAILABLE:
+        raise SystemExit("websockets is required for the ws protocol")
+    
+    channel = None
+    if protocol.startswith("grpc"):
+        channel = grpc.insecure_channel(grpc_target, options=[
+            ('grpc.max_send_message_length', 32 * 1024 * 1024),
+            ('grpc.max_receive_message_length', 32 * 1024 * 1024)
+        ])
+        grpc.channel_ready_future(channel).result(timeout=10)
+    
+    run_id = uuid.uuid4().hex[:6]
+    stats = [CameraStats(f"bench-{protocol}-{run_id}-{i}") for i in range(cameras)]
+    offsets = [i * len(frames) // cameras for i in range(cameras)]
+    
+    def client(camera: CameraStats, offset: int):
+        try:
+            if protocol == "rest":
+                run_rest_camera(rest_target, camera, frames, offset, fps, duration_s)
+            elif protocol == "grpc":
+                run_grpc_camera(channel, camera, frames, offset, fps, duration_s)
+            elif protocol == "grpc-stream":
+                run_grpc_stream_camera(channel, camera, frames, offset, fps, duration_s, inflight)
+            else:
+                run_ws_camera(rest_target, camera, frames, offset, fps, duration_s)
+        except Exception as e:
+            camera.fail(f"{type(e).__name__}: {e}")
+    
+    sampler = ProcessSampler(pid) if pid else None
+    if sampler:
+        sampler.start()
+    
+    threads = [
+        threading.Thread(target=client, args=(camera, offset), daemon=True)
+        for camera, offset in zip(stats, offsets)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    
+    server = sampler.stop() if sampler else {}
+    if channel is not None:
+        channel.close()
+    
+    cleanup_cameras(rest_target, [c.camera_id for c in stats])
+    return summarize(protocol, stats, elapsed, fps, server)
+
+
+def cleanup_cameras(rest_target: str, camera_ids: List[str]):
+    host, port = rest_target.rsplit(':', 1)
+    for camera_id in camera_ids:
+        try:
+            connection = http.client.HTTPConnection(host, int(port), timeout=5)
+            connection.request("DELETE", f"/cameras/{camera_id}")
+            connection.getresponse().read()
+            connection.close()
+        except (OSError, http.client.HTTPException):
+            pass
+
+
+def wait_for_health(rest_target: str, timeout_s: float = 60.0, process: Optional[subprocess.Popen] = None):
+    host, port = rest_target.rsplit(':', 1)
+    deadline = time.time() + timeout_s
+    while time.time() < deadline:
+        if process is not None and process.poll() is not None:
+            raise SystemExit(f"Server exited with code {process.returncode}")
+        try:
+            connection = http.client.HTTPConnection(host, int(port), timeout=2)
+            connection.request("GET", "/health")
+            response = connection.getresponse()
+            body = json.loads(response.read())
+            connection.close()
+            if response.status == 200 and body.get('model_loaded'):
+                return body
+        except (OSError, http.client.HTTPException, ValueError):
+            pass
+        time.sleep(0.5)
+    raise SystemExit(f"Server at {rest_target} did not become healthy within {timeout_s:.0f}s")
+
+
+def launch_server(rest_port: int, grpc_port: int, env: Dict[str, str], log_path: Optional[str]) -> subprocess.Popen:
+    server_env = dict(os.environ, REST_PORT=str(rest_port), GRPC_PORT=str(grpc_port), **env)
+    log = open(log_path, 'w') if log_path else subprocess.DEVNULL
+    return subprocess.Popen(
+        [sys.executable, "main.py"],
+        cwd=str(SRC_DIR),
+        env=server_env,
+        stdout=log,
+        stderr=subprocess.STDOUT
+    )
+
+
+def stop_server(process: subprocess.Popen):
+    process.send_signal(signal.SIGINT)
+    try:
+        process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def compare(results: List[Dict], baseline_path: str, max_regression: Optional[float]) -> bool:
+    with open(baseline_path, 'r') as f:
+        baseline = json.load(f)
+    previous = {(r['protocol'], r['cameras'], r['target_fps']): r for r in baseline['results']}
+    
+    regressed = False
+    print(f"\nCompared with {baseline_path} (commit {baseline['meta'].get('commit') or 'unknown'})")
+    print("-" * 78)
+    print(f"{'protocol':>11} | {'cams':>4} | {'p95 ms':>18} | {'fps/camera':>18} | {'drop rate':>9}")
+    print("-" * 78)
+    for result in results:
+        old = previous.get((result['protocol'], result['cameras'], result['target_fps']))
+        if old is None or result['p95_ms'] is None or not old.get('p95_ms'):
+            continue
+        p95_delta = (result['p95_ms'] / old['p95_ms'] - 1) * 100
+        fps_delta = (result['fps_per_camera_mean'] / old['fps_per_camera_mean'] - 1) * 100
+        flag = ""
+        if max_regression is not None and (p95_delta > max_regression or fps_delta < -max_regression):
+            regressed = True
+            flag = "  REGRESSION"
+        print(f"{result['protocol']:>11} | {result['cameras']:>4} | {result['p95_ms']:>8.1f} ({p95_delta:+6.1f}%) | "
+              f"{result['fps_per_camera_mean']:>8.1f} ({fps_delta:+6.1f}%) | {result['drop_rate']:>8.1%}{flag}")
+    print("-" * 78)
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded video as simulated cameras against the running service")
+    parser.add_argument("sources", nargs="*", help="Video files, image files or image directories (synthetic if omitted)")
+    parser.add_argument("--protocols", nargs="+", choices=PROTOCOLS, default=["rest", "grpc"])
+    parser.add_argument("--cameras", type=int, nargs="+", default=[1, 4], help="Simulated camera counts")
+    parser.add_argument("--fps", type=float, default=5.0, help="Target FPS per camera (0 = as fast as possible)")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per run")
+    parser.add_argument("--inflight", type=int, default=1, help="Frames in flight per camera (grpc-stream)")
+    parser.add_argument("--max-frames", type=int, default=300, help="Frames loaded from the sources")
+    parser.add_argument("--width", type=int, help="Resize frames to this width before encoding")
+    parser.add_argument("--rest", default="localhost:8000", help="REST host:port")
+    parser.add_argument("--grpc", default="localhost:50051", help="gRPC host:port")
+    parser.add_argument("--pid", type=int, help="Server PID to sample CPU/RSS from (Linux)")
+    parser.add_argument("--launch", action="store_true", help="Start src/main.py for the run")
+    parser.add_argument("--stub", action="store_true", help="With --launch, use the stub detector backend")
+    parser.add_argument("--stub-ms", type=float, default=10.0, help="Stub inference latency in ms")
+    parser.add_argument("--env", action="append", default=[], help="Extra KEY=VALUE settings for --launch")
+    parser.add_argument("--server-log", help="With --launch, write server output to this file")
+    parser.add_argument("--output", "-o", help="Write results as JSON")
+    parser.add_argument("--baseline", help="Previous JSON results to compare against")
+    parser.add_argument("--max-regression", type=float,
+                        help="Exit non-zero if p95 rises or fps/camera falls by more than this percent")
+    args = parser.parse_args()
+    
+    frames = load_frames(args.sources, args.max_frames, args.width)
+    print(f"Loaded {len(frames)} frames ({np.mean([len(f) for f in frames]) / 1024:.0f} KB avg JPEG)")
+    
+    process = None
+    pid = args.pid
+    if args.launch:
+        env = dict(item.split('=', 1) for item in args.env)
+        if args.stub:
+            env.update(INFERENCE_BACKEND="stub", STUB_INFERENCE_MS=str(args.stub_ms))
+        process = launch_server(
+            int(args.rest.rsplit(':', 1)[1]),
+            int(args.grpc.rsplit(':', 1)[1]),
+            env,
+            args.server_log
+        )
+        pid = process.pid
+    
+    try:
+        health = wait_for_health(args.rest, process=process)
+        print(f"Server healthy: backend={health.get('model_type')}")
+        
+        print(f"\nReplaying at {args.fps:g} FPS per camera for {args.duration:g}s per run")
+        print("-" * 118)
+        print(f"{'protocol':>11} | {'cams':>4} | {'fps/cam':>7} | {'min fps':>7} | {'p50 ms':>7} | {'p95 ms':>7} | "
+              f"{'p99 ms':>7} | {'dropped':>7} | {'rejected':>8} | {'errors':>6} | {'CPU %':>6} | {'RSS MB':>7}")
+        print("-" * 118)
+        
+        results = []
+        for protocol in args.protocols:
+            for cameras in args.cameras:
+                result = run_protocol(
+                    protocol, frames, cameras, args.fps, args.duration,
+                    args.rest, args.grpc, args.inflight, pid
+                )
+                results.append(result)
+                
+                server = result['server']
+                print(f"{protocol:>11} | {cameras:>4} | {result['fps_per_camera_mean']:>7.1f} | "
+                      f"{result['fps_per_camera_min']:>7.1f} | {fmt(result['p50_ms'], '>7.1f')} | "
+                      f"{fmt(result['p95_ms'], '>7.1f')} | {fmt(result['p99_ms'], '>7.1f')} | "
+                      f"{result['dropped']:>7} | {result['rejected']:>8} | {result['errors']:>6} | "
+                      f"{fmt(server.get('cpu_percent_mean'), '>6.0f')} | {fmt(server.get('peak_rss_mb'), '>7.0f')}")
+                for error in sorted({e for c in result['per_camera'] for e in c['errors']})[:3]:
+                    print(f"{'':>11}   ! {error}")
+        
+        print("-" * 118)
+    finally:
+        if process is not None:
+            stop_server(process)
+    
+    report = {
+        'meta': dict(run_metadata(), backend=health.get('model_type'), frames=len(frames), sources=args.sources),
+        'results': results
+    }
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+    
+    if args.baseline and compare(results, args.baseline, args.max_regression):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import argparse
+import logging
+import time
+import sys
+from pathlib import Path
+
+import numpy as np
+import structlog
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from config import settings
+from detections import CLASS_IDS, Detections
+from tracker import ObjectTracker, NORFAIR_AVAILABLE
+
+structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+
+def make_sequence(num_objects: int, num_frames: int, width: int = 1920, height: int = 1080, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    size = rng.uniform([30, 60], [80, 160], (num_objects, 2))
+    position = rng.uniform([0, 0], [width, height], (num_objects, 2))
+    velocity = rng.uniform(-6, 6, (num_objects, 2))
+    class_ids = rng.choice([CLASS_IDS['Person'], CLASS_IDS['Hardhat'], CLASS_IDS['Safety Vest']], num_objects)
+    
+    frames = []
+    for _ in range(num_frames):
+        position = position + velocity
+        bounce = (position < 0) | (position + size > [width, height])
+        velocity = np.where(bounce, -velocity, velocity)
+        
+        visible = rng.random(num_objects) > 0.05
+        boxes = np.concatenate([position, position + size], axis=1) + rng.normal(0, 1.5, (num_objects, 4))
+        frames.append((
+            Detections(
+                boxes=boxes[visible],
+                scores=rng.uniform(0.3, 0.95, num_objects)[visible],
+                class_ids=class_ids[visible]
+            ),
+            np.flatnonzero(visible)
+        ))
+    
+    return frames
+
+
+def run(backend: str, frames) -> dict:
+    tracker = ObjectTracker(
+        max_distance=settings.TRACKER_MAX_DISTANCE,
+        hit_counter_max=settings.TRACKER_HIT_COUNTER_MAX,
+        backend=backend
+    )
+    
+    latencies = []
+    assigned = {}
+    switches = 0
+    outputs = 0
+    for detections, truth in frames:
+        start = time.perf_counter()
+        tracked = tracker.update(detections)
+        latencies.append((time.perf_counter() - start) * 1000)
+        
+        lookup = {tuple(box): gt for box, gt in zip(detections.boxes.tolist(), truth.tolist())}
+        for box, track_id in zip(tracked.boxes.tolist(), tracked.track_ids.tolist()):
+            gt = lookup.get(tuple(box))
+            if gt is None:
+                continue
+            outputs += 1
+            if assigned.get(gt, track_id) != track_id:
+                switches += 1
+            assigned[gt] = track_id
+    
+    latencies = np.array(latencies[3:] or latencies)
+    return {
+        'mean_ms': float(latencies.mean()),
+        'p95_ms': float(np.percentile(latencies, 95)),
+        'outputs': outputs / len(frames),
+        'id_switches': switches
+    }
+
+
+def benchmark(object_counts: list, num_frames: int = 50, backends: list = None):
+    settings.ENABLE_TRACKING = True
+    backends = backends or ["iou"] + (["norfair"] if NORFAIR_AVAILABLE else [])
+    
+    print(f"\nBenchmarking tracker backends over {num_frames} frames")
+    print("-" * 72)
+    print(f"{'objects':>7} | {'backend':>8} | {'mean ms':>9} | {'p95 ms':>9} | {'tracked/frame':>13} | {'id switches':>11}")
+    print("-" * 72)
+    
+    results = {}
+    for count in object_counts:
+        frames = make_sequence(count, num_frames)
+        for backend in backends:
+            result = run(backend, frames)
+            results[(count, backend)] = result
+            print(f"{count:>7} | {backend:>8} | {result['mean_ms']:>9.3f} | {result['p95_ms']:>9.3f} | "
+                  f"{result['outputs']:>13.1f} | {result['id_switches']:>11}")
+        
+        if "norfair" in backends and "iou" in backends:
+            speedup = results[(count, "norfair")]['mean_ms'] / results[(count, "iou")]['mean_ms']
+            print(f"{'':>7} | {'speedup':>8} | {speedup:>8.1f}x |")
+    
+    print("-" * 72)
+    
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark tracker backends")
+    parser.add_argument("--objects", type=int, nargs="+", default=[10, 100, 500],
+                        help="Objects per frame")
+    parser.add_argument("--frames", type=int, default=50, help="Frames per sequence")
+    parser.add_argument("--backends", nargs="+", choices=["iou", "norfair"], help="Backends to compare")
+    
+    args = parser.parse_args()
+    
+    benchmark(args.objects, num_frames=args.frames, backends=args.backends)
@@ -0,0 +1,134 @@
+import argparse
+import logging
+import time
+import sys
+from pathlib import Path
+
+import numpy as np
+import structlog
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import shapely
+
+from config import settings
+from detections import Detections, CLASS_IDS
+from zones import Zone, ZoneManager
+
+structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+PPE_CHOICES = ['Hardhat', 'NO-Hardhat', 'Safety Vest', 'NO-Safety Vest', 'Mask', 'NO-Mask']
+
+
+def make_manager(num_zones: int, width: int, height: int, seed: int = 0) -> ZoneManager:
+    rng = np.random.default_rng(seed)
+    manager = ZoneManager(config_path="/nonexistent")
+    manager.enabled = True
+    
+    for i in range(num_zones):
+        cx, cy = rng.uniform(0, width), rng.uniform(0, height)
+        w, h = rng.uniform(40, 300, 2)
+        manager.add_zone(Zone(
+            id=f"zone-{i}",
+            name=f"Zone {i}",
+            severity="warning",
+            polygon=[(cx - w / 2, cy - h / 2), (cx + w / 2, cy - h / 2),
+                     (cx + w / 2 + 20, cy + h / 2), (cx - w / 2, cy + h / 2)],
+            required_ppe=list(rng.choice(['Hardhat', 'Safety Vest', 'Mask'], rng.integers(0, 3), replace=False))
+        ))
+    
+    return manager
+
+
+def make_frame(num_persons: int, width: int, height: int, rng: np.random.Generator) -> Detections:
+    boxes, class_ids = [], []
+    
+    for _ in range(num_persons):
+        x, y = rng.integers(0, width - 120), rng.integers(0, height - 200)
+        boxes.append([x, y, x + rng.integers(30, 120), y + rng.integers(80, 200)])
+        class_ids.append(CLASS_IDS['Person'])
+        
+        for name in rng.choice(PPE_CHOICES, 2):
+            bx, by = x + rng.integers(-20, 60), y + rng.integers(-20, 120)
+            boxes.append([bx, by, bx + rng.integers(10, 60), by + rng.integers(10, 60)])
+            class_ids.append(CLASS_IDS[name])
+    
+    return Detections(boxes=boxes, scores=np.full(len(boxes), 0.9), class_ids=class_ids)
+
+
+def per_point_containment(manager: ZoneManager, detections: Detections) -> int:
+    hits = 0
+    persons = detections.filter(detections.class_ids == CLASS_IDS['Person'])
+    for x, y in persons.bottom_centers.tolist():
+        for zone in manager.zones.values():
+            if zone.enabled and zone._prepared_polygon.contains(shapely.Point(x, y)):
+                hits += 1
+    return hits
+
+
+def time_frames(fn, frames, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for frame in frames:
+            fn(frame)
+    return (time.perf_counter() - start) * 1000 / (iterations * len(frames))
+
+
+def benchmark(
+    zone_counts: list,
+    num_persons: int = 30,
+    width: int = 1920,
+    height: int = 1080,
+    iterations: int = 20
+):
+    settings.ENABLE_ZONES = True
+    rng = np.random.default_rng(1)
+    frames = [make_frame(num_persons, width, height, rng) for _ in range(20)]
+    
+    print(f"\nBenchmarking zone checks: {num_persons} persons/frame at {width}x{height}")
+    print("-" * 84)
+    print(f"{'zones':>6} | {'per-point loop':>15} | {'STR-tree':>10} | {'raster':>10} | "
+          f"{'raster build':>13} | {'violations':>10}")
+    print("-" * 84)
+    
+    results = {}
+    for count in zone_counts:
+        manager = make_manager(count, width, height)
+        
+        loop_ms = time_frames(lambda f: per_point_containment(manager, f), frames, iterations)
+        tree_ms = time_frames(lambda f: manager.check_violations(f, 0), frames, iterations)
+        
+        start = time.perf_counter()
+        manager.index.raster((height, width))
+        build_ms = (time.perf_counter() - start) * 1000
+        raster_ms = time_frames(
+            lambda f: manager.check_violations(f, 0, frame_shape=(height, width)),
+            frames, iterations
+        )
+        found = sum(len(manager.check_violations(f, 0)) for f in frames) / len(frames)
+        
+        results[count] = {
+            'loop_ms': loop_ms,
+            'tree_ms': tree_ms,
+            'raster_ms': raster_ms,
+            'raster_build_ms': build_ms
+        }
+        print(f"{count:>6} | {loop_ms:>13.3f}ms | {tree_ms:>8.3f}ms | {raster_ms:>8.3f}ms | "
+              f"{build_ms:>11.1f}ms | {found:>10.1f}")
+    
+    print("-" * 84)
+    print("The per-point loop only tests containment; the other columns run check_violations.")
+    
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark zone containment and PPE association")
+    parser.add_argument("--zones", type=int, nargs="+", default=[5, 50, 200, 500],
+                        help="Zone counts to benchmark")
+    parser.add_argument("--persons", type=int, default=30, help="Persons per frame")
+    parser.add_argument("--iterations", type=int, default=20, help="Benchmark iterations")
+    
+    args = parser.parse_args()
+    
+    benchmark(args.zones, num_persons=args.persons, iterations=args.iterations)
@@ -1,4 +1,7 @@
 import argparse
+import json
+import random
+import tempfile
 import time
 from pathlib import Path
 import sys
@@ -9,6 +12,23 @@ except ImportError:
     print("Error: ultralytics not installed. Run: pip install ultralytics")
     sys.exit(1)
 
+try:
+    import onnx
+    from onnxruntime.quantization import CalibrationMethod, QuantFormat, QuantType, quantize_static
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+    QUANTIZATION_AVAILABLE = True
+except ImportError:
+    QUANTIZATION_AVAILABLE = False
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+IMAGE_SUFFIXES = {'.jpg', '.jpeg', '.png', '.bmp'}
+CALIBRATION_METHODS = {
+    'minmax': 'MinMax',
+    'entropy': 'Entropy',
+    'percentile': 'Percentile'
+}
+
 
 def export_onnx(
     model_path: str,
@@ -16,7 +36,8 @@ def export_onnx(
     imgsz: int = 640,
     half: bool = False,
     simplify: bool = True,
-    dynamic: bool = False
+    dynamic: bool = False,
+    batch: int = 1
 ):
     print(f"Loading model from {model_path}...")
     model = YOLO(model_path)
@@ -24,13 +45,18 @@ def export_onnx(
     Path(output_dir).mkdir(parents=True, exist_ok=True)
     
     model_name = Path(model_path).stem
-    output_path = Path(output_dir) / f"{model_name}.onnx"
+    suffix = "_dynamic" if dynamic else f"_b{batch}" if batch > 1 else ""
+    if imgsz != 640:
+        suffix += f"_{imgsz}"
+    output_path = Path(output_dir) / f"{model_name}{suffix}.onnx"
     
     print(f"Exporting to ONNX...")
     print(f"  Image size: {imgsz}")
     print(f"  Half precision (FP16): {half}")
     print(f"  Simplify: {simplify}")
-    print(f"  Dynamic batch: {dynamic}")
+    print(f"  Dynamic batch/shape: {dynamic}")
+    if not dynamic:
+        print(f"  Batch size: {batch}")
     
     start = time.time()
     
@@ -39,7 +65,8 @@ def export_onnx(
         imgsz=imgsz,
         half=half,
         simplify=simplify,
-        dynamic=dynamic
+        dynamic=dynamic,
+        batch=batch
     )
     
     export_time = time.time() - start
@@ -94,99 +121,273 @@ def export_tensorrt(
     return str(output_path)
 
 
-def benchmark(
-    model_paths: list,
-    test_image: str = None,
-    iterations: int = 100,
-    warmup: int = 10
+class LetterboxCalibrationReader:
+    
+    def __init__(self, detector, image_paths: list):
+        self.detector = detector
+        self.input_name = detector.session.get_inputs()[0].name
+        self.image_paths = iter(image_paths)
+        self.count = 0
+    
+    def get_next(self):
+        import cv2
+        
+        for path in self.image_paths:
+            frame = cv2.imread(str(path))
+            if frame is None:
+                continue
+            blob, _, _ = self.detector.preprocess(frame)
+            self.count += 1
+            return {self.input_name: blob.copy()}
+        return None
+
+
+def calibration_images(data_yaml: str, split: str = "train", count: int = 200, seed: int = 0) -> list:
+    import yaml
+    
+    with open(data_yaml, 'r') as f:
+        data = yaml.safe_load(f)
+    
+    root = Path(data.get('path') or Path(data_yaml).parent)
+    image_dir = Path(data[split])
+    if not image_dir.is_absolute():
+        image_dir = root / image_dir
+    
+    images = sorted(p for p in image_dir.rglob('*') if p.suffix.lower() in IMAGE_SUFFIXES)
+    if not images:
+        raise FileNotFoundError(f"No calibration images found in {image_dir}")
+    
+    random.Random(seed).shuffle(images)
+    return images[:count]
+
+
+def head_nodes(model_path: str) -> list:
+    nodes = list(onnx.load(model_path, load_external_data=False).graph.node)
+    consumers = {}
+    for index, node in enumerate(nodes):
+        for name in node.input:
+            consumers.setdefault(name, []).append(index)
+    
+    feeds_conv = [False] * len(nodes)
+    for index in reversed(range(len(nodes))):
+        feeds_conv[index] = any(
+            nodes[child].op_type == 'Conv' or feeds_conv[child]
+            for output in nodes[index].output
+            for child in consumers.get(output, [])
+        )
+    
+    return [
+        node.name for node, feeds in zip(nodes, feeds_conv)
+        if node.name and (not feeds or '/dfl/' in node.name)
+    ]
+
+
+def evaluate_map(model_path: str, data_yaml: str, imgsz: int = 640, device: str = "cpu") -> dict:
+    metrics = YOLO(model_path, task='detect').val(
+        data=data_yaml,
+        imgsz=imgsz,
+        batch=1,
+        device=device,
+        split='val',
+        plots=False,
+        verbose=False
+    )
+    return {
+        'map50': float(metrics.box.map50),
+        'map50_95': float(metrics.box.map)
+    }
+
+
+def quantize(
+    model_path: str,
+    data_yaml: str = "../../data/merged_dataset/data.yaml",
+    output_dir: str = "../models",
+    imgsz: int = 640,
+    calib_images: int = 200,
+    calib_split: str = "train",
+    method: str = "minmax",
+    per_channel: bool = True,
+    reduce_range: bool = False,
+    exclude_head: bool = True,
+    evaluate: bool = True,
+    seed: int = 0
 ):
-    import numpy as np
-    import cv2
+    if not QUANTIZATION_AVAILABLE:
+        print("Error: onnxruntime quantization tools not available. Run: pip install onnxruntime onnx")
+        sys.exit(1)
+    
+    from detector import Detector
     
-    if test_image:
-        frame = cv2.imread(test_image)
+    if model_path.endswith('.pt'):
+        onnx_path = Path(output_dir) / f"{Path(model_path).stem}.onnx"
+        fp32_path = str(onnx_path) if onnx_path.exists() else export_onnx(model_path, output_dir, imgsz)
     else:
-        frame = np.random.randint(0, 255, (640, 640, 3), dtype=np.uint8)
+        fp32_path = model_path
     
-    print(f"\nBenchmarking with {iterations} iterations (warmup: {warmup})")
-    print("-" * 60)
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    output_path = Path(output_dir) / f"{Path(fp32_path).stem}_int8.onnx"
     
-    results = {}
+    images = calibration_images(data_yaml, calib_split, calib_images, seed)
+    detector = Detector(model_path=fp32_path, backend="onnx")
+    reader = LetterboxCalibrationReader(detector, images)
     
-    for model_path in model_paths:
-        if not Path(model_path).exists():
-            print(f"Skipping {model_path} (not found)")
-            continue
-        
-        model = YOLO(model_path)
-        
-        print(f"\nWarming up {Path(model_path).name}...")
-        for _ in range(warmup):
-            model(frame, verbose=False)
-        
-        print(f"Benchmarking {Path(model_path).name}...")
-        times = []
-        for _ in range(iterations):
-            start = time.perf_counter()
-            model(frame, verbose=False)
-            times.append((time.perf_counter() - start) * 1000)
+    print(f"Quantizing {fp32_path} to INT8 (QDQ)...")
+    print(f"  Calibration: {len(images)} images from '{calib_split}' ({method})")
+    print(f"  Per-channel: {per_channel}")
+    print(f"  Reduce range: {reduce_range}")
+    
+    start = time.time()
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        prepared_path = str(Path(tmp_dir) / "prepared.onnx")
+        quant_pre_process(fp32_path, prepared_path)
         
-        avg = np.mean(times)
-        std = np.std(times)
-        fps = 1000 / avg
+        excluded = head_nodes(prepared_path) if exclude_head else []
+        print(f"  Excluded head nodes: {len(excluded)}")
         
-        results[Path(model_path).name] = {
-            'avg_ms': avg,
-            'std_ms': std,
-            'fps': fps
+        quantize_static(
+            prepared_path,
+            str(output_path),
+            reader,
+            quant_format=QuantFormat.QDQ,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8,
+            per_channel=per_channel,
+            reduce_range=reduce_range,
+            calibrate_method=getattr(CalibrationMethod, CALIBRATION_METHODS[method]),
+            nodes_to_exclude=excluded
+        )
+    
+    quantize_time = time.time() - start
+    fp32_size = Path(fp32_path).stat().st_size / 1e6
+    int8_size = output_path.stat().st_size / 1e6
+    
+    print(f"\nQuantization completed in {quantize_time:.2f}s ({reader.count} calibration images)")
+    print(f"Saved to: {output_path}")
+    print(f"  Size: {fp32_size:.1f}MB -> {int8_size:.1f}MB")
+    
+    report = {
+        'fp32_model': fp32_path,
+        'int8_model': str(output_path),
+        'calibration': {
+            'images': reader.count,
+            'split': calib_split,
+            'method': method,
+            'per_channel': per_channel,
+            'reduce_range': reduce_range,
+            'excluded_nodes': len(excluded)
+        },
+        'size_mb': {'fp32': round(fp32_size, 2), 'int8': round(int8_size, 2)}
+    }
+    
+    if evaluate:
+        print(f"\nValidating FP32 and INT8 models on the 'val' split of {data_yaml}...")
+        fp32_map = evaluate_map(fp32_path, data_yaml, imgsz)
+        int8_map = evaluate_map(str(output_path), data_yaml, imgsz)
+        report['map'] = {
+            'fp32': fp32_map,
+            'int8': int8_map,
+            'delta': {k: int8_map[k] - fp32_map[k] for k in fp32_map}
         }
         
-        print(f"  Average: {avg:.2f}ms ± {std:.2f}ms")
-        print(f"  FPS: {fps:.1f}")
+        print(f"  {'':10} | {'mAP50':>8} | {'mAP50-95':>8}")
+        for name, m in (("FP32", fp32_map), ("INT8", int8_map), ("Delta", report['map']['delta'])):
+            print(f"  {name:10} | {m['map50']:>8.4f} | {m['map50_95']:>8.4f}")
     
-    print("\n" + "=" * 60)
-    print("SUMMARY")
-    print("=" * 60)
+    report_path = output_path.with_suffix('.json')
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Report: {report_path}")
     
-    for name, r in sorted(results.items(), key=lambda x: x[1]['avg_ms']):
-        print(f"{name:30} | {r['avg_ms']:6.2f}ms | {r['fps']:6.1f} FPS")
+    return str(output_path)
+
+
+def benchmark(
+    model_paths: list,
+    test_image: str = None,
+    iterations: int = 100,
+    warmup: int = 10,
+    batch_sizes: list = None,
+    resolutions: list = None,
+    output: str = None
+):
+    from benchmark_detector import benchmark as benchmark_detector
     
-    return results
+    return benchmark_detector(
+        model_paths,
+        batch_sizes=batch_sizes,
+        resolutions=resolutions,
+        iterations=iterations,
+        warmup=warmup,
+        image=test_image,
+        output=output
+    )
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Export YOLOv8 model to ONNX/TensorRT")
-    parser.add_argument("action", choices=["onnx", "tensorrt", "benchmark"], help="Export format or benchmark")
+    parser.add_argument("action", choices=["onnx", "tensorrt", "quantize", "benchmark"],
+                        help="Export format, INT8 quantization or benchmark")
     parser.add_argument("--model", "-m", default="../models/best.pt", help="Input model path")
     parser.add_argument("--output", "-o", default="../models", help="Output directory")
-    parser.add_argument("--imgsz", type=int, default=640, help="Image size")
+    parser.add_argument("--imgsz", type=int, nargs="+", default=[640],
+                        help="Image sizes to export (onnx) or benchmark (benchmark)")
+    parser.add_argument("--batch", type=int, nargs="+",
+                        help="Fixed batch sizes to export (onnx) or benchmark (benchmark)")
+    parser.add_argument("--dynamic", action="store_true", help="Export with dynamic batch and image size (onnx)")
     parser.add_argument("--half", action="store_true", help="Use FP16")
     parser.add_argument("--int8", action="store_true", help="Use INT8 (TensorRT only)")
     parser.add_argument("--simplify", action="store_true", default=True, help="Simplify ONNX")
     parser.add_argument("--iterations", type=int, default=100, help="Benchmark iterations")
+    parser.add_argument("--results", help="Write benchmark results as JSON (benchmark)")
+    parser.add_argument("--data", default="../../data/merged_dataset/data.yaml",
+                        help="Dataset yaml from merge_datasets.py (quantize)")
+    parser.add_argument("--calib-images", type=int, default=200, help="Calibration images (quantize)")
+    parser.add_argument("--calib-split", default="train", help="Dataset split to calibrate on (quantize)")
+    parser.add_argument("--calib-method", choices=sorted(CALIBRATION_METHODS), default="minmax",
+                        help="Calibration method (quantize)")
+    parser.add_argument("--per-tensor", action="store_true", help="Per-tensor instead of per-channel weights")
+    parser.add_argument("--reduce-range", action="store_true", help="7-bit weights for CPUs without VNNI")
+    parser.add_argument("--quantize-head", action="store_true", help="Also quantize the detection head")
+    parser.add_argument("--no-eval", action="store_true", help="Skip the FP32 vs INT8 mAP comparison")
     
     args = parser.parse_args()
     
     if args.action == "onnx":
-        export_onnx(
-            args.model,
-            args.output,
-            args.imgsz,
-            args.half,
-            args.simplify
-        )
+        for imgsz in args.imgsz:
+            if args.dynamic:
+                export_onnx(args.model, args.output, imgsz, args.half, args.simplify, dynamic=True)
+            for batch in args.batch or ([] if args.dynamic else [1]):
+                export_onnx(args.model, args.output, imgsz, args.half, args.simplify, batch=batch)
     elif args.action == "tensorrt":
         export_tensorrt(
             args.model,
             args.output,
-            args.imgsz,
+            args.imgsz[0],
             args.half,
             args.int8
         )
-    elif args.action == "benchmark":
-        models = [
+    elif args.action == "quantize":
+        quantize(
             args.model,
-            args.model.replace('.pt', '.onnx'),
-            args.model.replace('.pt', '_fp16.engine'),
-        ]
-        benchmark(models, iterations=args.iterations)
+            args.data,
+            args.output,
+            args.imgsz[0],
+            calib_images=args.calib_images,
+            calib_split=args.calib_split,
+            method=args.calib_method,
+            per_channel=not args.per_tensor,
+            reduce_range=args.reduce_range,
+            exclude_head=not args.quantize_head,
+            evaluate=not args.no_eval
+        )
+    elif args.action == "benchmark":
+        from benchmark_detector import default_models
+        
+        benchmark(
+            default_models(args.model),
+            iterations=args.iterations,
+            batch_sizes=args.batch,
+            resolutions=args.imgsz,
+            output=args.results
+        )
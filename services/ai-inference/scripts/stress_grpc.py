@@ -0,0 +1,197 @@
+import argparse
+import threading
+import time
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import cv2
+import grpc
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC_DIR))
+sys.path.insert(0, str(SRC_DIR / "proto"))
+
+import detection_pb2
+import detection_pb2_grpc
+
+
+PROFILES: List[Tuple[float, Tuple[str, ...]]] = [
+    (0.25, ()),
+    (0.5, ()),
+    (0.7, ()),
+    (0.25, ("Person",)),
+    (0.4, ("Hardhat", "NO-Hardhat", "Safety Vest", "NO-Safety Vest")),
+]
+
+
+def load_image(path: Optional[str]) -> bytes:
+    if path:
+        frame = cv2.imread(path)
+        if frame is None:
+            raise SystemExit(f"Cannot read image: {path}")
+    else:
+        rng = np.random.default_rng(0)
+        frame = rng.integers(0, 255, (480, 640, 3), dtype=np.uint8)
+    
+    ok, encoded = cv2.imencode('.jpg', frame)
+    return encoded.tobytes()
+
+
+def signature(response) -> Set[Tuple]:
+    return {
+        (d.class_name, d.bbox.x1, d.bbox.y1, d.bbox.x2, d.bbox.y2)
+        for d in response.detections
+    }
+
+
+def make_request(image: bytes, camera_id: str, profile: Tuple[float, Tuple[str, ...]]):
+    conf, classes = profile
+    return detection_pb2.DetectRequest(
+        image_data=image,
+        camera_id=camera_id,
+        confidence_threshold=conf,
+        classes=list(classes)
+    )
+
+
+def reference_results(stub, image: bytes, warmup: int) -> Dict[int, Set[Tuple]]:
+    reference = {}
+    for i, profile in enumerate(PROFILES):
+        request = make_request(image, f"stress-ref-{i}", profile)
+        reference[i] = set()
+        for _ in range(warmup):
+            reference[i] |= signature(stub.Detect(request))
+    return reference
+
+
+def check_response(response, camera_id: str, profile, expected: Set[Tuple]) -> Optional[str]:
+    conf, classes = profile
+    
+    if response.camera_id != camera_id:
+        return f"camera_id mismatch: {response.camera_id} != {camera_id}"
+    
+    for det in response.detections:
+        if det.confidence < np.float32(conf):
+            return f"confidence {det.confidence:.3f} below requested {conf}"
+        if classes and det.class_name not in classes:
+            return f"class {det.class_name} outside filter {classes}"
+    
+    if not signature(response) <= expected:
+        return "detections not produced by the sequential reference"
+    
+    return None
+
+
+def run_client(
+    stub,
+    image: bytes,
+    client_id: int,
+    requests: int,
+    reference: Dict[int, Set[Tuple]],
+    stats: Dict,
+    lock: threading.Lock
+):
+    camera_id = f"stress-{client_id}"
+    profile_id = client_id % len(PROFILES)
+    latencies = []
+    errors = []
+    rejected = 0
+    
+    for _ in range(requests):
+        request = make_request(image, camera_id, PROFILES[profile_id])
+        
+        start = time.perf_counter()
+        try:
+            response = stub.Detect(request)
+        except grpc.RpcError as e:
+            if e.code() == grpc.StatusCode.RESOURCE_EXHAUSTED:
+                rejected += 1
+                continue
+            errors.append(f"{e.code().name}: {e.details()}")
+            continue
+        latencies.append((time.perf_counter() - start) * 1000)
+        
+        error = check_response(response, camera_id, PROFILES[profile_id], reference[profile_id])
+        if error:
+            errors.append(error)
+    
+    with lock:
+        stats['latencies'].extend(latencies)
+        stats['errors'].extend(errors)
+        stats['rejected'] += rejected
+
+
+def stress(stub, image: bytes, clients: int, requests: int, reference: Dict[int, Set[Tuple]]) -> Dict:
+    stats = {'latencies': [], 'errors': [], 'rejected': 0}
+    lock = threading.Lock()
+    
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        for client_id in range(clients):
+            pool.submit(run_client, stub, image, client_id, requests, reference, stats, lock)
+    elapsed = time.perf_counter() - start
+    
+    latencies = np.array(stats['latencies']) if stats['latencies'] else np.zeros(1)
+    return {
+        'clients': clients,
+        'completed': len(stats['latencies']),
+        'rejected': stats['rejected'],
+        'errors': stats['errors'],
+        'throughput': len(stats['latencies']) / elapsed,
+        'p50': float(np.percentile(latencies, 50)),
+        'p95': float(np.percentile(latencies, 95))
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent gRPC stress test for the detection service")
+    parser.add_argument("--target", default="localhost:50051")
+    parser.add_argument("--image", help="Image to send (random noise if omitted)")
+    parser.add_argument("--clients", default="1,2,4,8,16", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=50, help="Requests per client")
+    parser.add_argument("--warmup", type=int, default=10, help="Sequential frames per profile for the reference")
+    args = parser.parse_args()
+    
+    image = load_image(args.image)
+    levels = [int(c) for c in args.clients.split(",")]
+    
+    channel = grpc.insecure_channel(args.target, options=[
+        ('grpc.max_send_message_length', 32 * 1024 * 1024),
+        ('grpc.max_receive_message_length', 32 * 1024 * 1024)
+    ])
+    stub = detection_pb2_grpc.DetectionServiceStub(channel)
+    grpc.channel_ready_future(channel).result(timeout=10)
+    
+    reference = reference_results(stub, image, args.warmup)
+    
+    print(f"\nStress testing {args.target} with {args.requests} requests per client")
+    print("-" * 72)
+    print(f"{'clients':>7} | {'done':>6} | {'rejected':>8} | {'errors':>6} | {'req/s':>8} | {'p50 ms':>7} | {'p95 ms':>7}")
+    print("-" * 72)
+    
+    baseline = None
+    failed = False
+    for clients in levels:
+        result = stress(stub, image, clients, args.requests, reference)
+        baseline = baseline or result['throughput']
+        failed = failed or bool(result['errors'])
+        
+        print(f"{clients:>7} | {result['completed']:>6} | {result['rejected']:>8} | "
+              f"{len(result['errors']):>6} | {result['throughput']:>8.1f} | "
+              f"{result['p50']:>7.1f} | {result['p95']:>7.1f}   x{result['throughput'] / baseline:.2f}")
+        
+        for error in sorted(set(result['errors']))[:5]:
+            print(f"          ! {error}")
+    
+    print("-" * 72)
+    print("FAILED: responses were inconsistent" if failed else "OK: all responses matched the sequential reference")
+    
+    channel.close()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, List, Optional, Sequence, Tuple
+import structlog
+
+from config import settings
+from metrics import record_quality_mode, record_extrapolated_frame
+
+logger = structlog.get_logger()
+
+
+@dataclass(frozen=True)
+class QualityMode:
+    level: int
+    input_size: int
+    skip: int = 1
+    
+    @property
+    def name(self) -> str:
+        return f"{self.input_size}" if self.skip == 1 else f"{self.input_size}/skip{self.skip}"
+    
+    def to_dict(self) -> Dict:
+        return {'level': self.level, 'name': self.name, 'input_size': self.input_size, 'skip': self.skip}
+
+
+@dataclass(frozen=True)
+class CameraSLO:
+    target_fps: float
+    max_latency_ms: float
+    
+    @classmethod
+    def for_camera(cls, camera_id: str) -> "CameraSLO":
+        target_fps = settings.SLO_TARGET_FPS.get(
+            camera_id, settings.STREAM_FPS.get(camera_id, settings.SLO_DEFAULT_TARGET_FPS)
+        )
+        max_latency_ms = settings.SLO_MAX_LATENCY_MS.get(camera_id, settings.SLO_DEFAULT_MAX_LATENCY_MS)
+        return cls(target_fps=target_fps, max_latency_ms=max_latency_ms)
+    
+    @property
+    def latency_budget_s(self) -> float:
+        budget = self.max_latency_ms / 1000
+        if self.target_fps > 0:
+            budget = min(budget, 1 / self.target_fps)
+        return budget
+
+
+def build_modes(input_sizes: Sequence[int], max_skip: int = 1) -> List[QualityMode]:
+    sizes = sorted(set(input_sizes), reverse=True)
+    if not sizes:
+        raise ValueError("At least one input size is required")
+    
+    modes = [QualityMode(level=i, input_size=size) for i, size in enumerate(sizes)]
+    for skip in range(2, max_skip + 1):
+        modes.append(QualityMode(level=len(modes), input_size=sizes[-1], skip=skip))
+    return modes
+
+
+class CameraQuality:
+    
+    __slots__ = (
+        'slo', 'level', 'frame', 'latencies', 'completed', 'changed_at', 'evaluated_at',
+        'healthy_since', 'changes', 'p95_s', 'load'
+    )
+    
+    def __init__(self, slo: CameraSLO, now: float):
+        self.slo = slo
+        self.level = 0
+        self.frame = 0
+        self.latencies: Deque[Tuple[float, float]] = deque()
+        self.completed: Deque[float] = deque()
+        self.changed_at = now
+        self.evaluated_at = now
+        self.healthy_since: Optional[float] = None
+        self.changes = 0
+        self.p95_s: Optional[float] = None
+        self.load = 0.0
+
+
+class QualityController:
+    
+    def __init__(
+        self,
+        input_sizes: Sequence[int],
+        load: Callable[[], float] = lambda: 0.0,
+        max_skip: Optional[int] = None
+    ):
+        self.modes = build_modes(input_sizes, max_skip if max_skip is not None else settings.ADAPTIVE_MAX_SKIP)
+        self.load = load
+        self.window_s = settings.ADAPTIVE_WINDOW_S
+        self.min_samples = max(1, settings.ADAPTIVE_MIN_SAMPLES)
+        self.evaluate_interval_s = settings.ADAPTIVE_EVALUATE_INTERVAL_S
+        self.degrade_after_s = settings.ADAPTIVE_DEGRADE_AFTER_S
+        self.recover_after_s = settings.ADAPTIVE_RECOVER_AFTER_S
+        self.recover_ratio = settings.ADAPTIVE_RECOVER_RATIO
+        self.queue_high = settings.ADAPTIVE_QUEUE_HIGH
+        self.queue_low = settings.ADAPTIVE_QUEUE_LOW
+        self._cameras: Dict[str, CameraQuality] = {}
+        self._lock = threading.Lock()
+        
+        logger.info("quality_controller_started", modes=[m.name for m in self.modes])
+    
+    def plan(self, camera_id: str) -> Tuple[QualityMode, bool]:
+        with self._lock:
+            camera = self._cameras.get(camera_id)
+            created = camera is None
+            if created:
+                camera = self._cameras[camera_id] = CameraQuality(CameraSLO.for_camera(camera_id), time.monotonic())
+            
+            mode = self.modes[camera.level]
+            detect = camera.frame % mode.skip == 0
+            camera.frame += 1
+        
+        if created:
+            record_quality_mode(camera_id, mode.level, mode.input_size, mode.skip)
+        if not detect:
+            record_extrapolated_frame(camera_id)
+        return mode, detect
+    
+    def observe(self, camera_id: str, latency_s: float, detected: bool = True):
+        now = time.monotonic()
+        with self._lock:
+            camera = self._cameras.get(camera_id)
+            if camera is None:
+                return
+            
+            camera.completed.append(now)
+            if detected:
+                camera.latencies.append((now, latency_s))
+            
+            if now - camera.evaluated_at < self.evaluate_interval_s:
+                return
+            camera.evaluated_at = now
+            previous = self._evaluate(camera, now)
+            if previous is None:
+                return
+            mode = self.modes[camera.level]
+            p95_s, load = camera.p95_s, camera.load
+        
+        logger.info(
+            "quality_mode_changed",
+            camera_id=camera_id,
+            previous=self.modes[previous].name,
+            mode=mode.name,
+            p95_ms=round(p95_s * 1000, 1),
+            budget_ms=round(camera.slo.latency_budget_s * 1000, 1),
+            load=round(load, 2)
+        )
+        record_quality_mode(camera_id, mode.level, mode.input_size, mode.skip)
+    
+    def _trim(self, camera: CameraQuality, now: float):
+        cutoff = now - self.window_s
+        while camera.latencies and camera.latencies[0][0] < cutoff:
+            camera.latencies.popleft()
+        while camera.completed and camera.completed[0] < cutoff:
+            camera.completed.popleft()
+    
+    def _evaluate(self, camera: CameraQuality, now: float) -> Optional[int]:
+        self._trim(camera, now)
+        if len(camera.latencies) < self.min_samples:
+            return None
+        
+        latencies = sorted(latency for _, latency in camera.latencies)
+        camera.p95_s = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        camera.load = self.load()
+        budget = camera.slo.latency_budget_s
+        
+        previous = camera.level
+        if camera.p95_s > budget or camera.load >= self.queue_high:
+            camera.healthy_since = None
+            if camera.level < len(self.modes) - 1 and now - camera.changed_at >= self.degrade_after_s:
+                camera.level += 1
+        elif camera.p95_s <= budget * self.recover_ratio and camera.load <= self.queue_low:
+            if camera.healthy_since is None:
+                camera.healthy_since = now
+            elif camera.level > 0 and now - max(camera.healthy_since, camera.changed_at) >= self.recover_after_s:
+                camera.level -= 1
+        else:
+            camera.healthy_since = None
+        
+        if camera.level == previous:
+            return None
+        
+        camera.changed_at = now
+        camera.changes += 1
+        camera.latencies.clear()
+        return previous
+    
+    def forget(self, camera_id: str):
+        with self._lock:
+            self._cameras.pop(camera_id, None)
+    
+    def status(self) -> Dict:
+        now = time.monotonic()
+        with self._lock:
+            cameras = {}
+            for camera_id, camera in self._cameras.items():
+                self._trim(camera, now)
+                completed = camera.completed
+                span = completed[-1] - completed[0] if len(completed) > 1 else 0
+                cameras[camera_id] = {
+                    'mode': self.modes[camera.level].to_dict(),
+                    'target_fps': camera.slo.target_fps,
+                    'max_latency_ms': camera.slo.max_latency_ms,
+                    'p95_ms': round(camera.p95_s * 1000, 1) if camera.p95_s is not None else None,
+                    'fps': round((len(completed) - 1) / span, 1) if span > 0 else None,
+                    'load': round(camera.load, 2),
+                    'changes': camera.changes
+                }
+        
+        return {
+            'enabled': True,
+            'modes': [m.name for m in self.modes],
+            'cameras': cameras
+        }
@@ -0,0 +1,159 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import List, Optional
+import numpy as np
+import structlog
+
+from config import settings
+from metrics import record_batch, InferenceTimer
+from detections import Detections
+from detector import InferenceOptions
+from executor import InferencePool
+from timings import StageTimings
+
+logger = structlog.get_logger()
+
+
+@dataclass
+class PendingFrame:
+    frame: np.ndarray
+    options: Optional[InferenceOptions] = None
+    timings: Optional[StageTimings] = None
+    future: Future = field(default_factory=Future)
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+class BatchScheduler:
+    
+    POLL_INTERVAL_S = 0.0005
+    
+    def __init__(
+        self,
+        detector,
+        max_batch_size: Optional[int] = None,
+        max_wait_ms: Optional[float] = None,
+        pool: Optional[InferencePool] = None
+    ):
+        self.detector = detector
+        self.pool = pool
+        self.max_batch_size = max(1, max_batch_size or settings.BATCH_MAX_SIZE)
+        self.max_wait = (max_wait_ms if max_wait_ms is not None else settings.BATCH_MAX_WAIT_MS) / 1000
+        self._queue: "queue.Queue[PendingFrame]" = queue.Queue()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="batch-scheduler", daemon=True)
+        self._thread.start()
+        logger.info("batch_scheduler_started",
+                    max_batch_size=self.max_batch_size,
+                    max_wait_ms=self.max_wait * 1000)
+    
+    def stop(self, timeout: float = 5.0):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+        
+        while True:
+            try:
+                pending = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            pending.future.set_exception(RuntimeError("Batch scheduler stopped"))
+        
+        logger.info("batch_scheduler_stopped")
+    
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+    
+    def submit(
+        self,
+        frame: np.ndarray,
+        options: Optional[InferenceOptions] = None,
+        timings: Optional[StageTimings] = None
+    ) -> Future:
+        pending = PendingFrame(frame=frame, options=options, timings=timings)
+        if self._thread is None:
+            pending.future.set_exception(RuntimeError("Batch scheduler not running"))
+            return pending.future
+        self._queue.put(pending)
+        return pending.future
+    
+    def detect(
+        self,
+        frame: np.ndarray,
+        options: Optional[InferenceOptions] = None,
+        timings: Optional[StageTimings] = None
+    ) -> Detections:
+        return self.submit(frame, options, timings).result()
+    
+    def _collect_batch(self) -> List[PendingFrame]:
+        try:
+            first = self._queue.get(timeout=0.1)
+        except queue.Empty:
+            return []
+        
+        batch = [first]
+        deadline = first.enqueued_at + self.max_wait
+        
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except queue.Empty:
+                pass
+            
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0 or not self._expecting_more(len(batch)):
+                break
+            try:
+                batch.append(self._queue.get(timeout=min(remaining, self.POLL_INTERVAL_S)))
+            except queue.Empty:
+                continue
+        
+        return batch
+    
+    def _expecting_more(self, collected: int) -> bool:
+        return self.pool is not None and self.pool.pending > collected
+    
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._collect_batch()
+            if not batch:
+                continue
+            
+            batch = [p for p in batch if p.future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            
+            now = time.perf_counter()
+            waits = [now - p.enqueued_at for p in batch]
+            record_batch(len(batch), waits)
+            for pending, wait in zip(batch, waits):
+                if pending.timings is not None:
+                    pending.timings.add("queue", wait)
+            
+            try:
+                with InferenceTimer():
+                    results = self.detector.detect_batch(
+                        [p.frame for p in batch],
+                        [p.options for p in batch],
+                        [p.timings for p in batch]
+                    )
+            except Exception as e:
+                logger.error("batch_inference_failed", size=len(batch), error=str(e))
+                for pending in batch:
+                    pending.future.set_exception(e)
+                continue
+            
+            for pending, detections in zip(batch, results):
+                pending.future.set_result(detections)
@@ -1,32 +1,121 @@
 import os
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, List, Optional
 
 
 class Settings(BaseSettings):
     MODEL_PATH: str = "../models/best.pt"
     MODEL_FALLBACK_PATH: str = "../models/best.pt"
+    MODEL_INPUT_SIZE: int = 640
     CONFIDENCE_THRESHOLD: float = 0.5
     NMS_THRESHOLD: float = 0.45
+    NMS_TOP_K: int = 300
+    NMS_MAX_CANDIDATES: int = 3000
     
     USE_TENSORRT: bool = False
     USE_FP16: bool = True
     DEVICE: str = "cuda"
+    INFERENCE_BACKEND: str = "auto"
+    STUB_INFERENCE_MS: float = 10.0
+    STUB_PERSONS: int = 6
+    
+    ONNX_PRECISION: str = "fp32"
+    ONNX_PROVIDERS: List[str] = []
+    ONNX_INTRA_OP_THREADS: int = 0
+    ONNX_INTER_OP_THREADS: int = 0
+    ONNX_EXECUTION_MODE: str = "sequential"
+    ONNX_GRAPH_OPTIMIZATION: str = "all"
+    ONNX_ENABLE_MEM_ARENA: bool = True
+    ONNX_ENABLE_MEM_PATTERN: bool = True
+    ONNX_ALLOW_SPINNING: bool = True
+    ONNX_IO_BINDING: bool = True
+    ONNX_OPTIMIZED_CACHE: bool = True
+    ONNX_CACHE_DIR: Optional[str] = None
+    
+    ENABLE_BATCHING: bool = True
+    BATCH_MAX_SIZE: int = 8
+    BATCH_MAX_WAIT_MS: float = 5.0
+    
+    INFERENCE_WORKERS: int = 0
+    INFERENCE_MAX_PENDING: int = 64
+    INFERENCE_REJECT_STATUS: int = 503
     
     GRPC_HOST: str = "0.0.0.0"
     GRPC_PORT: int = 50051
+    GRPC_ASYNC: bool = True
+    GRPC_MAX_WORKERS: int = 10
+    GRPC_STREAM_MAX_INFLIGHT: int = 4
     REST_HOST: str = "0.0.0.0"
     REST_PORT: int = 8000
     
     ENABLE_TRACKING: bool = True
     TRACKER_MAX_DISTANCE: int = 100
     TRACKER_HIT_COUNTER_MAX: int = 15
+    TRACKER_BACKEND: str = "iou"
+    TRACKER_IOU_THRESHOLD: float = 0.3
+    TRACKER_HIGH_THRESHOLD: float = 0.5
+    TRACKER_MIN_HITS: int = 3
+    TRACKER_ASSIGNMENT: str = "hungarian"
+    TRACKER_HISTORY_MAX: int = 4096
+    PPE_VOTE_WINDOW: int = 5
+    PPE_REASSOCIATE_FRAMES: int = 5
+    PPE_REASSOCIATE_IOU: float = 0.7
+    
+    ADAPTIVE_ENABLED: bool = False
+    ADAPTIVE_INPUT_SIZES: List[int] = [640, 480, 416, 320]
+    ADAPTIVE_MAX_SKIP: int = 4
+    ADAPTIVE_WINDOW_S: float = 5.0
+    ADAPTIVE_MIN_SAMPLES: int = 5
+    ADAPTIVE_EVALUATE_INTERVAL_S: float = 1.0
+    ADAPTIVE_DEGRADE_AFTER_S: float = 2.0
+    ADAPTIVE_RECOVER_AFTER_S: float = 10.0
+    ADAPTIVE_RECOVER_RATIO: float = 0.6
+    ADAPTIVE_QUEUE_HIGH: float = 0.75
+    ADAPTIVE_QUEUE_LOW: float = 0.25
+    SLO_DEFAULT_TARGET_FPS: float = 5.0
+    SLO_DEFAULT_MAX_LATENCY_MS: float = 500.0
+    SLO_TARGET_FPS: Dict[str, float] = {}
+    SLO_MAX_LATENCY_MS: Dict[str, float] = {}
+    
+    SESSION_MAX_CAMERAS: int = 64
+    SESSION_IDLE_TTL_S: float = 300.0
+    SESSION_SWEEP_INTERVAL_S: float = 1.0
+    
+    STREAM_SOURCES: Dict[str, str] = {}
+    STREAM_DEFAULT_FPS: float = 5.0
+    STREAM_FPS: Dict[str, float] = {}
+    STREAM_LOOP_FILES: bool = True
+    STREAM_RECONNECT_DELAY_S: float = 2.0
+    STREAM_PUSH_QUEUE_SIZE: int = 4
+    STREAM_DELTA_MIN_MOVE_PX: int = 4
+    STREAM_KEEPALIVE_S: float = 15.0
     
     ENABLE_ZONES: bool = True
     ZONES_CONFIG_PATH: str = "../config/zones.yaml"
+    ZONE_RASTER_ENABLED: bool = True
+    ZONE_RASTER_MAX_RESOLUTIONS: int = 8
+    ZONE_RASTER_CACHE_DIR: Optional[str] = None
+    
+    VIOLATION_DEBOUNCE_ENABLED: bool = True
+    VIOLATION_MIN_DWELL_MS: int = 1000
+    VIOLATION_CLOSE_AFTER_MS: int = 2000
+    VIOLATION_COOLDOWN_MS: int = 10000
+    VIOLATION_RING_SIZE: int = 5000
+    VIOLATION_ROLLUP_BUCKET_S: int = 60
+    VIOLATION_ROLLUP_RETENTION_S: int = 86400
+    VIOLATION_DB_PATH: Optional[str] = None
+    VIOLATION_DB_BATCH_SIZE: int = 256
+    VIOLATION_QUERY_MAX_LIMIT: int = 1000
     
     METRICS_ENABLED: bool = True
     METRICS_PORT: int = 9090
+    METRICS_FLUSH_INTERVAL_S: float = 0.0
+    
+    ADMIN_ENABLED: bool = False
+    ADMIN_TOKEN: Optional[str] = None
+    PROFILER_MAX_DURATION_S: float = 60.0
+    PROFILER_INTERVAL_MS: float = 5.0
+    LOOP_LAG_INTERVAL_S: float = 0.5
     
     LOG_LEVEL: str = "INFO"
     LOG_FORMAT: str = "json"
@@ -0,0 +1,124 @@
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional, Tuple
+
+from config import settings
+from zones import ZoneViolation
+
+PENDING = "pending"
+OPEN = "open"
+COOLDOWN = "cooldown"
+
+
+@dataclass
+class Incident:
+    state: str
+    first_seen: int
+    last_seen: int
+    violation: ZoneViolation
+    missing_ppe: Dict[str, None] = field(default_factory=dict)
+    started_at: int = 0
+    cooldown_until: int = 0
+
+
+class ViolationDebouncer:
+    
+    def __init__(
+        self,
+        min_dwell_ms: Optional[int] = None,
+        close_after_ms: Optional[int] = None,
+        cooldown_ms: Optional[int] = None
+    ):
+        self.min_dwell_ms = min_dwell_ms if min_dwell_ms is not None else settings.VIOLATION_MIN_DWELL_MS
+        self.close_after_ms = close_after_ms if close_after_ms is not None else settings.VIOLATION_CLOSE_AFTER_MS
+        self.cooldown_ms = cooldown_ms if cooldown_ms is not None else settings.VIOLATION_COOLDOWN_MS
+        self.incidents: Dict[Tuple[int, str], Incident] = {}
+    
+    @property
+    def open_count(self) -> int:
+        return sum(1 for i in self.incidents.values() if i.state == OPEN)
+    
+    def update(self, violations: List[ZoneViolation], timestamp: int) -> List[ZoneViolation]:
+        events = []
+        seen = set()
+        
+        for v in violations:
+            if v.person_track_id < 0:
+                continue
+            key = (v.person_track_id, v.zone_id)
+            seen.add(key)
+            incident = self.incidents.get(key)
+            
+            if incident is not None and incident.state == OPEN and timestamp - incident.last_seen > self.close_after_ms:
+                events.append(self._event(incident, "ended", incident.last_seen))
+                incident.state = COOLDOWN
+                incident.cooldown_until = incident.last_seen + self.cooldown_ms
+            
+            if incident is None or (incident.state == PENDING and timestamp - incident.last_seen > self.close_after_ms):
+                incident = self.incidents[key] = Incident(
+                    state=PENDING,
+                    first_seen=timestamp,
+                    last_seen=timestamp,
+                    violation=v,
+                    cooldown_until=incident.cooldown_until if incident else 0
+                )
+            elif incident.state == COOLDOWN:
+                incident.state = PENDING
+                incident.first_seen = timestamp
+                incident.missing_ppe.clear()
+            
+            incident.last_seen = timestamp
+            incident.violation = v
+            incident.missing_ppe.update(dict.fromkeys(v.missing_ppe))
+            
+            if (incident.state == PENDING
+                    and timestamp - incident.first_seen >= self.min_dwell_ms
+                    and timestamp >= incident.cooldown_until):
+                incident.state = OPEN
+                incident.started_at = incident.first_seen
+                events.append(self._event(incident, "started", timestamp))
+        
+        events.extend(self._expire(timestamp, seen))
+        return events
+    
+    def sweep(self, timestamp: int) -> List[ZoneViolation]:
+        return self._expire(timestamp, set())
+    
+    def _expire(self, timestamp: int, seen: set) -> List[ZoneViolation]:
+        events = []
+        
+        for key, incident in list(self.incidents.items()):
+            if key in seen:
+                continue
+            
+            if incident.state == OPEN and timestamp - incident.last_seen > self.close_after_ms:
+                events.append(self._event(incident, "ended", incident.last_seen))
+                incident.state = COOLDOWN
+                incident.cooldown_until = incident.last_seen + self.cooldown_ms
+            elif incident.state == PENDING and timestamp - incident.last_seen > self.close_after_ms:
+                if timestamp >= incident.cooldown_until:
+                    del self.incidents[key]
+                else:
+                    incident.state = COOLDOWN
+            elif incident.state == COOLDOWN and timestamp >= incident.cooldown_until:
+                del self.incidents[key]
+        
+        return events
+    
+    def flush(self) -> List[ZoneViolation]:
+        events = [
+            self._event(incident, "ended", incident.last_seen)
+            for incident in self.incidents.values()
+            if incident.state == OPEN
+        ]
+        self.incidents.clear()
+        return events
+    
+    def _event(self, incident: Incident, event: str, timestamp: int) -> ZoneViolation:
+        return replace(
+            incident.violation,
+            missing_ppe=list(incident.missing_ppe),
+            timestamp=timestamp,
+            event=event,
+            started_at=incident.started_at,
+            duration_ms=incident.last_seen - incident.started_at if event == "ended" else 0
+        )
@@ -0,0 +1,181 @@
+import numpy as np
+from typing import List, Dict, Iterable, Iterator, Optional, Union
+
+from config import CLASS_NAMES, PERSON_CLASS
+from nms import box_coverage, box_iou
+
+CLASS_NAME_ARRAY = np.asarray(CLASS_NAMES, dtype=object)
+CLASS_IDS = {name: i for i, name in enumerate(CLASS_NAMES)}
+PERSON_CLASS_ID = CLASS_IDS[PERSON_CLASS]
+
+
+def class_ids_for(names: Iterable[str]) -> np.ndarray:
+    return np.asarray([CLASS_IDS[n] for n in names if n in CLASS_IDS], dtype=np.int32)
+
+
+class Detections:
+    
+    __slots__ = ('boxes', 'scores', 'class_ids', 'track_ids')
+    
+    def __init__(
+        self,
+        boxes: Optional[np.ndarray] = None,
+        scores: Optional[np.ndarray] = None,
+        class_ids: Optional[np.ndarray] = None,
+        track_ids: Optional[np.ndarray] = None
+    ):
+        self.boxes = np.asarray(boxes if boxes is not None else np.empty((0, 4)), dtype=np.int32).reshape(-1, 4)
+        n = len(self.boxes)
+        self.scores = np.asarray(scores if scores is not None else np.empty(0), dtype=np.float32).reshape(n)
+        self.class_ids = np.asarray(class_ids if class_ids is not None else np.empty(0), dtype=np.int32).reshape(n)
+        if track_ids is None:
+            self.track_ids = np.full(n, -1, dtype=np.int64)
+        else:
+            self.track_ids = np.asarray(track_ids, dtype=np.int64).reshape(n)
+    
+    @classmethod
+    def empty(cls) -> "Detections":
+        return cls()
+    
+    @classmethod
+    def from_list(cls, items: List[Dict]) -> "Detections":
+        if not items:
+            return cls()
+        return cls(
+            boxes=[d['bbox'] for d in items],
+            scores=[d['confidence'] for d in items],
+            class_ids=[d['class_id'] if 'class_id' in d else CLASS_IDS[d['class_name']] for d in items],
+            track_ids=[d.get('track_id', -1) for d in items]
+        )
+    
+    @classmethod
+    def from_any(cls, detections: Union["Detections", List[Dict], None]) -> "Detections":
+        if isinstance(detections, Detections):
+            return detections
+        return cls.from_list(detections or [])
+    
+    @classmethod
+    def concatenate(cls, parts: List["Detections"]) -> "Detections":
+        parts = [p for p in parts if len(p)]
+        if not parts:
+            return cls()
+        return cls(
+            boxes=np.concatenate([p.boxes for p in parts]),
+            scores=np.concatenate([p.scores for p in parts]),
+            class_ids=np.concatenate([p.class_ids for p in parts]),
+            track_ids=np.concatenate([p.track_ids for p in parts])
+        )
+    
+    def __len__(self) -> int:
+        return len(self.boxes)
+    
+    def __bool__(self) -> bool:
+        return len(self.boxes) > 0
+    
+    def __iter__(self) -> Iterator[Dict]:
+        return iter(self.to_list())
+    
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            return self._to_dict(int(index))
+        return self.select(index)
+    
+    def __repr__(self) -> str:
+        return f"Detections(n={len(self)})"
+    
+    @property
+    def class_names(self) -> np.ndarray:
+        return CLASS_NAME_ARRAY[self.class_ids]
+    
+    @property
+    def centers(self) -> np.ndarray:
+        return (self.boxes[:, :2] + self.boxes[:, 2:]) / 2
+    
+    @property
+    def bottom_centers(self) -> np.ndarray:
+        return np.stack([(self.boxes[:, 0] + self.boxes[:, 2]) / 2, self.boxes[:, 3]], axis=1)
+    
+    @property
+    def areas(self) -> np.ndarray:
+        wh = np.clip(self.boxes[:, 2:] - self.boxes[:, :2], 0, None)
+        return wh[:, 0] * wh[:, 1]
+    
+    def select(self, index) -> "Detections":
+        return Detections(
+            boxes=self.boxes[index],
+            scores=self.scores[index],
+            class_ids=self.class_ids[index],
+            track_ids=self.track_ids[index]
+        )
+    
+    def filter(self, mask: np.ndarray) -> "Detections":
+        return self.select(np.asarray(mask, dtype=bool))
+    
+    def class_mask(self, names: Iterable[str]) -> np.ndarray:
+        return np.isin(self.class_ids, class_ids_for(names))
+    
+    def by_class(self, names: Iterable[str]) -> "Detections":
+        return self.filter(self.class_mask(names))
+    
+    def above(self, threshold: float) -> "Detections":
+        return self.filter(self.scores > threshold)
+    
+    def class_counts(self, num_classes: int = len(CLASS_NAMES)) -> np.ndarray:
+        return np.bincount(self.class_ids, minlength=num_classes)
+    
+    def iou(self, other: Optional["Detections"] = None) -> np.ndarray:
+        other = self if other is None else other
+        return box_iou(self.boxes.astype(np.float32), other.boxes.astype(np.float32))
+    
+    def coverage(self, other: "Detections") -> np.ndarray:
+        return box_coverage(self.boxes.astype(np.float32), other.boxes.astype(np.float32))
+    
+    def with_track_ids(self, track_ids: np.ndarray) -> "Detections":
+        return Detections(self.boxes, self.scores, self.class_ids, track_ids)
+    
+    def _to_dict(self, i: int) -> Dict:
+        det = {
+            'class_id': int(self.class_ids[i]),
+            'class_name': CLASS_NAMES[self.class_ids[i]],
+            'confidence': float(self.scores[i]),
+            'bbox': self.boxes[i].tolist()
+        }
+        if self.track_ids[i] >= 0:
+            det['track_id'] = int(self.track_ids[i])
+        return det
+    
+    def to_list(self) -> List[Dict]:
+        boxes = self.boxes.tolist()
+        scores = self.scores.tolist()
+        class_ids = self.class_ids.tolist()
+        track_ids = self.track_ids.tolist()
+        
+        result = []
+        for i in range(len(boxes)):
+            det = {
+                'class_id': class_ids[i],
+                'class_name': CLASS_NAMES[class_ids[i]],
+                'confidence': scores[i],
+                'bbox': boxes[i]
+            }
+            if track_ids[i] >= 0:
+                det['track_id'] = track_ids[i]
+            result.append(det)
+        return result
+    
+    def to_proto(self, pb2) -> List:
+        boxes = self.boxes.tolist()
+        scores = self.scores.tolist()
+        class_ids = self.class_ids.tolist()
+        track_ids = self.track_ids.tolist()
+        
+        return [
+            pb2.Detection(
+                class_id=class_ids[i],
+                class_name=CLASS_NAMES[class_ids[i]],
+                confidence=scores[i],
+                bbox=pb2.BoundingBox(x1=boxes[i][0], y1=boxes[i][1], x2=boxes[i][2], y2=boxes[i][3]),
+                track_id=track_ids[i]
+            )
+            for i in range(len(boxes))
+        ]
@@ -1,14 +1,13 @@
+import copy
+import threading
+import time
+from dataclasses import dataclass, replace
+from pathlib import Path
 import numpy as np
 import cv2
-from typing import List, Dict, Optional, Tuple
+from typing import Iterable, List, Dict, Optional, Sequence, Tuple, Union
 import structlog
 
-try:
-    import onnxruntime as ort
-    ONNX_AVAILABLE = True
-except ImportError:
-    ONNX_AVAILABLE = False
-
 try:
     from ultralytics import YOLO
     ULTRALYTICS_AVAILABLE = True
@@ -16,9 +15,102 @@ except ImportError:
     ULTRALYTICS_AVAILABLE = False
 
 from config import settings, CLASS_NAMES, PPE_CLASSES, VIOLATION_CLASSES
+from nms import non_max_suppression, xywh_to_xyxy
+from detections import Detections, CLASS_IDS, PERSON_CLASS_ID, class_ids_for
+from ppe import MISSING_NAMES
+from onnx_session import ONNX_AVAILABLE, SessionRunner, create_session
+from timings import StageTimings, TimingsTarget, group, stage
 
 logger = structlog.get_logger()
 
+INFERENCE_BACKENDS = ("auto", "onnx", "pytorch", "stub")
+ONNX_PRECISIONS = ("fp32", "int8")
+QUANTIZED_SUFFIX = "_int8"
+
+
+@dataclass(frozen=True)
+class InferenceOptions:
+    conf_threshold: Optional[float] = None
+    classes: Optional[Tuple[str, ...]] = None
+    input_size: Optional[int] = None
+    
+    @classmethod
+    def create(
+        cls,
+        conf_threshold: Optional[float] = None,
+        classes: Optional[Iterable[str]] = None
+    ) -> Optional["InferenceOptions"]:
+        if conf_threshold is not None and conf_threshold <= 0:
+            conf_threshold = None
+        if conf_threshold is not None and conf_threshold > 1:
+            raise ValueError(f"Confidence threshold must be in (0, 1], got {conf_threshold}")
+        
+        classes = tuple(dict.fromkeys(c.strip() for c in classes or () if c and c.strip()))
+        unknown = [c for c in classes if c not in CLASS_IDS]
+        if unknown:
+            raise ValueError(f"Unknown classes: {', '.join(unknown)}")
+        
+        if conf_threshold is None and not classes:
+            return None
+        return cls(conf_threshold=conf_threshold, classes=classes or None)
+    
+    @classmethod
+    def with_input_size(cls, options: Optional["InferenceOptions"], input_size: int) -> "InferenceOptions":
+        return replace(options or cls(), input_size=input_size)
+    
+    @property
+    def class_ids(self) -> Optional[np.ndarray]:
+        return class_ids_for(self.classes) if self.classes else None
+
+
+OptionsList = Optional[Sequence[Optional[InferenceOptions]]]
+
+
+class InputBufferPool:
+    
+    def __init__(self, input_size: int, batch_size: int):
+        self.input_size = input_size
+        self.batch_size = max(1, batch_size)
+        self._local = threading.local()
+    
+    def get(self) -> Tuple[np.ndarray, np.ndarray]:
+        buffers = getattr(self._local, 'buffers', None)
+        if buffers is None:
+            size = self.input_size
+            blob = np.empty((self.batch_size, 3, size, size), dtype=np.float32)
+            canvas = np.empty((size, size, 3), dtype=np.uint8)
+            buffers = self._local.buffers = (blob, canvas)
+        return buffers
+
+
+def synthetic_detections(frame_shape: Tuple[int, int], t: float, persons: int) -> Detections:
+    if persons <= 0:
+        return Detections.empty()
+    
+    h, w = frame_shape
+    index = np.arange(persons)
+    phase = index * 2 * np.pi / persons
+    cx = w * (0.5 + 0.4 * np.sin(0.2 * t + phase))
+    cy = h * (0.5 + 0.3 * np.sin(0.13 * t + 2 * phase))
+    pw, ph = 0.06 * w, 0.25 * h
+    
+    x1, y1, x2 = cx - pw / 2, cy - ph / 2, cx + pw / 2
+    person = np.stack([x1, y1, x2, y1 + ph], axis=1)
+    head = np.stack([x1 + 0.2 * pw, y1, x2 - 0.2 * pw, y1 + 0.18 * ph], axis=1)
+    torso = np.stack([x1, y1 + 0.25 * ph, x2, y1 + 0.6 * ph], axis=1)
+    
+    hardhat = np.where(index % 3 == 0, CLASS_IDS['NO-Hardhat'], CLASS_IDS['Hardhat'])
+    vest = np.where(index % 4 == 1, CLASS_IDS['NO-Safety Vest'], CLASS_IDS['Safety Vest'])
+    
+    boxes = np.concatenate([person, head, torso])
+    boxes[:, [0, 2]] = np.clip(boxes[:, [0, 2]], 0, w)
+    boxes[:, [1, 3]] = np.clip(boxes[:, [1, 3]], 0, h)
+    return Detections(
+        boxes=boxes,
+        scores=np.repeat(np.float32([0.9, 0.8, 0.75]), persons),
+        class_ids=np.concatenate([np.full(persons, PERSON_CLASS_ID), hardhat, vest])
+    )
+
 
 class Detector:
     
@@ -26,40 +118,148 @@ class Detector:
         self,
         model_path: Optional[str] = None,
         conf_threshold: float = 0.5,
-        use_onnx: bool = True
+        backend: Optional[str] = None,
+        intra_op_threads: Optional[int] = None,
+        input_size: Optional[int] = None
     ):
         self.conf_threshold = conf_threshold
         self.nms_threshold = settings.NMS_THRESHOLD
         self.class_names = CLASS_NAMES
         self.model = None
         self.session = None
+        self.runner = None
         self.backend = None
+        self.precision = None
+        self.fixed_batch = None
+        self.input_shape = None
+        self.input_size = input_size or settings.MODEL_INPUT_SIZE
+        self.buffers = InputBufferPool(self.input_size, settings.BATCH_MAX_SIZE)
+        self.intra_op_threads = intra_op_threads
+        self._variants: Dict[int, "Detector"] = {}
+        self._variants_lock = threading.Lock()
         
         model_path = model_path or settings.MODEL_PATH
+        backend = backend or settings.INFERENCE_BACKEND
+        if backend not in INFERENCE_BACKENDS:
+            raise ValueError(f"Unknown inference backend '{backend}', expected one of {INFERENCE_BACKENDS}")
+        if settings.ONNX_PRECISION not in ONNX_PRECISIONS:
+            raise ValueError(f"Unknown ONNX precision '{settings.ONNX_PRECISION}', expected one of {ONNX_PRECISIONS}")
+        if backend == "auto":
+            prefers_onnx = model_path.endswith('.onnx') or settings.ONNX_PRECISION == "int8"
+            backend = "onnx" if ONNX_AVAILABLE and prefers_onnx else "pytorch"
         
-        if use_onnx and ONNX_AVAILABLE and model_path.endswith('.onnx'):
-            self._load_onnx(model_path)
+        if backend == "stub":
+            self._load_stub()
+        elif backend == "onnx":
+            if not ONNX_AVAILABLE:
+                raise RuntimeError("INFERENCE_BACKEND is 'onnx' but onnxruntime is not installed")
+            model_path = self._resolve_onnx_path(model_path)
+            self._load_onnx(model_path, intra_op_threads)
         elif ULTRALYTICS_AVAILABLE:
             fallback = settings.MODEL_FALLBACK_PATH
             self._load_pytorch(fallback if not model_path.endswith('.pt') else model_path)
         else:
             raise RuntimeError("No inference backend available")
         
+        self.model_path = model_path
+        self._variants[self.input_size] = self
         logger.info("detector_initialized", backend=self.backend, model=model_path)
     
-    def _load_onnx(self, model_path: str):
-        providers = ['CUDAExecutionProvider', 'CPUExecutionProvider']
-        if settings.USE_TENSORRT:
-            providers.insert(0, 'TensorrtExecutionProvider')
-        
-        self.session = ort.InferenceSession(model_path, providers=providers)
+    @staticmethod
+    def _resolve_onnx_path(model_path: str) -> str:
+        path = Path(model_path).with_suffix('.onnx')
+        if settings.ONNX_PRECISION == "int8" and not path.stem.endswith(QUANTIZED_SUFFIX):
+            quantized = path.with_name(f"{path.stem}{QUANTIZED_SUFFIX}.onnx")
+            if quantized.exists():
+                return str(quantized)
+            logger.warning("onnx_int8_model_missing", path=str(quantized), fallback=str(path))
+        if not path.exists():
+            raise RuntimeError(f"No ONNX model found for {model_path}")
+        return str(path)
+    
+    def _load_onnx(self, model_path: str, intra_op_threads: Optional[int] = None):
+        self.session = create_session(model_path, intra_op_threads=intra_op_threads)
+        self.runner = SessionRunner(self.session, io_binding=settings.ONNX_IO_BINDING)
         self.backend = "onnx"
+        self.precision = "int8" if Path(model_path).stem.endswith(QUANTIZED_SUFFIX) else "fp32"
         
         input_info = self.session.get_inputs()[0]
         self.input_name = input_info.name
         self.input_shape = input_info.shape
         
-        logger.info("onnx_loaded", providers=self.session.get_providers())
+        if isinstance(self.input_shape[2], int):
+            self.input_size = self.input_shape[2]
+        if isinstance(self.input_shape[0], int):
+            self.fixed_batch = self.input_shape[0]
+        
+        self.buffers = InputBufferPool(self.input_size, self.fixed_batch or settings.BATCH_MAX_SIZE)
+        
+        logger.info(
+            "onnx_loaded",
+            providers=self.session.get_providers(),
+            precision=self.precision,
+            graph_optimization=settings.ONNX_GRAPH_OPTIMIZATION,
+            io_binding=settings.ONNX_IO_BINDING,
+            input_size=self.input_size,
+            fixed_batch=self.fixed_batch,
+            batching=self.supports_batching
+        )
+    
+    @property
+    def fixed_input_size(self) -> bool:
+        return self.backend == "onnx" and isinstance(self.input_shape[2], int)
+    
+    def _variant_path(self, input_size: int) -> Path:
+        path = Path(self.model_path)
+        stem, suffix = path.stem, ""
+        if stem.endswith(QUANTIZED_SUFFIX):
+            stem, suffix = stem[:-len(QUANTIZED_SUFFIX)], QUANTIZED_SUFFIX
+        if stem.endswith(f"_{self.input_size}"):
+            stem = stem[:-len(f"_{self.input_size}")]
+        return path.with_name(f"{stem}_{input_size}{suffix}.onnx")
+    
+    def supports_input_size(self, input_size: int) -> bool:
+        if input_size == self.input_size or not self.fixed_input_size:
+            return True
+        return self._variant_path(input_size).exists()
+    
+    def at_input_size(self, input_size: Optional[int]) -> "Detector":
+        input_size = input_size or self.input_size
+        variant = self._variants.get(input_size)
+        if variant is not None:
+            return variant
+        
+        with self._variants_lock:
+            variant = self._variants.get(input_size)
+            if variant is None:
+                variant = self._variants[input_size] = self._create_variant(input_size)
+        return variant
+    
+    def _create_variant(self, input_size: int) -> "Detector":
+        if self.fixed_input_size:
+            path = self._variant_path(input_size)
+            if not path.exists():
+                raise ValueError(f"No ONNX model exported at input size {input_size}: {path}")
+            variant = Detector(
+                model_path=str(path),
+                conf_threshold=self.conf_threshold,
+                backend="onnx",
+                intra_op_threads=self.intra_op_threads,
+                input_size=input_size
+            )
+            if variant.input_size != input_size:
+                raise ValueError(f"{path} has input size {variant.input_size}, expected {input_size}")
+        else:
+            variant = copy.copy(self)
+            variant.input_size = input_size
+            variant.buffers = InputBufferPool(input_size, self.buffers.batch_size)
+        
+        logger.info("detector_input_size_added", backend=self.backend, input_size=input_size)
+        return variant
+    
+    def _load_stub(self):
+        self.backend = "stub"
+        logger.info("stub_loaded", persons=settings.STUB_PERSONS, inference_ms=settings.STUB_INFERENCE_MS)
     
     def _load_pytorch(self, model_path: str):
         self.model = YOLO(model_path)
@@ -67,108 +267,302 @@ class Detector:
         logger.info("pytorch_loaded", model=model_path)
     
     def preprocess(self, frame: np.ndarray) -> Tuple[np.ndarray, Tuple[int, int], float]:
+        blob, canvas = self.buffers.get()
+        original_shape, scale = self._letterbox_into(frame, blob[0], canvas)
+        return blob[:1], original_shape, scale
+    
+    def _letterbox_into(
+        self,
+        frame: np.ndarray,
+        out: np.ndarray,
+        canvas: np.ndarray
+    ) -> Tuple[Tuple[int, int], float]:
         original_shape = frame.shape[:2]
         
-        input_size = 640
+        input_size = self.input_size
         scale = min(input_size / original_shape[0], input_size / original_shape[1])
         new_h, new_w = int(original_shape[0] * scale), int(original_shape[1] * scale)
         
-        resized = cv2.resize(frame, (new_w, new_h))
+        cv2.resize(frame, (new_w, new_h), dst=canvas[:new_h, :new_w])
+        canvas[new_h:, :] = 114
+        canvas[:new_h, new_w:] = 114
         
-        padded = np.full((input_size, input_size, 3), 114, dtype=np.uint8)
-        padded[:new_h, :new_w] = resized
+        np.multiply(canvas.transpose(2, 0, 1), np.float32(1 / 255.0), out=out)
         
-        blob = padded.astype(np.float32) / 255.0
-        blob = blob.transpose(2, 0, 1)
-        blob = np.expand_dims(blob, 0)
-        
-        return blob, original_shape, scale
+        return original_shape, scale
+    
+    def conf_threshold_for(self, options: Optional[InferenceOptions] = None) -> float:
+        if options is not None and options.conf_threshold is not None:
+            return options.conf_threshold
+        return self.conf_threshold
+    
+    def apply_options(
+        self,
+        detections: Detections,
+        options: Optional[InferenceOptions] = None
+    ) -> Detections:
+        detections = detections.above(self.conf_threshold_for(options))
+        if options is not None and options.classes:
+            detections = detections.by_class(options.classes)
+        return detections
     
     def postprocess(
         self,
         outputs: np.ndarray,
         original_shape: Tuple[int, int],
-        scale: float
-    ) -> List[Dict]:
-        predictions = outputs[0].T
-        
-        boxes = predictions[:, :4]
+        scale: float,
+        options: Optional[InferenceOptions] = None
+    ) -> Detections:
+        return self.postprocess_batch(outputs[:1], [original_shape], [scale], [options])[0]
+    
+    def postprocess_batch(
+        self,
+        outputs: np.ndarray,
+        original_shapes: List[Tuple[int, int]],
+        scales: List[float],
+        options: OptionsList = None
+    ) -> List[Detections]:
+        options = options or [None] * len(scales)
+        return [
+            self._postprocess_predictions(predictions.T, original_shape, scale, frame_options)
+            for predictions, original_shape, scale, frame_options
+            in zip(outputs, original_shapes, scales, options)
+        ]
+    
+    def _postprocess_predictions(
+        self,
+        predictions: np.ndarray,
+        original_shape: Tuple[int, int],
+        scale: float,
+        options: Optional[InferenceOptions] = None
+    ) -> Detections:
         scores = predictions[:, 4:]
         
         class_ids = np.argmax(scores, axis=1)
         confidences = scores[np.arange(len(scores)), class_ids]
         
-        mask = confidences > self.conf_threshold
-        boxes = boxes[mask]
+        mask = confidences > self.conf_threshold_for(options)
+        if options is not None and options.classes:
+            mask &= np.isin(class_ids, options.class_ids)
+        if not mask.any():
+            return Detections.empty()
+        
+        boxes = xywh_to_xyxy(predictions[mask, :4])
         class_ids = class_ids[mask]
         confidences = confidences[mask]
         
-        if len(boxes) == 0:
-            return []
+        keep = non_max_suppression(
+            boxes,
+            confidences,
+            class_ids,
+            iou_threshold=self.nms_threshold,
+            top_k=settings.NMS_TOP_K,
+            max_candidates=settings.NMS_MAX_CANDIDATES
+        )
+        boxes = boxes[keep] / scale
+        class_ids = class_ids[keep]
+        confidences = confidences[keep]
         
-        x_center, y_center, width, height = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
-        x1 = (x_center - width / 2) / scale
-        y1 = (y_center - height / 2) / scale
-        x2 = (x_center + width / 2) / scale
-        y2 = (y_center + height / 2) / scale
-        
-        x1 = np.clip(x1, 0, original_shape[1])
-        y1 = np.clip(y1, 0, original_shape[0])
-        x2 = np.clip(x2, 0, original_shape[1])
-        y2 = np.clip(y2, 0, original_shape[0])
-        
-        detections = []
-        for i in range(len(boxes)):
-            detections.append({
-                'class_id': int(class_ids[i]),
-                'class_name': self.class_names[class_ids[i]],
-                'confidence': float(confidences[i]),
-                'bbox': [int(x1[i]), int(y1[i]), int(x2[i]), int(y2[i])]
-            })
+        boxes[:, [0, 2]] = np.clip(boxes[:, [0, 2]], 0, original_shape[1])
+        boxes[:, [1, 3]] = np.clip(boxes[:, [1, 3]], 0, original_shape[0])
         
-        return detections
+        return Detections(boxes=boxes, scores=confidences, class_ids=class_ids)
+    
+    def detect(
+        self,
+        frame: np.ndarray,
+        options: Optional[InferenceOptions] = None,
+        timings: Optional[StageTimings] = None
+    ) -> Detections:
+        if options is not None and options.input_size and options.input_size != self.input_size:
+            return self.at_input_size(options.input_size).detect(frame, options, timings)
+        if self.backend == "onnx":
+            return self._detect_onnx(frame, options, timings)
+        elif self.backend == "stub":
+            return self._detect_stub([frame], [options], [timings])[0]
+        else:
+            return self._detect_pytorch(frame, options, timings)
     
-    def detect(self, frame: np.ndarray) -> List[Dict]:
+    def detect_batch(
+        self,
+        frames: List[np.ndarray],
+        options: OptionsList = None,
+        timings: Optional[Sequence[Optional[StageTimings]]] = None
+    ) -> List[Detections]:
+        if not frames:
+            return []
+        options = list(options) if options else [None] * len(frames)
+        timings = list(timings) if timings else [None] * len(frames)
+        
+        sizes = [o.input_size if o is not None and o.input_size else self.input_size for o in options]
+        if any(size != self.input_size for size in sizes):
+            return self._detect_by_input_size(frames, options, timings, sizes)
+        
         if self.backend == "onnx":
-            return self._detect_onnx(frame)
+            return self._detect_onnx_batch(frames, options, timings)
+        elif self.backend == "stub":
+            return self._detect_stub(frames, options, timings)
         else:
-            return self._detect_pytorch(frame)
+            return self._detect_pytorch_batch(frames, options, timings)
+    
+    def _detect_by_input_size(
+        self,
+        frames: List[np.ndarray],
+        options: List[Optional[InferenceOptions]],
+        timings: List[Optional[StageTimings]],
+        sizes: List[int]
+    ) -> List[Detections]:
+        results: List[Optional[Detections]] = [None] * len(frames)
+        for size in dict.fromkeys(sizes):
+            index = [i for i, s in enumerate(sizes) if s == size]
+            detected = self.at_input_size(size).detect_batch(
+                [frames[i] for i in index],
+                [options[i] for i in index],
+                [timings[i] for i in index]
+            )
+            for i, detections in zip(index, detected):
+                results[i] = detections
+        return results
+    
+    @property
+    def supports_batching(self) -> bool:
+        if self.backend == "onnx":
+            return self.fixed_batch != 1
+        return True
     
-    def _detect_onnx(self, frame: np.ndarray) -> List[Dict]:
-        blob, original_shape, scale = self.preprocess(frame)
-        outputs = self.session.run(None, {self.input_name: blob})
-        return self.postprocess(outputs[0], original_shape, scale)
+    def _run_onnx(self, count: int) -> np.ndarray:
+        blob = self.buffers.get()[0]
+        return self.runner.run(blob[:self.fixed_batch or count])[0][:count]
     
-    def _detect_pytorch(self, frame: np.ndarray) -> List[Dict]:
-        results = self.model(frame, conf=self.conf_threshold, verbose=False)
+    def _detect_onnx(
+        self,
+        frame: np.ndarray,
+        options: Optional[InferenceOptions] = None,
+        timings: TimingsTarget = None
+    ) -> Detections:
+        with stage(timings, "preprocess"):
+            _, original_shape, scale = self.preprocess(frame)
+        with stage(timings, "inference"):
+            outputs = self._run_onnx(1)
+        with stage(timings, "postprocess"):
+            return self.postprocess(outputs, original_shape, scale, options)
+    
+    def _detect_onnx_batch(
+        self,
+        frames: List[np.ndarray],
+        options: List[Optional[InferenceOptions]],
+        timings: List[Optional[StageTimings]]
+    ) -> List[Detections]:
+        if len(frames) == 1 or not self.supports_batching:
+            return [self._detect_onnx(frame, o, t) for frame, o, t in zip(frames, options, timings)]
         
-        detections = []
-        for result in results:
-            for box in result.boxes:
-                class_id = int(box.cls[0])
-                detections.append({
-                    'class_id': class_id,
-                    'class_name': self.class_names[class_id],
-                    'confidence': float(box.conf[0]),
-                    'bbox': [int(x) for x in box.xyxy[0].tolist()]
-                })
+        blob, canvas = self.buffers.get()
+        chunk_size = len(blob)
         
-        return detections
+        results = []
+        for offset in range(0, len(frames), chunk_size):
+            chunk = frames[offset:offset + chunk_size]
+            chunk_timings = group(timings[offset:offset + chunk_size])
+            
+            with stage(chunk_timings, "preprocess"):
+                prepared = [self._letterbox_into(frame, blob[i], canvas) for i, frame in enumerate(chunk)]
+            with stage(chunk_timings, "inference"):
+                outputs = self._run_onnx(len(chunk))
+            
+            with stage(chunk_timings, "postprocess"):
+                results.extend(self.postprocess_batch(
+                    outputs,
+                    [p[0] for p in prepared],
+                    [p[1] for p in prepared],
+                    options[offset:offset + chunk_size]
+                ))
+        
+        return results
     
-    def check_safety(self, detections: List[Dict]) -> Dict:
-        violations = []
-        people_count = 0
-        violation_count = 0
+    def _detect_stub(
+        self,
+        frames: List[np.ndarray],
+        options: List[Optional[InferenceOptions]],
+        timings: List[Optional[StageTimings]]
+    ) -> List[Detections]:
+        batch_timings = group(timings)
+        with stage(batch_timings, "inference"):
+            if settings.STUB_INFERENCE_MS > 0:
+                time.sleep(settings.STUB_INFERENCE_MS / 1000 * (self.input_size / settings.MODEL_INPUT_SIZE) ** 2)
+            now = time.monotonic()
+            results = [synthetic_detections(frame.shape[:2], now, settings.STUB_PERSONS) for frame in frames]
+        with stage(batch_timings, "postprocess"):
+            return [self.apply_options(detections, o) for detections, o in zip(results, options)]
+    
+    def _detect_pytorch(
+        self,
+        frame: np.ndarray,
+        options: Optional[InferenceOptions] = None,
+        timings: Optional[StageTimings] = None
+    ) -> Detections:
+        class_ids = options.class_ids if options is not None else None
+        results = self.model(
+            frame,
+            conf=self.conf_threshold_for(options),
+            imgsz=self.input_size,
+            classes=class_ids.tolist() if class_ids is not None else None,
+            verbose=False
+        )
+        for result in results:
+            self._record_speed(result, timings)
+        return Detections.concatenate([self._parse_pytorch_result(result) for result in results])
+    
+    def _detect_pytorch_batch(
+        self,
+        frames: List[np.ndarray],
+        options: List[Optional[InferenceOptions]],
+        timings: List[Optional[StageTimings]]
+    ) -> List[Detections]:
+        conf = min(self.conf_threshold_for(o) for o in options)
+        results = self.model(frames, conf=conf, imgsz=self.input_size, verbose=False)
+        for result, t in zip(results, timings):
+            self._record_speed(result, t)
+        return [
+            self.apply_options(self._parse_pytorch_result(result), o)
+            for result, o in zip(results, options)
+        ]
+    
+    def _record_speed(self, result, timings: Optional[StageTimings]):
+        speed = getattr(result, 'speed', None)
+        if timings is None or not speed:
+            return
+        for name in ("preprocess", "inference", "postprocess"):
+            if speed.get(name) is not None:
+                timings.add(name, speed[name] / 1000)
+    
+    def _parse_pytorch_result(self, result) -> Detections:
+        boxes = result.boxes
+        if boxes is None or len(boxes) == 0:
+            return Detections.empty()
+        return Detections(
+            boxes=boxes.xyxy.cpu().numpy(),
+            scores=boxes.conf.cpu().numpy(),
+            class_ids=boxes.cls.cpu().numpy()
+        )
+    
+    def check_safety(
+        self,
+        detections: Union[Detections, List[Dict]],
+        ppe_status: Optional[np.ndarray] = None
+    ) -> Dict:
+        detections = Detections.from_any(detections)
+        counts = detections.class_counts()
         
-        for det in detections:
-            class_name = det['class_name']
-            if class_name == 'Person':
-                people_count += 1
-            elif class_name in VIOLATION_CLASSES:
-                violations.append(class_name)
-                violation_count += 1
+        people_count = int(counts[PERSON_CLASS_ID])
+        if ppe_status is None:
+            violations = detections.class_names[detections.class_mask(VIOLATION_CLASSES)].tolist()
+            compliant = max(0, people_count - len(violations))
+        else:
+            missing = ppe_status < 0
+            violations = np.broadcast_to(MISSING_NAMES, missing.shape)[missing].tolist()
+            compliant = int((~missing.any(axis=1)).sum())
+        violation_count = len(violations)
         
-        compliant = max(0, people_count - violation_count)
         rate = (compliant / people_count * 100) if people_count > 0 else 100.0
         
         return {
@@ -180,7 +574,7 @@ class Detector:
             'compliance_rate': round(rate, 1)
         }
     
-    def draw_detections(self, frame: np.ndarray, detections: List[Dict]) -> np.ndarray:
+    def draw_detections(self, frame: np.ndarray, detections: Union[Detections, List[Dict]]) -> np.ndarray:
         annotated = frame.copy()
         
         COLOR_SAFE = (0, 255, 0)
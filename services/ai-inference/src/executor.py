@@ -0,0 +1,102 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Optional, Tuple
+import structlog
+
+from config import settings
+
+logger = structlog.get_logger()
+
+
+class PoolSaturatedError(RuntimeError):
+    pass
+
+
+def thread_split(cpu_count: Optional[int] = None) -> Tuple[int, int]:
+    cores = max(1, cpu_count or os.cpu_count() or 1)
+    workers = settings.INFERENCE_WORKERS
+    intra_op_threads = settings.ONNX_INTRA_OP_THREADS
+    
+    if workers <= 0:
+        if intra_op_threads > 0:
+            workers = max(1, cores // intra_op_threads)
+        else:
+            workers = min(InferencePool.DEFAULT_WORKERS, cores)
+    if intra_op_threads <= 0:
+        intra_op_threads = max(1, cores // workers)
+    
+    logger.info("inference_threads_configured",
+                cores=cores,
+                workers=workers,
+                intra_op_threads=intra_op_threads)
+    return workers, intra_op_threads
+
+
+class InferencePool:
+    
+    DEFAULT_WORKERS = 4
+    
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_pending: Optional[int] = None
+    ):
+        self.max_workers = max(1, max_workers or thread_split()[0])
+        self.max_pending = max(1, max_pending or settings.INFERENCE_MAX_PENDING)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="inference"
+        )
+        self._pending = 0
+        self._lock = threading.Lock()
+        
+        logger.info("inference_pool_started",
+                    workers=self.max_workers,
+                    max_pending=self.max_pending)
+    
+    @property
+    def pending(self) -> int:
+        return self._pending
+    
+    @property
+    def queued(self) -> int:
+        return self._executor._work_queue.qsize()
+    
+    def acquire(self):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise PoolSaturatedError(
+                    f"Inference queue full ({self._pending}/{self.max_pending})"
+                )
+            self._pending += 1
+    
+    def release(self):
+        with self._lock:
+            self._pending = max(0, self._pending - 1)
+    
+    def admit(self) -> "_Admission":
+        self.acquire()
+        return _Admission(self)
+    
+    async def run(self, fn: Callable, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(fn, *args, **kwargs))
+    
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+        logger.info("inference_pool_stopped")
+
+
+class _Admission:
+    
+    def __init__(self, pool: InferencePool):
+        self._pool = pool
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *args):
+        self._pool.release()
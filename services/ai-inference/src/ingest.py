@@ -0,0 +1,249 @@
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+import cv2
+import structlog
+
+from config import settings
+from executor import PoolSaturatedError
+from results import ResultHub
+
+logger = structlog.get_logger()
+
+FrameHandler = Callable[[str, np.ndarray], Dict]
+
+
+@dataclass
+class StreamSource:
+    camera_id: str
+    url: str
+    fps: Optional[float] = None
+    loop: bool = True
+    
+    @property
+    def is_file(self) -> bool:
+        return "://" not in self.url and Path(self.url).exists()
+
+
+class LatestFrameSlot:
+    
+    def __init__(self):
+        self._frame: Optional[np.ndarray] = None
+        self._seq = 0
+        self._consumed_seq = 0
+        self._condition = threading.Condition()
+        self.received = 0
+        self.dropped = 0
+    
+    def put(self, frame: np.ndarray):
+        with self._condition:
+            if self._frame is not None and self._seq != self._consumed_seq:
+                self.dropped += 1
+            self._frame = frame
+            self._seq += 1
+            self.received += 1
+            self._condition.notify_all()
+    
+    def take(self, timeout: float) -> Optional[Tuple[int, np.ndarray]]:
+        with self._condition:
+            if self._seq == self._consumed_seq:
+                self._condition.wait(timeout)
+            if self._seq == self._consumed_seq or self._frame is None:
+                return None
+            self._consumed_seq = self._seq
+            return self._seq, self._frame
+
+
+class StreamWorker:
+    
+    def __init__(self, source: StreamSource, handler: FrameHandler, hub: ResultHub):
+        self.source = source
+        self.handler = handler
+        self.hub = hub
+        self.fps = source.fps or settings.STREAM_FPS.get(source.camera_id, settings.STREAM_DEFAULT_FPS)
+        self.slot = LatestFrameSlot()
+        self.processed = 0
+        self.rejected = 0
+        self.errors = 0
+        self.connected = False
+        self.finished = False
+        self.last_error: Optional[str] = None
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+    
+    def start(self):
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._read_loop, name=f"ingest-read-{self.source.camera_id}", daemon=True),
+            threading.Thread(target=self._process_loop, name=f"ingest-proc-{self.source.camera_id}", daemon=True)
+        ]
+        for thread in self._threads:
+            thread.start()
+        logger.info("stream_started", camera_id=self.source.camera_id, url=self.source.url, fps=self.fps)
+    
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        logger.info("stream_stopped", camera_id=self.source.camera_id)
+    
+    @property
+    def running(self) -> bool:
+        return any(t.is_alive() for t in self._threads)
+    
+    def status(self) -> Dict:
+        return {
+            'camera_id': self.source.camera_id,
+            'url': self.source.url,
+            'fps': self.fps,
+            'running': self.running,
+            'connected': self.connected,
+            'finished': self.finished,
+            'frames_received': self.slot.received,
+            'frames_dropped': self.slot.dropped,
+            'frames_processed': self.processed,
+            'frames_rejected': self.rejected,
+            'errors': self.errors,
+            'last_error': self.last_error
+        }
+    
+    def _open(self) -> Optional[cv2.VideoCapture]:
+        capture = cv2.VideoCapture(self.source.url)
+        if not capture.isOpened():
+            capture.release()
+            return None
+        capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        return capture
+    
+    def _read_loop(self):
+        is_file = self.source.is_file
+        
+        while not self._stop.is_set():
+            capture = self._open()
+            if capture is None:
+                self.connected = False
+                self.last_error = "open_failed"
+                logger.warning("stream_open_failed", camera_id=self.source.camera_id, url=self.source.url)
+                self._stop.wait(settings.STREAM_RECONNECT_DELAY_S)
+                continue
+            
+            self.connected = True
+            native_fps = capture.get(cv2.CAP_PROP_FPS) or 0
+            frame_interval = 1.0 / native_fps if is_file and native_fps > 0 else 0
+            next_frame_at = time.perf_counter()
+            
+            while not self._stop.is_set():
+                ok, frame = capture.read()
+                if not ok:
+                    break
+                
+                self.slot.put(frame)
+                
+                if frame_interval:
+                    next_frame_at += frame_interval
+                    delay = next_frame_at - time.perf_counter()
+                    if delay > 0:
+                        self._stop.wait(delay)
+                    else:
+                        next_frame_at = time.perf_counter()
+            
+            capture.release()
+            self.connected = False
+            
+            if is_file and not self.source.loop:
+                self.finished = True
+                return
+            
+            if not is_file:
+                self.last_error = "stream_ended"
+                logger.warning("stream_disconnected", camera_id=self.source.camera_id)
+                self._stop.wait(settings.STREAM_RECONNECT_DELAY_S)
+    
+    def _process_loop(self):
+        interval = 1.0 / self.fps if self.fps > 0 else 0
+        next_run = time.perf_counter()
+        
+        while not self._stop.is_set():
+            if interval:
+                delay = next_run - time.perf_counter()
+                if delay > 0 and self._stop.wait(delay):
+                    return
+                next_run = max(next_run + interval, time.perf_counter())
+            
+            item = self.slot.take(timeout=0.5)
+            if item is None:
+                if self.finished:
+                    return
+                continue
+            
+            _, frame = item
+            try:
+                result = self.handler(self.source.camera_id, frame)
+            except PoolSaturatedError:
+                self.rejected += 1
+                continue
+            except Exception as e:
+                self.errors += 1
+                self.last_error = str(e)
+                logger.error("stream_frame_failed", camera_id=self.source.camera_id, error=str(e))
+                continue
+            
+            self.processed += 1
+            self.hub.publish(self.source.camera_id, result)
+
+
+class StreamIngestor:
+    
+    def __init__(self, handler: FrameHandler, hub: ResultHub):
+        self.handler = handler
+        self.hub = hub
+        self.workers: Dict[str, StreamWorker] = {}
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def sources_from_settings(cls) -> List[StreamSource]:
+        return [
+            StreamSource(camera_id=camera_id, url=url, loop=settings.STREAM_LOOP_FILES)
+            for camera_id, url in settings.STREAM_SOURCES.items()
+        ]
+    
+    def add(self, source: StreamSource) -> StreamWorker:
+        with self._lock:
+            existing = self.workers.pop(source.camera_id, None)
+        if existing:
+            existing.stop()
+        
+        worker = StreamWorker(source, self.handler, self.hub)
+        with self._lock:
+            self.workers[source.camera_id] = worker
+        worker.start()
+        return worker
+    
+    def remove(self, camera_id: str) -> bool:
+        with self._lock:
+            worker = self.workers.pop(camera_id, None)
+        if worker is None:
+            return False
+        worker.stop()
+        self.hub.forget(camera_id)
+        return True
+    
+    def start(self, sources: Optional[List[StreamSource]] = None):
+        for source in sources if sources is not None else self.sources_from_settings():
+            self.add(source)
+    
+    def stop(self):
+        with self._lock:
+            workers = list(self.workers.values())
+            self.workers.clear()
+        for worker in workers:
+            worker.stop()
+    
+    def status(self) -> List[Dict]:
+        with self._lock:
+            workers = list(self.workers.values())
+        return [w.status() for w in workers]
@@ -0,0 +1,248 @@
+import numpy as np
+from typing import Optional, Tuple
+
+try:
+    from scipy.optimize import linear_sum_assignment
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+from detections import Detections
+from nms import box_iou
+
+STATE_DIM = 8
+MEASURE_DIM = 4
+STD_WEIGHT_POSITION = 1.0 / 20
+STD_WEIGHT_VELOCITY = 1.0 / 160
+
+TRANSITION = np.eye(STATE_DIM)
+TRANSITION[:MEASURE_DIM, MEASURE_DIM:] = np.eye(MEASURE_DIM)
+
+
+def xyxy_to_cxcywh(boxes: np.ndarray) -> np.ndarray:
+    wh = boxes[:, 2:4] - boxes[:, :2]
+    return np.concatenate([boxes[:, :2] + wh / 2, wh], axis=1)
+
+
+def cxcywh_to_xyxy(boxes: np.ndarray) -> np.ndarray:
+    half = np.clip(boxes[:, 2:4], 1, None) / 2
+    return np.concatenate([boxes[:, :2] - half, boxes[:, :2] + half], axis=1)
+
+
+def _diag(std: np.ndarray) -> np.ndarray:
+    n, d = std.shape
+    out = np.zeros((n, d, d))
+    out[:, np.arange(d), np.arange(d)] = std ** 2
+    return out
+
+
+class KalmanBoxFilter:
+    
+    @staticmethod
+    def initiate(measurements: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        n = len(measurements)
+        mean = np.concatenate([measurements, np.zeros((n, MEASURE_DIM))], axis=1)
+        scale = np.clip(measurements[:, 3:4], 1, None)
+        std = np.concatenate([
+            np.repeat(2 * STD_WEIGHT_POSITION * scale, MEASURE_DIM, axis=1),
+            np.repeat(10 * STD_WEIGHT_VELOCITY * scale, MEASURE_DIM, axis=1)
+        ], axis=1)
+        return mean, _diag(std)
+    
+    @staticmethod
+    def predict(mean: np.ndarray, covariance: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        scale = np.clip(mean[:, 3:4], 1, None)
+        std = np.concatenate([
+            np.repeat(STD_WEIGHT_POSITION * scale, MEASURE_DIM, axis=1),
+            np.repeat(STD_WEIGHT_VELOCITY * scale, MEASURE_DIM, axis=1)
+        ], axis=1)
+        mean = mean @ TRANSITION.T
+        covariance = TRANSITION @ covariance @ TRANSITION.T + _diag(std)
+        return mean, covariance
+    
+    @staticmethod
+    def update(
+        mean: np.ndarray,
+        covariance: np.ndarray,
+        measurements: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        scale = np.clip(mean[:, 3:4], 1, None)
+        noise = _diag(np.repeat(STD_WEIGHT_POSITION * scale, MEASURE_DIM, axis=1))
+        
+        projected = covariance[:, :MEASURE_DIM, :MEASURE_DIM] + noise
+        gain = np.linalg.solve(projected, covariance[:, :MEASURE_DIM, :]).transpose(0, 2, 1)
+        innovation = measurements - mean[:, :MEASURE_DIM]
+        
+        mean = mean + np.einsum('nij,nj->ni', gain, innovation)
+        covariance = covariance - gain @ covariance[:, :MEASURE_DIM, :]
+        return mean, covariance
+
+
+def greedy_assignment(scores: np.ndarray, threshold: float) -> Tuple[np.ndarray, np.ndarray]:
+    rows, cols = np.nonzero(scores >= threshold)
+    if not len(rows):
+        return rows, cols
+    
+    order = np.argsort(-scores[rows, cols], kind='stable')
+    rows, cols = rows[order], cols[order]
+    
+    row_used = np.zeros(scores.shape[0], dtype=bool)
+    col_used = np.zeros(scores.shape[1], dtype=bool)
+    keep = np.zeros(len(rows), dtype=bool)
+    for i, (r, c) in enumerate(zip(rows.tolist(), cols.tolist())):
+        if row_used[r] or col_used[c]:
+            continue
+        row_used[r] = col_used[c] = keep[i] = True
+    
+    return rows[keep], cols[keep]
+
+
+def optimal_assignment(scores: np.ndarray, threshold: float) -> Tuple[np.ndarray, np.ndarray]:
+    candidates = scores >= threshold
+    active_rows = np.flatnonzero(candidates.any(axis=1))
+    active_cols = np.flatnonzero(candidates.any(axis=0))
+    if not len(active_rows):
+        return active_rows, active_cols
+    
+    sub = scores[np.ix_(active_rows, active_cols)]
+    rows, cols = linear_sum_assignment(np.where(sub >= threshold, -sub, 0.0))
+    keep = sub[rows, cols] >= threshold
+    return active_rows[rows[keep]], active_cols[cols[keep]]
+
+
+def assign(scores: np.ndarray, threshold: float, method: str = "hungarian") -> Tuple[np.ndarray, np.ndarray]:
+    if not scores.size:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+    if method == "hungarian" and SCIPY_AVAILABLE:
+        return optimal_assignment(scores, threshold)
+    return greedy_assignment(scores, threshold)
+
+
+class IoUTracker:
+    
+    def __init__(
+        self,
+        iou_threshold: float = 0.3,
+        high_threshold: float = 0.5,
+        min_hits: int = 3,
+        max_age: int = 15,
+        assignment: str = "hungarian"
+    ):
+        self.iou_threshold = iou_threshold
+        self.high_threshold = high_threshold
+        self.min_hits = max(1, min_hits)
+        self.max_age = max_age
+        self.assignment = assignment
+        self.reset()
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    def reset(self):
+        self.next_id = 1
+        self.ids = np.empty(0, dtype=np.int64)
+        self.class_ids = np.empty(0, dtype=np.int32)
+        self.hits = np.empty(0, dtype=np.int32)
+        self.misses = np.empty(0, dtype=np.int32)
+        self.confirmed = np.empty(0, dtype=bool)
+        self.mean = np.empty((0, STATE_DIM))
+        self.covariance = np.empty((0, STATE_DIM, STATE_DIM))
+    
+    @property
+    def boxes(self) -> np.ndarray:
+        return cxcywh_to_xyxy(self.mean[:, :MEASURE_DIM])
+    
+    def predict(self):
+        if len(self.ids):
+            self.mean, self.covariance = KalmanBoxFilter.predict(self.mean, self.covariance)
+    
+    def boxes_for(self, track_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        if not len(self.ids):
+            return np.empty((0, 4)), np.zeros(len(track_ids), dtype=bool)
+        index = np.minimum(np.searchsorted(self.ids, track_ids), len(self.ids) - 1)
+        found = self.ids[index] == track_ids
+        return self.boxes[index[found]], found
+    
+    def update(self, detections: Detections, high_threshold: Optional[float] = None) -> Detections:
+        if high_threshold is None or high_threshold > self.high_threshold:
+            high_threshold = self.high_threshold
+        
+        if len(self.ids):
+            self.mean, self.covariance = KalmanBoxFilter.predict(self.mean, self.covariance)
+            self.misses += 1
+        
+        det_boxes = detections.boxes.astype(np.float64)
+        scores = self._class_iou(detections)
+        
+        det_track = np.full(len(detections), -1, dtype=np.intp)
+        high = detections.scores >= high_threshold
+        free_tracks = np.ones(len(self.ids), dtype=bool)
+        
+        for det_mask in (high, ~high):
+            track_idx = np.flatnonzero(free_tracks)
+            det_idx = np.flatnonzero(det_mask)
+            rows, cols = assign(scores[np.ix_(track_idx, det_idx)], self.iou_threshold, self.assignment)
+            det_track[det_idx[cols]] = track_idx[rows]
+            free_tracks[track_idx[rows]] = False
+        
+        matched = np.flatnonzero(det_track >= 0)
+        if len(matched):
+            tracks = det_track[matched]
+            self.mean[tracks], self.covariance[tracks] = KalmanBoxFilter.update(
+                self.mean[tracks],
+                self.covariance[tracks],
+                xyxy_to_cxcywh(det_boxes[matched])
+            )
+            self.hits[tracks] += 1
+            self.misses[tracks] = 0
+        
+        self.confirmed |= self.hits >= self.min_hits
+        keep = (self.misses <= self.max_age) & (self.confirmed | (self.misses == 0))
+        if not keep.all():
+            remap = np.cumsum(keep) - 1
+            det_track[matched] = np.where(keep[det_track[matched]], remap[det_track[matched]], -1)
+            self._compact(keep)
+        
+        new_dets = np.flatnonzero((det_track < 0) & high)
+        if len(new_dets):
+            det_track[new_dets] = len(self.ids) + np.arange(len(new_dets))
+            self._spawn(det_boxes[new_dets], detections.class_ids[new_dets])
+        
+        output = np.flatnonzero(det_track >= 0)
+        output = output[self.confirmed[det_track[output]]]
+        return detections.select(output).with_track_ids(self.ids[det_track[output]])
+    
+    def _class_iou(self, detections: Detections) -> np.ndarray:
+        scores = np.zeros((len(self.ids), len(detections)), dtype=np.float32)
+        if not len(self.ids) or not len(detections):
+            return scores
+        
+        track_boxes = self.boxes.astype(np.float32)
+        det_boxes = detections.boxes.astype(np.float32)
+        for class_id in np.intersect1d(self.class_ids, detections.class_ids):
+            rows = np.flatnonzero(self.class_ids == class_id)
+            cols = np.flatnonzero(detections.class_ids == class_id)
+            scores[np.ix_(rows, cols)] = box_iou(track_boxes[rows], det_boxes[cols])
+        return scores
+    
+    def _compact(self, keep: np.ndarray):
+        self.ids = self.ids[keep]
+        self.class_ids = self.class_ids[keep]
+        self.hits = self.hits[keep]
+        self.misses = self.misses[keep]
+        self.confirmed = self.confirmed[keep]
+        self.mean = self.mean[keep]
+        self.covariance = self.covariance[keep]
+    
+    def _spawn(self, boxes: np.ndarray, class_ids: np.ndarray):
+        n = len(boxes)
+        mean, covariance = KalmanBoxFilter.initiate(xyxy_to_cxcywh(boxes))
+        
+        self.ids = np.concatenate([self.ids, np.arange(self.next_id, self.next_id + n)])
+        self.next_id += n
+        self.class_ids = np.concatenate([self.class_ids, class_ids.astype(np.int32)])
+        self.hits = np.concatenate([self.hits, np.ones(n, dtype=np.int32)])
+        self.misses = np.concatenate([self.misses, np.zeros(n, dtype=np.int32)])
+        self.confirmed = np.concatenate([self.confirmed, np.full(n, self.min_hits <= 1)])
+        self.mean = np.concatenate([self.mean, mean])
+        self.covariance = np.concatenate([self.covariance, covariance])
@@ -1,13 +1,17 @@
 import asyncio
+import hmac
+import ipaddress
+import threading
 import time
 from concurrent import futures
-from typing import Dict
+from typing import Dict, Optional, Tuple
 import numpy as np
 import cv2
 import structlog
 import grpc
 
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, UploadFile, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import List
@@ -16,10 +20,22 @@ import uvicorn
 import sys
 sys.path.insert(0, 'proto')
 
-from detector import Detector
-from tracker import ObjectTracker
-from zones import ZoneManager, Zone
-from metrics import start_metrics_server, record_inference, record_tracks
+from detector import Detector, InferenceOptions
+from detections import Detections
+from batching import BatchScheduler
+from executor import InferencePool, PoolSaturatedError, thread_split
+from sessions import CameraSessionRegistry, CameraSession, DEFAULT_CAMERA_ID
+from results import ResultHub
+from ingest import StreamIngestor, StreamSource
+from streaming import ResultSubscription, DeltaEncoder, result_message, sse_event
+from zones import ZoneManager, Zone, ZoneViolation
+from violations import ViolationStore
+from profiler import SamplingProfiler, LoopLagMonitor, ProfilerBusyError
+from adaptive import QualityController
+from timings import StageTimings, stage
+from metrics import (
+    start_metrics_server, frame_metrics, record_inference, record_frame_time, record_tracks, InferenceTimer
+)
 from config import settings
 
 try:
@@ -45,8 +61,18 @@ structlog.configure(
 logger = structlog.get_logger()
 
 detector: Detector = None
-tracker: ObjectTracker = None
+scheduler: BatchScheduler = None
+inference_pool: InferencePool = None
+sessions: CameraSessionRegistry = None
+result_hub = ResultHub()
+ingestor: StreamIngestor = None
+grpc_aio_server = None
 zone_manager: ZoneManager = None
+violation_store: ViolationStore = None
+profiler = SamplingProfiler()
+loop_monitor: LoopLagMonitor = None
+session_sweeper: asyncio.Task = None
+quality: QualityController = None
 
 app = FastAPI(
     title="Smart Factory AI Inference",
@@ -68,6 +94,14 @@ class DetectionResponse(BaseModel):
     safety_check: Dict
     zone_violations: List[Dict]
     processing_time_ms: float
+    timings: Optional[Dict[str, float]] = None
+
+
+class StreamRequest(BaseModel):
+    camera_id: str
+    url: str
+    fps: Optional[float] = None
+    loop: bool = True
 
 
 class ZoneRequest(BaseModel):
@@ -81,88 +115,335 @@ class ZoneRequest(BaseModel):
 
 @app.on_event("startup")
 async def startup():
-    global detector, tracker, zone_manager
+    global detector, scheduler, inference_pool, sessions, zone_manager, violation_store, ingestor, grpc_aio_server
+    global loop_monitor, quality, session_sweeper
     
+    workers, intra_op_threads = thread_split()
     detector = Detector(
         model_path=settings.MODEL_PATH,
         conf_threshold=settings.CONFIDENCE_THRESHOLD,
-        use_onnx=False
+        intra_op_threads=intra_op_threads
     )
     
-    tracker = ObjectTracker(
-        max_distance=settings.TRACKER_MAX_DISTANCE,
-        hit_counter_max=settings.TRACKER_HIT_COUNTER_MAX
-    )
+    if settings.ADAPTIVE_ENABLED:
+        input_sizes = [
+            size for size in settings.ADAPTIVE_INPUT_SIZES
+            if size < detector.input_size and detector.supports_input_size(size)
+        ]
+        for size in input_sizes:
+            detector.at_input_size(size)
+        quality = QualityController([detector.input_size, *input_sizes], load=inference_load)
+    
+    inference_pool = InferencePool(max_workers=workers)
+    
+    if settings.ENABLE_BATCHING:
+        scheduler = BatchScheduler(detector, pool=inference_pool)
+        scheduler.start()
+    
+    sessions = CameraSessionRegistry(on_remove=close_session)
     
     zone_manager = ZoneManager()
+    violation_store = ViolationStore()
     
     if settings.METRICS_ENABLED:
         start_metrics_server()
+    frame_metrics.start()
+    
+    ingestor = StreamIngestor(run_pipeline, result_hub)
+    ingestor.start()
+    
+    if settings.GRPC_ASYNC:
+        grpc_aio_server = await serve_grpc_async()
+    
+    if settings.ADMIN_ENABLED:
+        loop_monitor = LoopLagMonitor()
+        loop_monitor.start()
+    
+    if settings.SESSION_SWEEP_INTERVAL_S > 0:
+        session_sweeper = asyncio.create_task(sweep_sessions())
     
     logger.info("ai_service_started", 
                 model_backend=detector.backend,
-                tracking=tracker.enabled,
+                batching=scheduler is not None,
+                streams=len(ingestor.workers),
+                tracking=settings.ENABLE_TRACKING,
+                adaptive=quality is not None,
                 zones=len(zone_manager.zones))
 
 
+@app.on_event("shutdown")
+async def shutdown():
+    if loop_monitor:
+        await loop_monitor.stop()
+    if session_sweeper:
+        session_sweeper.cancel()
+    if grpc_aio_server:
+        await grpc_aio_server.stop(grace=2)
+    if ingestor:
+        ingestor.stop()
+    if scheduler:
+        scheduler.stop()
+    if inference_pool:
+        inference_pool.shutdown(wait=False)
+    if violation_store:
+        violation_store.close()
+    frame_metrics.stop()
+
+
 @app.get("/health")
 async def health():
     return {
         "status": "healthy" if detector else "unhealthy",
         "model_loaded": detector is not None,
         "model_type": detector.backend if detector else None,
-        "device": settings.DEVICE
+        "device": settings.DEVICE,
+        "cameras": len(sessions) if sessions else 0,
+        "inference_queue": {
+            "pending": inference_pool.pending if inference_pool else 0,
+            "max_pending": inference_pool.max_pending if inference_pool else 0
+        },
+        "adaptive": quality.status() if quality else {"enabled": False}
     }
 
 
+def inference_load() -> float:
+    waiting = max(inference_pool.pending, scheduler.queue_depth if scheduler else 0)
+    return waiting / inference_pool.max_pending
+
+
+def decode_image(data: bytes, timings: Optional[StageTimings] = None) -> Optional[np.ndarray]:
+    with stage(timings, "decode"):
+        nparr = np.frombuffer(data, np.uint8)
+        return cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+
+
+def parse_options(
+    confidence: Optional[float] = None,
+    classes: Optional[str] = None
+) -> Optional[InferenceOptions]:
+    try:
+        return InferenceOptions.create(confidence, classes.split(',') if classes else None)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+
+def admit_request():
+    try:
+        return inference_pool.admit()
+    except PoolSaturatedError as e:
+        raise HTTPException(
+            settings.INFERENCE_REJECT_STATUS,
+            str(e),
+            headers={"Retry-After": "1"}
+        )
+
+
 @app.post("/detect", response_model=DetectionResponse)
-async def detect(file: UploadFile = File(...)):
+async def detect(
+    file: UploadFile = File(...),
+    camera_id: str = Query(DEFAULT_CAMERA_ID),
+    confidence: Optional[float] = Query(None),
+    classes: Optional[str] = Query(None),
+    timings: bool = Query(False)
+):
     if not detector:
         raise HTTPException(503, "Model not loaded")
     
+    options = parse_options(confidence, classes)
     contents = await file.read()
-    nparr = np.frombuffer(contents, np.uint8)
-    frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+    frame_timings = StageTimings()
     
-    if frame is None:
-        raise HTTPException(400, "Invalid image")
-    
-    return await process_frame(frame)
+    with admit_request():
+        frame = await inference_pool.run(decode_image, contents, frame_timings)
+        
+        if frame is None:
+            raise HTTPException(400, "Invalid image")
+        
+        return await process_frame(frame, camera_id, options, frame_timings, timings)
 
 
 @app.post("/detect/base64")
-async def detect_base64(data: Dict):
+async def detect_base64(
+    data: Dict,
+    camera_id: Optional[str] = Query(None),
+    confidence: Optional[float] = Query(None),
+    classes: Optional[str] = Query(None),
+    timings: bool = Query(False)
+):
     if not detector:
         raise HTTPException(503, "Model not loaded")
     
+    options = parse_options(confidence or data.get("confidence"), classes or data.get("classes"))
+    
     import base64
     image_bytes = base64.b64decode(data.get("image", ""))
-    nparr = np.frombuffer(image_bytes, np.uint8)
-    frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-    
-    if frame is None:
-        raise HTTPException(400, "Invalid image data")
+    frame_timings = StageTimings()
     
-    return await process_frame(frame)
+    with admit_request():
+        frame = await inference_pool.run(decode_image, image_bytes, frame_timings)
+        
+        if frame is None:
+            raise HTTPException(400, "Invalid image data")
+        
+        return await process_frame(
+            frame,
+            camera_id or data.get("camera_id") or DEFAULT_CAMERA_ID,
+            options,
+            frame_timings,
+            timings or bool(data.get("timings"))
+        )
 
 
-async def process_frame(frame: np.ndarray) -> Dict:
-    start = time.perf_counter()
+def close_session(session: CameraSession):
+    with session.lock:
+        events = session.debouncer.flush()
+    if violation_store:
+        violation_store.record(session.camera_id, events)
+    if quality:
+        quality.forget(session.camera_id)
+    frame_metrics.forget_camera(session.camera_id)
+    result_hub.forget(session.camera_id)
+
+
+def sweep_incidents():
+    sessions.evict_idle()
+    timestamp = int(time.time() * 1000)
+    for session in sessions.sessions():
+        with session.lock:
+            events = session.debouncer.sweep(timestamp)
+        violation_store.record(session.camera_id, events)
+
+
+async def sweep_sessions():
+    while True:
+        await asyncio.sleep(settings.SESSION_SWEEP_INTERVAL_S)
+        try:
+            await inference_pool.run(sweep_incidents)
+        except Exception as e:
+            logger.error("session_sweep_failed", error=str(e))
+
+
+def analyze_detections(
+    detections: Optional[Detections],
+    session: CameraSession,
+    frame_shape: Optional[Tuple[int, int]] = None,
+    timings: Optional[StageTimings] = None,
+    options: Optional[InferenceOptions] = None
+) -> Tuple[Detections, Dict, List[ZoneViolation]]:
+    extrapolate = detections is None
+    if not extrapolate:
+        detections = Detections.from_any(detections)
+    
+    with session.lock:
+        session.touch()
+        
+        with stage(timings, "tracking"):
+            if extrapolate:
+                detections = session.tracker.extrapolate(frame_shape)
+            raw_detections = detections
+            if session.tracker.enabled and not extrapolate:
+                detections = session.tracker.update(detections, options.conf_threshold if options else None)
+        
+        with stage(timings, "safety"):
+            ppe_status = session.tracker.ppe_status(detections, raw_detections)
+            safety_check = detector.check_safety(detections, ppe_status)
+        
+        violations = []
+        occupancy = None
+        if zone_manager.enabled:
+            with stage(timings, "zones"):
+                timestamp = int(time.time() * 1000)
+                violations, occupancy = zone_manager.evaluate(
+                    detections, 
+                    timestamp=timestamp,
+                    frame_shape=frame_shape,
+                    ppe_status=ppe_status
+                )
+                if settings.VIOLATION_DEBOUNCE_ENABLED and session.tracker.enabled:
+                    violations = session.debouncer.update(violations, timestamp)
     
-    detections = detector.detect(frame)
+    violation_store.record(session.camera_id, violations)
+    record_inference(detections, safety_check, session.camera_id, violations, occupancy)
     
-    if tracker.enabled:
-        detections = tracker.update(detections)
-        record_tracks(len(tracker.track_history))
+    if session.tracker.enabled:
+        record_tracks(sessions.total_tracks())
     
-    safety_check = detector.check_safety(detections)
+    return detections, safety_check, violations
+
+
+def run_detector(
+    frame: np.ndarray,
+    options: Optional[InferenceOptions] = None,
+    timings: Optional[StageTimings] = None
+) -> Detections:
+    with InferenceTimer():
+        return detector.detect(frame, options, timings)
+
+
+def plan_frame(
+    camera_id: Optional[str],
+    options: Optional[InferenceOptions] = None
+) -> Tuple[bool, Optional[InferenceOptions]]:
+    if quality is None:
+        return True, options
     
-    zone_violations = []
-    if zone_manager.enabled:
-        violations = zone_manager.check_violations(
-            detections, 
-            timestamp=int(time.time() * 1000)
-        )
+    mode, detect = quality.plan(camera_id or DEFAULT_CAMERA_ID)
+    if mode.input_size != detector.input_size:
+        options = InferenceOptions.with_input_size(options, mode.input_size)
+    return detect, options
+
+
+def detect_frame(
+    frame: np.ndarray,
+    options: Optional[InferenceOptions] = None,
+    timings: Optional[StageTimings] = None,
+    camera_id: Optional[str] = None
+) -> Optional[Detections]:
+    detect, options = plan_frame(camera_id, options)
+    if not detect:
+        return None
+    if scheduler:
+        return scheduler.detect(frame, options, timings)
+    return run_detector(frame, options, timings)
+
+
+async def detect_frame_async(
+    frame: np.ndarray,
+    options: Optional[InferenceOptions] = None,
+    timings: Optional[StageTimings] = None,
+    camera_id: Optional[str] = None
+) -> Optional[Detections]:
+    detect, options = plan_frame(camera_id, options)
+    if not detect:
+        return None
+    if scheduler:
+        return await asyncio.wrap_future(scheduler.submit(frame, options, timings))
+    return await inference_pool.run(run_detector, frame, options, timings)
+
+
+def record_frame(start: float, camera_id: str, timings: Optional[StageTimings]) -> float:
+    processing_time = time.perf_counter() - start
+    record_frame_time(
+        processing_time,
+        timings.durations if timings else None,
+        camera_id,
+        detector.backend
+    )
+    if quality:
+        quality.observe(camera_id, processing_time, timings is None or "inference" in timings.durations)
+    return processing_time * 1000
+
+
+def build_response(
+    detections: Detections,
+    safety_check: Dict,
+    violations: List[ZoneViolation],
+    start: float,
+    camera_id: str = DEFAULT_CAMERA_ID,
+    timings: Optional[StageTimings] = None,
+    include_timings: bool = False
+) -> Dict:
+    with stage(timings, "serialize"):
         zone_violations = [
             {
                 'zone_id': v.zone_id,
@@ -170,21 +451,212 @@ async def process_frame(frame: np.ndarray) -> Dict:
                 'severity': v.severity,
                 'person_track_id': v.person_track_id,
                 'missing_ppe': v.missing_ppe,
-                'timestamp': v.timestamp
+                'timestamp': v.timestamp,
+                'event': v.event,
+                'started_at': v.started_at,
+                'duration_ms': v.duration_ms
             }
             for v in violations
         ]
+        
+        result = {
+            "detections": detections.to_list(),
+            "safety_check": safety_check,
+            "zone_violations": zone_violations
+        }
+    
+    processing_time = record_frame(start, camera_id, timings)
+    result["processing_time_ms"] = round(processing_time, 2)
+    if include_timings and timings:
+        result["timings"] = timings.to_ms()
+    
+    return result
+
+
+def stream_session(held: Dict[str, CameraSession], camera_id: str) -> CameraSession:
+    session = held.get(camera_id)
+    if session is None:
+        session = held[camera_id] = sessions.acquire(camera_id, stream=True)
+    return session
+
+
+def release_sessions(held: Dict[str, CameraSession]):
+    for session in held.values():
+        sessions.release(session)
+    held.clear()
+
+
+def run_pipeline(camera_id: str, frame: np.ndarray) -> Dict:
+    with inference_pool.admit(), sessions.hold(camera_id) as session:
+        start = time.perf_counter()
+        timings = StageTimings()
+        
+        detections = detect_frame(frame, timings=timings, camera_id=camera_id)
+        detections, safety_check, violations = analyze_detections(detections, session, frame.shape[:2], timings)
+        
+        return build_response(detections, safety_check, violations, start, camera_id, timings)
+
+
+async def detect_and_analyze(
+    frame: np.ndarray,
+    camera_id: str,
+    options: Optional[InferenceOptions] = None,
+    timings: Optional[StageTimings] = None
+) -> Tuple[Detections, Dict, List[ZoneViolation]]:
+    with sessions.hold(camera_id) as session:
+        detections = await detect_frame_async(frame, options, timings, camera_id)
+        return await inference_pool.run(analyze_detections, detections, session, frame.shape[:2], timings, options)
+
+
+async def process_frame(
+    frame: np.ndarray,
+    camera_id: str = DEFAULT_CAMERA_ID,
+    options: Optional[InferenceOptions] = None,
+    timings: Optional[StageTimings] = None,
+    include_timings: bool = False
+) -> Dict:
+    start = time.perf_counter()
+    timings = timings if timings is not None else StageTimings()
     
-    processing_time = (time.perf_counter() - start) * 1000
+    detections, safety_check, violations = await detect_and_analyze(frame, camera_id, options, timings)
     
-    record_inference(processing_time / 1000, detections, safety_check)
+    result = build_response(detections, safety_check, violations, start, camera_id, timings, include_timings)
+    result_hub.publish(camera_id, result)
     
-    return {
-        "detections": detections,
-        "safety_check": safety_check,
-        "zone_violations": zone_violations,
-        "processing_time_ms": round(processing_time, 2)
-    }
+    return result
+
+
+@app.get("/streams")
+async def get_streams():
+    return ingestor.status()
+
+
+@app.post("/streams")
+async def create_stream(stream: StreamRequest):
+    source = StreamSource(
+        camera_id=stream.camera_id,
+        url=stream.url,
+        fps=stream.fps,
+        loop=stream.loop
+    )
+    await asyncio.get_running_loop().run_in_executor(None, ingestor.add, source)
+    return {"status": "started", "camera_id": stream.camera_id}
+
+
+@app.delete("/streams/{camera_id}")
+async def delete_stream(camera_id: str):
+    removed = await asyncio.get_running_loop().run_in_executor(None, ingestor.remove, camera_id)
+    if removed:
+        return {"status": "stopped"}
+    raise HTTPException(404, "Stream not found")
+
+
+@app.get("/streams/{camera_id}/latest")
+async def get_stream_result(camera_id: str):
+    result = result_hub.latest(camera_id)
+    if result is None:
+        raise HTTPException(404, "No results for camera")
+    return result
+
+
+@app.get("/streams/{camera_id}/events")
+async def stream_events(camera_id: str, request: Request, delta: bool = False):
+    subscription = ResultSubscription(result_hub, camera_id, asyncio.get_running_loop())
+    encoder = DeltaEncoder() if delta else None
+    
+    async def events():
+        try:
+            while not await request.is_disconnected():
+                result = await subscription.get(timeout=settings.STREAM_KEEPALIVE_S)
+                if result is None:
+                    yield ": keepalive\n\n"
+                    continue
+                yield sse_event(result_message(camera_id, result, encoder), event="result")
+        finally:
+            subscription.close()
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.websocket("/ws/{camera_id}")
+async def camera_socket(websocket: WebSocket, camera_id: str, delta: bool = False):
+    await websocket.accept()
+    
+    subscription = ResultSubscription(result_hub, camera_id, asyncio.get_running_loop())
+    encoder = DeltaEncoder() if delta else None
+    frames: asyncio.Queue = asyncio.Queue(maxsize=1)
+    
+    async def push_results():
+        while True:
+            result = await subscription.get()
+            await websocket.send_json(result_message(camera_id, result, encoder))
+    
+    async def process_frames():
+        while True:
+            data = await frames.get()
+            try:
+                with inference_pool.admit():
+                    frame = await inference_pool.run(decode_image, data)
+                    if frame is None:
+                        await websocket.send_json({"type": "error", "error": "Invalid image"})
+                        continue
+                    await process_frame(frame, camera_id)
+            except PoolSaturatedError as e:
+                await websocket.send_json({"type": "error", "error": str(e), "retry": True})
+            except Exception as e:
+                logger.error("websocket_frame_failed", camera_id=camera_id, error=str(e))
+                await websocket.send_json({"type": "error", "error": str(e)})
+    
+    async def receive_frames():
+        try:
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    return
+                
+                data = message.get("bytes")
+                if data is None:
+                    continue
+                
+                if frames.full():
+                    frames.get_nowait()
+                frames.put_nowait(data)
+        except WebSocketDisconnect:
+            pass
+    
+    receiver = asyncio.create_task(receive_frames())
+    workers = [asyncio.create_task(push_results()), asyncio.create_task(process_frames())]
+    
+    try:
+        done, _ = await asyncio.wait([receiver, *workers], return_when=asyncio.FIRST_COMPLETED)
+        if receiver not in done:
+            error = next(iter(done)).exception()
+            logger.warning("websocket_task_stopped", camera_id=camera_id, error=str(error) if error else None)
+            try:
+                await websocket.close(code=1011)
+            except Exception:
+                pass
+    finally:
+        for task in (receiver, *workers):
+            task.cancel()
+        subscription.close()
+
+
+@app.get("/cameras")
+async def get_cameras():
+    sessions.evict_idle()
+    return [s.to_dict() for s in sessions.sessions()]
+
+
+@app.delete("/cameras/{camera_id}")
+async def delete_camera(camera_id: str):
+    if sessions.remove(camera_id):
+        return {"status": "deleted"}
+    raise HTTPException(404, "Camera session not found")
 
 
 @app.get("/zones")
@@ -206,6 +678,57 @@ async def create_zone(zone: ZoneRequest):
     return {"status": "created", "zone_id": zone.id}
 
 
+@app.get("/violations")
+async def get_violations(
+    zone_id: Optional[str] = Query(None),
+    camera_id: Optional[str] = Query(None),
+    track_id: Optional[int] = Query(None),
+    event: Optional[str] = Query(None),
+    start: Optional[int] = Query(None),
+    end: Optional[int] = Query(None),
+    cursor: Optional[int] = Query(None),
+    limit: int = Query(100, ge=1),
+    source: str = Query("memory")
+):
+    limit = min(limit, settings.VIOLATION_QUERY_MAX_LIMIT)
+    
+    if source == "memory":
+        store = violation_store
+    elif source == "log":
+        if not violation_store.log:
+            raise HTTPException(400, "Violation log not configured")
+        store = violation_store.log
+    else:
+        raise HTTPException(400, "source must be 'memory' or 'log'")
+    
+    items, next_cursor = await inference_pool.run(
+        store.query,
+        zone_id=zone_id,
+        camera_id=camera_id,
+        track_id=track_id,
+        event=event,
+        start=start,
+        end=end,
+        cursor=cursor,
+        limit=limit
+    )
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@app.get("/violations/rollups")
+async def get_violation_rollups(
+    zone_id: Optional[str] = Query(None),
+    start: Optional[int] = Query(None),
+    end: Optional[int] = Query(None)
+):
+    return violation_store.rollups.query(zone_id=zone_id, start=start, end=end)
+
+
+@app.get("/violations/stats")
+async def get_violation_stats():
+    return violation_store.stats()
+
+
 @app.delete("/zones/{zone_id}")
 async def delete_zone(zone_id: str):
     if zone_manager.remove_zone(zone_id):
@@ -213,57 +736,115 @@ async def delete_zone(zone_id: str):
     raise HTTPException(404, "Zone not found")
 
 
+def is_loopback(host: Optional[str]) -> bool:
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return host == "localhost"
+
+
+def require_admin(request: Request):
+    if not settings.ADMIN_ENABLED:
+        raise HTTPException(404, "Not Found")
+    
+    if settings.ADMIN_TOKEN:
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not hmac.compare_digest(token.encode(), settings.ADMIN_TOKEN.encode()):
+            raise HTTPException(401, "Invalid admin token", headers={"WWW-Authenticate": "Bearer"})
+    elif not is_loopback(request.client.host if request.client else None):
+        raise HTTPException(403, "Admin endpoints are only served to localhost without ADMIN_TOKEN")
+
+
+@app.get("/admin/profile")
+async def admin_profile(
+    request: Request,
+    seconds: float = Query(10.0, gt=0),
+    interval_ms: Optional[float] = Query(None, gt=0),
+    thread: Optional[str] = Query(None),
+    format: str = Query("collapsed", pattern="^(collapsed|json)$")
+):
+    require_admin(request)
+    
+    duration = min(seconds, settings.PROFILER_MAX_DURATION_S)
+    interval = max(interval_ms or settings.PROFILER_INTERVAL_MS, 1.0) / 1000
+    
+    try:
+        result = await asyncio.get_running_loop().run_in_executor(
+            None, profiler.run, duration, interval, thread
+        )
+    except ProfilerBusyError as e:
+        raise HTTPException(409, str(e))
+    
+    if format == "json":
+        return result
+    return PlainTextResponse(
+        result['collapsed'],
+        headers={
+            "X-Profile-Samples": str(result['samples']),
+            "X-Profile-Overruns": str(result['overruns'])
+        }
+    )
+
+
+@app.get("/admin/runtime")
+async def admin_runtime(request: Request):
+    require_admin(request)
+    
+    return {
+        "event_loop_lag": loop_monitor.stats() if loop_monitor else None,
+        "asyncio_tasks": len(asyncio.all_tasks()),
+        "threads": threading.active_count(),
+        "inference_pool": {
+            "workers": inference_pool.max_workers if inference_pool else 0,
+            "pending": inference_pool.pending if inference_pool else 0,
+            "queued": inference_pool.queued if inference_pool else 0,
+            "max_pending": inference_pool.max_pending if inference_pool else 0
+        },
+        "batch_queue": scheduler.queue_depth if scheduler else 0,
+        "profiler_active": profiler.active
+    }
+
+
 if GRPC_AVAILABLE:
-    class DetectionServicer(detection_pb2_grpc.DetectionServiceServicer):
+    def frame_from_stream(request, timings: Optional[StageTimings] = None) -> Optional[np.ndarray]:
+        payload = request.WhichOneof('payload')
         
-        def Detect(self, request, context):
-            nparr = np.frombuffer(request.image_data, np.uint8)
-            frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-            
-            if frame is None:
-                context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
-                return detection_pb2.DetectResponse()
-            
-            start = time.perf_counter()
-            
-            if request.confidence_threshold > 0:
-                detector.conf_threshold = request.confidence_threshold
-            
-            detections = detector.detect(frame)
-            
-            if tracker.enabled:
-                detections = tracker.update(detections)
-            
-            safety_check = detector.check_safety(detections)
-            
-            zone_violations = []
-            if zone_manager.enabled:
-                violations = zone_manager.check_violations(
-                    detections, 
-                    timestamp=int(time.time() * 1000)
-                )
-                zone_violations = violations
-            
-            processing_time = (time.perf_counter() - start) * 1000
+        if payload == 'image_data':
+            return decode_image(request.image_data, timings)
+        
+        if payload == 'raw':
+            raw = request.raw
+            channels = raw.channels or 3
+            if raw.height <= 0 or raw.width <= 0 or len(raw.data) != raw.height * raw.width * channels:
+                return None
             
+            frame = np.frombuffer(raw.data, np.uint8).reshape(raw.height, raw.width, channels)
+            if channels == 1:
+                return cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+            if channels == 4:
+                return cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
+            return frame if channels == 3 else None
+        
+        return None
+    
+    def build_detect_response(
+        detections: Detections,
+        safety_check: Dict,
+        zone_violations: List[ZoneViolation],
+        start: float,
+        camera_id: str,
+        sequence: int = 0,
+        timings: Optional[StageTimings] = None,
+        include_timings: bool = False
+    ):
+        with stage(timings, "serialize"):
             response = detection_pb2.DetectResponse(
-                processing_time_ms=processing_time,
                 timestamp=int(time.time() * 1000),
-                camera_id=request.camera_id
+                camera_id=camera_id,
+                sequence=sequence
             )
             
-            for det in detections:
-                bbox = detection_pb2.BoundingBox(
-                    x1=det['bbox'][0], y1=det['bbox'][1],
-                    x2=det['bbox'][2], y2=det['bbox'][3]
-                )
-                response.detections.append(detection_pb2.Detection(
-                    class_id=det['class_id'],
-                    class_name=det['class_name'],
-                    confidence=det['confidence'],
-                    bbox=bbox,
-                    track_id=det.get('track_id', -1)
-                ))
+            response.detections.extend(detections.to_proto(detection_pb2))
             
             response.safety_check.CopyFrom(detection_pb2.SafetyCheck(
                 has_violations=safety_check['has_violations'],
@@ -281,18 +862,226 @@ if GRPC_AVAILABLE:
                     severity=v.severity,
                     person_track_id=v.person_track_id,
                     missing_ppe=v.missing_ppe,
-                    timestamp=v.timestamp
+                    timestamp=v.timestamp,
+                    event=v.event,
+                    started_at=v.started_at,
+                    duration_ms=v.duration_ms
                 ))
+        
+        response.processing_time_ms = record_frame(start, camera_id or DEFAULT_CAMERA_ID, timings)
+        if include_timings and timings:
+            response.timings.update(timings.to_ms())
+        
+        return response
+    
+    def request_options(request) -> Optional[InferenceOptions]:
+        return InferenceOptions.create(request.confidence_threshold, request.classes)
+    
+    def stream_error(request, camera_id: str, code: grpc.StatusCode, error: str):
+        return detection_pb2.DetectResponse(
+            camera_id=camera_id, sequence=request.sequence, error=error, code=code.value[0]
+        )
+    
+    def health_response():
+        return detection_pb2.HealthResponse(
+            status="healthy" if detector else "unhealthy",
+            model_loaded=detector is not None,
+            model_type=detector.backend if detector else "",
+            device=settings.DEVICE
+        )
+    
+    class DetectionServicer(detection_pb2_grpc.DetectionServiceServicer):
+        
+        def Detect(self, request, context):
+            try:
+                admission = inference_pool.admit()
+            except PoolSaturatedError as e:
+                context.set_code(grpc.StatusCode.RESOURCE_EXHAUSTED)
+                context.set_details(str(e))
+                return detection_pb2.DetectResponse()
             
-            return response
+            with admission:
+                return self._detect(request, context)
+        
+        def _detect(self, request, context):
+            try:
+                options = request_options(request)
+            except ValueError as e:
+                context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+                context.set_details(str(e))
+                return detection_pb2.DetectResponse()
+            
+            timings = StageTimings()
+            frame = decode_image(request.image_data, timings)
+            
+            if frame is None:
+                context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+                return detection_pb2.DetectResponse()
+            
+            start = time.perf_counter()
+            camera_id = request.camera_id or DEFAULT_CAMERA_ID
+            
+            detections = detect_frame(frame, options, timings, camera_id)
+            
+            with sessions.hold(camera_id) as session:
+                detections, safety_check, zone_violations = analyze_detections(
+                    detections, session, frame.shape[:2], timings, options
+                )
+            
+            return build_detect_response(
+                detections, safety_check, zone_violations, start, request.camera_id,
+                timings=timings, include_timings=request.include_timings
+            )
+        
+        def DetectStream(self, request_iterator, context):
+            held: Dict[str, CameraSession] = {}
+            try:
+                for request in request_iterator:
+                    camera_id = request.camera_id or DEFAULT_CAMERA_ID
+                    try:
+                        with inference_pool.admit():
+                            response = self._detect_stream_frame(request, camera_id, held)
+                    except PoolSaturatedError as e:
+                        response = stream_error(request, camera_id, grpc.StatusCode.RESOURCE_EXHAUSTED, str(e))
+                    yield response
+            finally:
+                release_sessions(held)
+        
+        def _detect_stream_frame(self, request, camera_id: str, held: Dict[str, CameraSession]):
+            timings = StageTimings()
+            try:
+                options = request_options(request)
+                frame = frame_from_stream(request, timings)
+                if frame is None:
+                    raise ValueError("Invalid frame")
+            except ValueError as e:
+                return stream_error(request, camera_id, grpc.StatusCode.INVALID_ARGUMENT, str(e))
+            
+            start = time.perf_counter()
+            try:
+                detections = detect_frame(frame, options, timings, camera_id)
+                detections, safety_check, zone_violations = analyze_detections(
+                    detections, stream_session(held, camera_id), frame.shape[:2], timings, options
+                )
+            except Exception as e:
+                logger.error("grpc_stream_frame_failed", camera_id=camera_id, error=str(e))
+                return stream_error(request, camera_id, grpc.StatusCode.INTERNAL, str(e))
+            
+            return build_detect_response(
+                detections, safety_check, zone_violations, start, camera_id, request.sequence,
+                timings, request.include_timings
+            )
         
         def HealthCheck(self, request, context):
-            return detection_pb2.HealthResponse(
-                status="healthy" if detector else "unhealthy",
-                model_loaded=detector is not None,
-                model_type=detector.backend if detector else "",
-                device=settings.DEVICE
+            return health_response()
+    
+    class AsyncDetectionServicer(detection_pb2_grpc.DetectionServiceServicer):
+        
+        async def Detect(self, request, context):
+            try:
+                options = request_options(request)
+            except ValueError as e:
+                await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+            
+            try:
+                admission = inference_pool.admit()
+            except PoolSaturatedError as e:
+                await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, str(e))
+            
+            with admission:
+                timings = StageTimings()
+                frame = await inference_pool.run(decode_image, request.image_data, timings)
+                if frame is None:
+                    await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "Invalid image")
+                
+                start = time.perf_counter()
+                camera_id = request.camera_id or DEFAULT_CAMERA_ID
+                detections, safety_check, zone_violations = await detect_and_analyze(
+                    frame, camera_id, options, timings
+                )
+                
+                return build_detect_response(
+                    detections, safety_check, zone_violations, start, request.camera_id,
+                    timings=timings, include_timings=request.include_timings
+                )
+        
+        async def DetectStream(self, request_iterator, context):
+            inflight: asyncio.Queue = asyncio.Queue(maxsize=settings.GRPC_STREAM_MAX_INFLIGHT)
+            held: Dict[str, CameraSession] = {}
+            
+            async def read_frames():
+                try:
+                    async for request in request_iterator:
+                        camera_id = request.camera_id or DEFAULT_CAMERA_ID
+                        try:
+                            admission = inference_pool.admit()
+                        except PoolSaturatedError as e:
+                            await inflight.put((request, camera_id, None, str(e)))
+                            continue
+                        task = asyncio.create_task(self._detect_stream_frame(request))
+                        await inflight.put((request, camera_id, admission, task))
+                except Exception as e:
+                    logger.warning("grpc_stream_read_failed", error=str(e))
+                await inflight.put(None)
+            
+            reader = asyncio.create_task(read_frames())
+            
+            try:
+                while True:
+                    item = await inflight.get()
+                    if item is None:
+                        break
+                    
+                    request, camera_id, admission, pending = item
+                    if admission is None:
+                        yield stream_error(request, camera_id, grpc.StatusCode.RESOURCE_EXHAUSTED, pending)
+                        continue
+                    
+                    with admission:
+                        response = await self._stream_response(request, camera_id, pending, held)
+                    yield response
+            finally:
+                reader.cancel()
+                while not inflight.empty():
+                    item = inflight.get_nowait()
+                    if item is not None and item[2] is not None:
+                        item[3].cancel()
+                        inference_pool.release()
+                release_sessions(held)
+        
+        async def _stream_response(self, request, camera_id: str, task: asyncio.Task, held: Dict[str, CameraSession]):
+            try:
+                start, detections, frame_shape, timings, options = await task
+                detections, safety_check, zone_violations = await inference_pool.run(
+                    analyze_detections, detections, stream_session(held, camera_id), frame_shape, timings, options
+                )
+            except ValueError as e:
+                return stream_error(request, camera_id, grpc.StatusCode.INVALID_ARGUMENT, str(e))
+            except Exception as e:
+                logger.error("grpc_stream_frame_failed", camera_id=camera_id, error=str(e))
+                return stream_error(request, camera_id, grpc.StatusCode.INTERNAL, str(e))
+            
+            return build_detect_response(
+                detections, safety_check, zone_violations, start, camera_id, request.sequence,
+                timings, request.include_timings
             )
+        
+        async def _detect_stream_frame(
+            self,
+            request
+        ) -> Tuple[float, Optional[Detections], Tuple[int, int], StageTimings, Optional[InferenceOptions]]:
+            timings = StageTimings()
+            options = request_options(request)
+            frame = await inference_pool.run(frame_from_stream, request, timings)
+            if frame is None:
+                raise ValueError("Invalid frame")
+            
+            start = time.perf_counter()
+            detections = await detect_frame_async(frame, options, timings, request.camera_id or DEFAULT_CAMERA_ID)
+            return start, detections, frame.shape[:2], timings, options
+        
+        async def HealthCheck(self, request, context):
+            return health_response()
 
 
 def serve_grpc():
@@ -300,32 +1089,33 @@ def serve_grpc():
         logger.warning("grpc_disabled", reason="proto stubs not generated")
         return
     
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=settings.GRPC_MAX_WORKERS))
     detection_pb2_grpc.add_DetectionServiceServicer_to_server(
         DetectionServicer(), server
     )
     server.add_insecure_port(f'{settings.GRPC_HOST}:{settings.GRPC_PORT}')
     server.start()
-    logger.info("grpc_server_started", port=settings.GRPC_PORT)
+    logger.info("grpc_server_started", port=settings.GRPC_PORT, mode="threaded")
     return server
 
 
-async def main():
-    global detector, tracker, zone_manager
+async def serve_grpc_async():
+    if not GRPC_AVAILABLE:
+        logger.warning("grpc_disabled", reason="proto stubs not generated")
+        return
     
-    detector = Detector(
-        model_path=settings.MODEL_PATH,
-        conf_threshold=settings.CONFIDENCE_THRESHOLD,
-        use_onnx=False
+    server = grpc.aio.server()
+    detection_pb2_grpc.add_DetectionServiceServicer_to_server(
+        AsyncDetectionServicer(), server
     )
-    
-    tracker = ObjectTracker()
-    zone_manager = ZoneManager()
-    
-    if settings.METRICS_ENABLED:
-        start_metrics_server()
-    
-    grpc_server = serve_grpc()
+    server.add_insecure_port(f'{settings.GRPC_HOST}:{settings.GRPC_PORT}')
+    await server.start()
+    logger.info("grpc_server_started", port=settings.GRPC_PORT, mode="asyncio")
+    return server
+
+
+async def main():
+    grpc_server = None if settings.GRPC_ASYNC else serve_grpc()
     
     config = uvicorn.Config(
         app,
@@ -340,6 +1130,9 @@ async def main():
                 grpc_port=settings.GRPC_PORT if GRPC_AVAILABLE else "disabled")
     
     await server.serve()
+    
+    if grpc_server:
+        grpc_server.stop(grace=None)
 
 
 if __name__ == "__main__":
@@ -1,8 +1,12 @@
 from prometheus_client import Counter, Histogram, Gauge, start_http_server
+import threading
 import time
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
 import structlog
 
-from config import settings
+from config import settings, CLASS_NAMES
+from detections import Detections
 
 logger = structlog.get_logger()
 
@@ -43,7 +47,7 @@ active_tracks = Gauge(
 people_in_zones = Gauge(
     'ai_people_in_zones',
     'Number of people currently in danger zones',
-    ['zone_id']
+    ['zone_id', 'camera_id']
 )
 
 compliance_rate = Gauge(
@@ -51,6 +55,72 @@ compliance_rate = Gauge(
     'Current PPE compliance rate'
 )
 
+frame_duration = Histogram(
+    'ai_frame_processing_seconds',
+    'End-to-end processing time per frame',
+    buckets=[0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 1.0]
+)
+
+camera_frames = Counter(
+    'ai_camera_frames_total',
+    'Frames processed per camera',
+    ['camera_id']
+)
+
+camera_compliance = Gauge(
+    'ai_camera_compliance_rate_percent',
+    'Current PPE compliance rate per camera',
+    ['camera_id']
+)
+
+stage_duration = Histogram(
+    'ai_stage_duration_seconds',
+    'Time spent in each pipeline stage',
+    ['stage', 'backend', 'camera_id'],
+    buckets=[0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0]
+)
+
+camera_quality_level = Gauge(
+    'ai_camera_quality_level',
+    'Adaptive quality level per camera (0 = full quality)',
+    ['camera_id']
+)
+
+camera_input_size = Gauge(
+    'ai_camera_input_size',
+    'Detector input size currently used per camera',
+    ['camera_id']
+)
+
+camera_frame_skip = Gauge(
+    'ai_camera_frame_skip',
+    'Run full detection every k-th frame per camera',
+    ['camera_id']
+)
+
+camera_extrapolated_frames = Counter(
+    'ai_camera_extrapolated_frames_total',
+    'Frames answered by tracker extrapolation instead of detection',
+    ['camera_id']
+)
+
+CAMERA_METRICS = (
+    people_in_zones, camera_frames, camera_compliance, stage_duration,
+    camera_quality_level, camera_input_size, camera_frame_skip, camera_extrapolated_frames
+)
+
+batch_size = Histogram(
+    'ai_batch_size',
+    'Number of frames per inference batch',
+    buckets=[1, 2, 3, 4, 6, 8, 12, 16, 24, 32]
+)
+
+batch_queue_wait = Histogram(
+    'ai_batch_queue_wait_seconds',
+    'Time a frame waits in the batching queue before inference',
+    buckets=[0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25]
+)
+
 
 def start_metrics_server():
     if settings.METRICS_ENABLED:
@@ -58,27 +128,222 @@ def start_metrics_server():
         logger.info("metrics_server_started", port=settings.METRICS_PORT)
 
 
-def record_inference(duration: float, detections: list, safety_check: dict):
-    inference_duration.observe(duration)
-    frames_processed.inc()
+_children: Dict[Tuple, object] = {}
+
+
+def bound(metric, *labelvalues):
+    key = (metric, labelvalues)
+    child = _children.get(key)
+    if child is None:
+        child = _children[key] = metric.labels(*labelvalues)
+    return child
+
+
+def observe_many(histogram, values: Iterable[float]):
+    for value in np.asarray(values, dtype=np.float64).ravel().tolist():
+        histogram.observe(value)
+
+
+class FrameMetrics:
+    
+    def __init__(self, flush_interval_s: Optional[float] = None):
+        self.flush_interval_s = flush_interval_s if flush_interval_s is not None else settings.METRICS_FLUSH_INTERVAL_S
+        self._class_children = [detections_total.labels(class_name=name) for name in CLASS_NAMES]
+        self._occupied: Dict[str, set] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._reset()
+    
+    def _reset(self):
+        self._frames = 0
+        self._durations: List[float] = []
+        self._class_counts = np.zeros(len(CLASS_NAMES), dtype=np.int64)
+        self._scores: List[np.ndarray] = []
+        self._compliance: Optional[float] = None
+        self._cameras: Dict[str, List] = {}
+        self._violations: Dict[Tuple[str, str], int] = {}
+        self._occupancy: Dict[str, Dict[str, int]] = {}
+        self._stages: Dict[Tuple[str, str, str], List[float]] = {}
+    
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+    
+    def start(self):
+        if self.running or self.flush_interval_s <= 0:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="metrics-flush", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join(timeout=self.flush_interval_s + 1)
+            self._thread = None
+        self.flush()
+    
+    def _run(self):
+        while not self._stop.wait(self.flush_interval_s):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error("metrics_flush_failed", error=str(e))
+    
+    def record(
+        self,
+        detections: Detections,
+        safety_check: dict,
+        camera_id: str,
+        violations: Iterable = (),
+        occupancy: Optional[Dict[str, int]] = None
+    ):
+        counts = detections.class_counts()
+        rate = safety_check.get('compliance_rate', 100)
+        
+        with self._lock:
+            self._frames += 1
+            self._class_counts += counts
+            if len(detections):
+                self._scores.append(detections.scores)
+            self._compliance = rate
+            
+            camera = self._cameras.setdefault(camera_id, [0, rate])
+            camera[0] += 1
+            camera[1] = rate
+            
+            for v in violations:
+                if v.event == "ended":
+                    continue
+                for name in v.missing_ppe:
+                    key = (name, v.zone_id)
+                    self._violations[key] = self._violations.get(key, 0) + 1
+            
+            if occupancy is not None:
+                self._occupancy[camera_id] = occupancy
+        
+        if not self.running:
+            self.flush()
+    
+    def record_duration(
+        self,
+        duration: float,
+        stages: Optional[Dict[str, float]] = None,
+        camera_id: str = "default",
+        backend: str = ""
+    ):
+        with self._lock:
+            self._durations.append(duration)
+            for name, seconds in (stages or {}).items():
+                self._stages.setdefault((name, backend, camera_id), []).append(seconds)
+        
+        if not self.running:
+            self.flush()
     
-    for det in detections:
-        detections_total.labels(class_name=det['class_name']).inc()
-        model_confidence.observe(det['confidence'])
+    def flush(self):
+        with self._lock:
+            frames, durations, class_counts = self._frames, self._durations, self._class_counts
+            scores, compliance, cameras = self._scores, self._compliance, self._cameras
+            violations, occupancy, stages = self._violations, self._occupancy, self._stages
+            self._reset()
+        
+        with self._flush_lock:
+            if frames:
+                frames_processed.inc(frames)
+            observe_many(frame_duration, durations)
+            
+            for labelvalues, values in stages.items():
+                observe_many(bound(stage_duration, *labelvalues), values)
+            
+            for child, count in zip(self._class_children, class_counts.tolist()):
+                if count:
+                    child.inc(count)
+            
+            if scores:
+                observe_many(model_confidence, np.concatenate(scores))
+            
+            if compliance is not None:
+                compliance_rate.set(compliance)
+            
+            for camera_id, (count, rate) in cameras.items():
+                bound(camera_frames, camera_id).inc(count)
+                bound(camera_compliance, camera_id).set(rate)
+            
+            for (violation_type, zone_id), count in violations.items():
+                record_violation(violation_type, zone_id, count)
+            
+            for camera_id, zones in occupancy.items():
+                for zone_id in self._occupied.get(camera_id, set()) - zones.keys():
+                    record_zone_occupancy(zone_id, 0, camera_id)
+                for zone_id, count in zones.items():
+                    record_zone_occupancy(zone_id, count, camera_id)
+                self._occupied[camera_id] = set(zones)
     
-    compliance_rate.set(safety_check.get('compliance_rate', 100))
+    def forget_camera(self, camera_id: str):
+        with self._flush_lock:
+            self._occupied.pop(camera_id, None)
+            for key in list(_children):
+                metric, labelvalues = key
+                if metric in CAMERA_METRICS and labelvalues[-1] == camera_id:
+                    del _children[key]
+                    metric.remove(*labelvalues)
+
+
+frame_metrics = FrameMetrics()
+
+
+def record_inference(
+    detections: Detections,
+    safety_check: dict,
+    camera_id: str = "default",
+    violations: Iterable = (),
+    occupancy: Optional[Dict[str, int]] = None
+):
+    frame_metrics.record(
+        Detections.from_any(detections),
+        safety_check,
+        camera_id,
+        violations,
+        occupancy
+    )
+
+
+def record_frame_time(
+    duration: float,
+    stages: Optional[Dict[str, float]] = None,
+    camera_id: str = "default",
+    backend: str = ""
+):
+    frame_metrics.record_duration(duration, stages, camera_id, backend)
+
+
+def record_violation(violation_type: str, zone_id: str = "global", count: int = 1):
+    bound(violations_total, violation_type, zone_id).inc(count)
+
+
+def record_batch(size: int, queue_waits: list):
+    batch_size.observe(size)
+    observe_many(batch_queue_wait, queue_waits)
+
+
+def record_quality_mode(camera_id: str, level: int, input_size: int, skip: int):
+    bound(camera_quality_level, camera_id).set(level)
+    bound(camera_input_size, camera_id).set(input_size)
+    bound(camera_frame_skip, camera_id).set(skip)
 
 
-def record_violation(violation_type: str, zone_id: str = "global"):
-    violations_total.labels(violation_type=violation_type, zone_id=zone_id).inc()
+def record_extrapolated_frame(camera_id: str):
+    bound(camera_extrapolated_frames, camera_id).inc()
 
 
 def record_tracks(count: int):
     active_tracks.set(count)
 
 
-def record_zone_occupancy(zone_id: str, count: int):
-    people_in_zones.labels(zone_id=zone_id).set(count)
+def record_zone_occupancy(zone_id: str, count: int, camera_id: str = "default"):
+    bound(people_in_zones, zone_id, camera_id).set(count)
 
 
 class InferenceTimer:
@@ -0,0 +1,139 @@
+import numpy as np
+from typing import Optional
+
+try:
+    import cv2
+    CV2_NMS_AVAILABLE = hasattr(cv2, 'dnn') and hasattr(cv2.dnn, 'NMSBoxesBatched')
+except ImportError:
+    CV2_NMS_AVAILABLE = False
+
+
+def box_area(boxes: np.ndarray) -> np.ndarray:
+    return np.clip(boxes[:, 2] - boxes[:, 0], 0, None) * np.clip(boxes[:, 3] - boxes[:, 1], 0, None)
+
+
+def box_iou(boxes1: np.ndarray, boxes2: np.ndarray) -> np.ndarray:
+    area1 = box_area(boxes1)
+    area2 = box_area(boxes2)
+    
+    top_left = np.maximum(boxes1[:, None, :2], boxes2[None, :, :2])
+    bottom_right = np.minimum(boxes1[:, None, 2:], boxes2[None, :, 2:])
+    wh = np.clip(bottom_right - top_left, 0, None)
+    inter = wh[..., 0] * wh[..., 1]
+    
+    union = area1[:, None] + area2[None, :] - inter
+    return np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+
+
+def box_iou_pairs(boxes1: np.ndarray, boxes2: np.ndarray) -> np.ndarray:
+    top_left = np.maximum(boxes1[:, :2], boxes2[:, :2])
+    bottom_right = np.minimum(boxes1[:, 2:], boxes2[:, 2:])
+    wh = np.clip(bottom_right - top_left, 0, None)
+    inter = wh[:, 0] * wh[:, 1]
+    
+    union = box_area(boxes1) + box_area(boxes2) - inter
+    return np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+
+
+def box_coverage(boxes1: np.ndarray, boxes2: np.ndarray) -> np.ndarray:
+    area2 = box_area(boxes2)
+    
+    top_left = np.maximum(boxes1[:, None, :2], boxes2[None, :, :2])
+    bottom_right = np.minimum(boxes1[:, None, 2:], boxes2[None, :, 2:])
+    wh = np.clip(bottom_right - top_left, 0, None)
+    inter = wh[..., 0] * wh[..., 1]
+    
+    area2 = np.broadcast_to(area2[None, :], inter.shape)
+    return np.divide(inter, area2, out=np.zeros_like(inter), where=area2 > 0)
+
+
+def xywh_to_xyxy(boxes: np.ndarray) -> np.ndarray:
+    half = boxes[:, 2:4] / 2
+    return np.concatenate([boxes[:, :2] - half, boxes[:, :2] + half], axis=1)
+
+
+def non_max_suppression(
+    boxes: np.ndarray,
+    scores: np.ndarray,
+    class_ids: Optional[np.ndarray] = None,
+    iou_threshold: float = 0.45,
+    top_k: Optional[int] = None,
+    max_candidates: Optional[int] = None
+) -> np.ndarray:
+    if CV2_NMS_AVAILABLE:
+        return nms_cv2(boxes, scores, class_ids, iou_threshold, top_k, max_candidates)
+    return nms_numpy(boxes, scores, class_ids, iou_threshold, top_k, max_candidates)
+
+
+def nms_cv2(
+    boxes: np.ndarray,
+    scores: np.ndarray,
+    class_ids: Optional[np.ndarray] = None,
+    iou_threshold: float = 0.45,
+    top_k: Optional[int] = None,
+    max_candidates: Optional[int] = None
+) -> np.ndarray:
+    if len(boxes) == 0:
+        return np.empty(0, dtype=np.int64)
+    
+    xywh = np.concatenate([boxes[:, :2], boxes[:, 2:] - boxes[:, :2]], axis=1)
+    class_ids = np.zeros(len(boxes), dtype=np.int64) if class_ids is None else class_ids
+    
+    keep = cv2.dnn.NMSBoxesBatched(
+        xywh.tolist(),
+        scores.tolist(),
+        class_ids.tolist(),
+        float('-inf'),
+        iou_threshold,
+        top_k=max_candidates or 0
+    )
+    keep = np.asarray(keep, dtype=np.int64).ravel()
+    if top_k is not None and top_k > 0:
+        keep = keep[:top_k]
+    return keep
+
+
+def nms_numpy(
+    boxes: np.ndarray,
+    scores: np.ndarray,
+    class_ids: Optional[np.ndarray] = None,
+    iou_threshold: float = 0.45,
+    top_k: Optional[int] = None,
+    max_candidates: Optional[int] = None
+) -> np.ndarray:
+    if len(boxes) == 0:
+        return np.empty(0, dtype=np.int64)
+    
+    boxes = boxes.astype(np.float32, copy=False)
+    
+    if class_ids is not None and len(boxes) > 1:
+        offset = float(boxes.max() - boxes.min()) + 1.0
+        boxes = boxes + (class_ids.astype(np.float32) * offset)[:, None]
+    
+    if max_candidates is not None and len(scores) > max_candidates:
+        cutoff = np.partition(scores, len(scores) - max_candidates)[len(scores) - max_candidates]
+        above = np.flatnonzero(scores > cutoff)
+        ties = np.flatnonzero(scores == cutoff)[:max_candidates - len(above)]
+        order = np.sort(np.concatenate([above, ties]))
+        order = order[np.argsort(-scores[order], kind='stable')]
+    else:
+        order = np.argsort(-scores, kind='stable')
+    
+    x1, y1, x2, y2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    areas = (x2 - x1) * (y2 - y1)
+    
+    limit = top_k if top_k is not None and top_k > 0 else len(order)
+    keep = []
+    
+    while order.size > 0 and len(keep) < limit:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        
+        w = np.maximum(np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest]), 0)
+        h = np.maximum(np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest]), 0)
+        inter = w * h
+        
+        order = rest[inter <= iou_threshold * (areas[i] + areas[rest] - inter)]
+    
+    return np.asarray(keep, dtype=np.int64)
@@ -0,0 +1,174 @@
+import hashlib
+import json
+import os
+import platform
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import structlog
+
+try:
+    import onnxruntime as ort
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+from config import settings
+
+logger = structlog.get_logger()
+
+GRAPH_OPTIMIZATION_LEVELS = ("disable", "basic", "extended", "all")
+EXECUTION_MODES = ("sequential", "parallel")
+
+
+def execution_providers() -> List[str]:
+    if settings.ONNX_PROVIDERS:
+        requested = list(settings.ONNX_PROVIDERS)
+    else:
+        requested = ['CPUExecutionProvider']
+        if settings.DEVICE.startswith('cuda'):
+            requested.insert(0, 'CUDAExecutionProvider')
+            if settings.USE_TENSORRT:
+                requested.insert(0, 'TensorrtExecutionProvider')
+    
+    available = set(ort.get_available_providers())
+    providers = [p for p in requested if p in available]
+    return providers or ['CPUExecutionProvider']
+
+
+def graph_optimization_level(name: str) -> "ort.GraphOptimizationLevel":
+    if name not in GRAPH_OPTIMIZATION_LEVELS:
+        raise ValueError(f"Unknown graph optimization level '{name}', expected one of {GRAPH_OPTIMIZATION_LEVELS}")
+    return {
+        "disable": ort.GraphOptimizationLevel.ORT_DISABLE_ALL,
+        "basic": ort.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+        "extended": ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+        "all": ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    }[name]
+
+
+def session_options(
+    intra_op_threads: Optional[int] = None,
+    inter_op_threads: Optional[int] = None
+) -> "ort.SessionOptions":
+    if settings.ONNX_EXECUTION_MODE not in EXECUTION_MODES:
+        raise ValueError(f"Unknown execution mode '{settings.ONNX_EXECUTION_MODE}', expected one of {EXECUTION_MODES}")
+    
+    intra_op_threads = settings.ONNX_INTRA_OP_THREADS if intra_op_threads is None else intra_op_threads
+    inter_op_threads = settings.ONNX_INTER_OP_THREADS if inter_op_threads is None else inter_op_threads
+    
+    options = ort.SessionOptions()
+    options.graph_optimization_level = graph_optimization_level(settings.ONNX_GRAPH_OPTIMIZATION)
+    options.execution_mode = (
+        ort.ExecutionMode.ORT_PARALLEL
+        if settings.ONNX_EXECUTION_MODE == "parallel"
+        else ort.ExecutionMode.ORT_SEQUENTIAL
+    )
+    if intra_op_threads > 0:
+        options.intra_op_num_threads = intra_op_threads
+    if inter_op_threads > 0:
+        options.inter_op_num_threads = inter_op_threads
+    options.enable_cpu_mem_arena = settings.ONNX_ENABLE_MEM_ARENA
+    options.enable_mem_pattern = settings.ONNX_ENABLE_MEM_PATTERN
+    options.add_session_config_entry(
+        "session.intra_op.allow_spinning", "1" if settings.ONNX_ALLOW_SPINNING else "0"
+    )
+    return options
+
+
+def optimized_model_path(model_path: str, providers: List[str]) -> Path:
+    source = Path(model_path)
+    stat = source.stat()
+    key = hashlib.sha1(json.dumps([
+        str(source.resolve()),
+        stat.st_size,
+        stat.st_mtime_ns,
+        ort.__version__,
+        platform.machine(),
+        providers,
+        settings.ONNX_GRAPH_OPTIMIZATION
+    ]).encode()).hexdigest()[:16]
+    
+    cache_dir = Path(settings.ONNX_CACHE_DIR) if settings.ONNX_CACHE_DIR else source.parent
+    return cache_dir / f"{source.stem}.opt-{key}.onnx"
+
+
+def create_session(
+    model_path: str,
+    intra_op_threads: Optional[int] = None,
+    inter_op_threads: Optional[int] = None
+) -> "ort.InferenceSession":
+    providers = execution_providers()
+    options = session_options(intra_op_threads, inter_op_threads)
+    
+    if not settings.ONNX_OPTIMIZED_CACHE or settings.ONNX_GRAPH_OPTIMIZATION == "disable":
+        return ort.InferenceSession(model_path, sess_options=options, providers=providers)
+    
+    cached = optimized_model_path(model_path, providers)
+    if cached.exists():
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_DISABLE_ALL
+        try:
+            session = ort.InferenceSession(str(cached), sess_options=options, providers=providers)
+            logger.info("onnx_optimized_model_loaded", path=str(cached))
+            return session
+        except Exception as e:
+            logger.warning("onnx_optimized_model_invalid", path=str(cached), error=str(e))
+            options = session_options(intra_op_threads, inter_op_threads)
+    
+    try:
+        cached.parent.mkdir(parents=True, exist_ok=True)
+        writable = os.access(cached.parent, os.W_OK)
+    except OSError:
+        writable = False
+    if not writable:
+        logger.warning("onnx_optimized_model_cache_unwritable", path=str(cached.parent))
+        return ort.InferenceSession(model_path, sess_options=options, providers=providers)
+    
+    tmp_path = f"{cached}.{os.getpid()}.{threading.get_ident()}.tmp"
+    options.optimized_model_filepath = tmp_path
+    session = ort.InferenceSession(model_path, sess_options=options, providers=providers)
+    
+    if os.path.exists(tmp_path):
+        os.replace(tmp_path, cached)
+        logger.info("onnx_optimized_model_saved", path=str(cached))
+    return session
+
+
+class SessionRunner:
+    
+    def __init__(self, session: "ort.InferenceSession", io_binding: bool = True):
+        self.session = session
+        self.io_binding = io_binding
+        self.input_name = session.get_inputs()[0].name
+        self.output_names = [output.name for output in session.get_outputs()]
+        self._local = threading.local()
+    
+    def run(self, blob: np.ndarray) -> List[np.ndarray]:
+        if not self.io_binding:
+            return self.session.run(None, {self.input_name: blob})
+        
+        bindings: Dict[Tuple[int, ...], Tuple["ort.IOBinding", List[np.ndarray]]] = getattr(
+            self._local, 'bindings', None
+        )
+        if bindings is None:
+            bindings = self._local.bindings = {}
+        
+        entry = bindings.get(blob.shape)
+        if entry is None:
+            binding = self.session.io_binding()
+            binding.bind_cpu_input(self.input_name, blob)
+            for name in self.output_names:
+                binding.bind_output(name, 'cpu')
+            self.session.run_with_iobinding(binding)
+            
+            outputs = binding.copy_outputs_to_cpu()
+            for name, output in zip(self.output_names, outputs):
+                binding.bind_output(name, 'cpu', 0, output.dtype, list(output.shape), output.ctypes.data)
+            bindings[blob.shape] = (binding, outputs)
+            return outputs
+        
+        binding, outputs = entry
+        binding.bind_cpu_input(self.input_name, blob)
+        self.session.run_with_iobinding(binding)
+        return outputs
@@ -0,0 +1,69 @@
+import numpy as np
+from typing import Optional, Tuple
+
+from config import CLASS_NAMES
+from detections import Detections, CLASS_IDS
+
+PPE_OVERLAP_THRESHOLD = 0.3
+
+PPE_ITEMS: Tuple[Tuple[str, str], ...] = (
+    ('Hardhat', 'NO-Hardhat'),
+    ('Safety Vest', 'NO-Safety Vest'),
+    ('Mask', 'NO-Mask'),
+)
+PRESENT_NAMES = np.asarray([present for present, _ in PPE_ITEMS], dtype=object)
+MISSING_NAMES = np.asarray([missing for _, missing in PPE_ITEMS], dtype=object)
+PRESENT_IDS = np.asarray([CLASS_IDS[name] for name in PRESENT_NAMES], dtype=np.int32)
+PPE_ITEM_CLASSES = set(PRESENT_NAMES) | set(MISSING_NAMES)
+
+SLOT_OF_CLASS = np.full(len(CLASS_NAMES), -1, dtype=np.intp)
+for _item, (_present, _missing) in enumerate(PPE_ITEMS):
+    SLOT_OF_CLASS[CLASS_IDS[_present]] = 2 * _item
+    SLOT_OF_CLASS[CLASS_IDS[_missing]] = 2 * _item + 1
+
+
+def ppe_flags(persons: Detections, ppe: Detections) -> Tuple[np.ndarray, np.ndarray]:
+    seen = np.zeros((len(persons), 2 * len(PPE_ITEMS)), dtype=bool)
+    if not persons or not ppe:
+        return seen[:, 0::2], seen[:, 1::2]
+    
+    slots = SLOT_OF_CLASS[ppe.class_ids]
+    ppe = ppe.filter(slots >= 0)
+    slots = slots[slots >= 0]
+    
+    rows, cols = np.nonzero(persons.coverage(ppe) > PPE_OVERLAP_THRESHOLD)
+    seen[rows, slots[cols]] = True
+    return seen[:, 0::2], seen[:, 1::2]
+
+
+def associate_ppe(persons: Detections, ppe: Detections) -> np.ndarray:
+    present, missing = ppe_flags(persons, ppe)
+    status = np.zeros(present.shape, dtype=np.int8)
+    status[present] = 1
+    status[missing] = -1
+    return status
+
+
+def worn_matrix(present: np.ndarray) -> np.ndarray:
+    worn = np.zeros((len(present), len(CLASS_NAMES)), dtype=bool)
+    worn[:, PRESENT_IDS] = present
+    return worn
+
+
+class PPEVote:
+    
+    __slots__ = ('votes', 'cursor', 'status', 'box', 'frame')
+    
+    def __init__(self, window: int):
+        self.votes = np.zeros((max(1, window), len(PPE_ITEMS)), dtype=np.int8)
+        self.cursor = 0
+        self.status = np.zeros(len(PPE_ITEMS), dtype=np.int8)
+        self.box: Optional[np.ndarray] = None
+        self.frame = 0
+    
+    def add(self, observation: np.ndarray, box: np.ndarray, frame: int):
+        self.votes[self.cursor] = observation
+        self.cursor = (self.cursor + 1) % len(self.votes)
+        self.status = np.sign(self.votes.sum(axis=0, dtype=np.int16)).astype(np.int8)
+        self.box = box
+        self.frame = frame
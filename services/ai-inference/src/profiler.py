@@ -0,0 +1,147 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Deque, Dict, Optional
+import structlog
+
+from config import settings
+
+logger = structlog.get_logger()
+
+
+class ProfilerBusyError(RuntimeError):
+    pass
+
+
+class SamplingProfiler:
+    
+    def __init__(self, max_depth: int = 128):
+        self.max_depth = max_depth
+        self._lock = threading.Lock()
+    
+    @property
+    def active(self) -> bool:
+        return self._lock.locked()
+    
+    def run(self, duration_s: float, interval_s: float, thread_filter: Optional[str] = None) -> Dict:
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusyError("A profile is already running")
+        
+        try:
+            return self._sample(duration_s, interval_s, thread_filter)
+        finally:
+            self._lock.release()
+    
+    def _sample(self, duration_s: float, interval_s: float, thread_filter: Optional[str]) -> Dict:
+        own_id = threading.get_ident()
+        stacks: Counter = Counter()
+        labels: Dict[tuple, str] = {}
+        samples = 0
+        overruns = 0
+        
+        logger.info("profiler_started", duration_s=duration_s, interval_ms=interval_s * 1000)
+        start = time.perf_counter()
+        deadline = start + duration_s
+        next_tick = start
+        
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            if now < next_tick:
+                time.sleep(next_tick - now)
+            elif now - next_tick > interval_s:
+                overruns += 1
+                next_tick = now
+            next_tick += interval_s
+            
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                name = names.get(thread_id, f"thread-{thread_id}")
+                if thread_filter and thread_filter not in name:
+                    continue
+                
+                codes = []
+                while frame is not None and len(codes) < self.max_depth:
+                    codes.append((frame.f_code, frame.f_lineno))
+                    frame = frame.f_back
+                stacks[(name, tuple(codes))] += 1
+            samples += 1
+        
+        elapsed = time.perf_counter() - start
+        lines = []
+        for (name, codes), count in stacks.most_common():
+            parts = [name.replace(";", "_").replace(" ", "_")]
+            for code, lineno in reversed(codes):
+                key = (code, lineno)
+                label = labels.get(key)
+                if label is None:
+                    label = labels[key] = (
+                        f"{code.co_name} ({os.path.basename(code.co_filename)}:{lineno})".replace(";", "_")
+                    )
+                parts.append(label)
+            lines.append(f"{';'.join(parts)} {count}")
+        
+        logger.info("profiler_finished", samples=samples, stacks=len(stacks), overruns=overruns)
+        return {
+            'collapsed': "\n".join(lines) + ("\n" if lines else ""),
+            'samples': samples,
+            'stacks': len(stacks),
+            'overruns': overruns,
+            'elapsed_s': round(elapsed, 3)
+        }
+
+
+class LoopLagMonitor:
+    
+    def __init__(self, interval_s: Optional[float] = None, window: int = 120):
+        self.interval_s = interval_s if interval_s is not None else settings.LOOP_LAG_INTERVAL_S
+        self._lags: Deque[float] = deque(maxlen=window)
+        self._max = 0.0
+        self._task: Optional[asyncio.Task] = None
+    
+    def start(self):
+        if self._task is None and self.interval_s > 0:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+    
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval_s
+            await asyncio.sleep(self.interval_s)
+            lag = max(0.0, loop.time() - expected)
+            
+            self._lags.append(lag)
+            self._max = max(self._max, lag)
+    
+    def stats(self) -> Dict:
+        lags = sorted(self._lags)
+        if not lags:
+            return {'samples': 0, 'interval_ms': self.interval_s * 1000}
+        
+        def ms(value: float) -> float:
+            return round(value * 1000, 3)
+        
+        return {
+            'samples': len(lags),
+            'interval_ms': self.interval_s * 1000,
+            'last_ms': ms(self._lags[-1]),
+            'mean_ms': ms(sum(lags) / len(lags)),
+            'p95_ms': ms(lags[min(len(lags) - 1, int(len(lags) * 0.95))]),
+            'max_window_ms': ms(lags[-1]),
+            'max_ms': ms(self._max)
+        }
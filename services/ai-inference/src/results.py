@@ -0,0 +1,50 @@
+import threading
+from typing import Callable, Dict, List, Optional
+import structlog
+
+logger = structlog.get_logger()
+
+Subscriber = Callable[[str, Dict], None]
+
+
+class ResultHub:
+    
+    def __init__(self):
+        self._latest: Dict[str, Dict] = {}
+        self._subscribers: Dict[Optional[str], List[Subscriber]] = {}
+        self._lock = threading.Lock()
+    
+    def publish(self, camera_id: str, result: Dict):
+        with self._lock:
+            self._latest[camera_id] = result
+            subscribers = self._subscribers.get(camera_id, []) + self._subscribers.get(None, [])
+        
+        for callback in subscribers:
+            try:
+                callback(camera_id, result)
+            except Exception as e:
+                logger.warning("result_subscriber_failed", camera_id=camera_id, error=str(e))
+    
+    def latest(self, camera_id: str) -> Optional[Dict]:
+        return self._latest.get(camera_id)
+    
+    def cameras(self) -> List[str]:
+        return list(self._latest)
+    
+    def subscribe(self, callback: Subscriber, camera_id: Optional[str] = None) -> Callable[[], None]:
+        with self._lock:
+            self._subscribers.setdefault(camera_id, []).append(callback)
+        
+        def unsubscribe():
+            with self._lock:
+                callbacks = self._subscribers.get(camera_id, [])
+                if callback in callbacks:
+                    callbacks.remove(callback)
+                if not callbacks:
+                    self._subscribers.pop(camera_id, None)
+        
+        return unsubscribe
+    
+    def forget(self, camera_id: str):
+        with self._lock:
+            self._latest.pop(camera_id, None)
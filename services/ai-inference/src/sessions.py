@@ -0,0 +1,174 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional
+import structlog
+
+from config import settings
+from tracker import ObjectTracker
+from debounce import ViolationDebouncer
+
+logger = structlog.get_logger()
+
+DEFAULT_CAMERA_ID = "default"
+
+
+def default_tracker_factory() -> ObjectTracker:
+    return ObjectTracker(
+        max_distance=settings.TRACKER_MAX_DISTANCE,
+        hit_counter_max=settings.TRACKER_HIT_COUNTER_MAX
+    )
+
+
+@dataclass
+class CameraSession:
+    camera_id: str
+    tracker: ObjectTracker
+    debouncer: ViolationDebouncer = field(default_factory=ViolationDebouncer)
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    created_at: float = field(default_factory=time.time)
+    last_seen: float = field(default_factory=time.time)
+    frames: int = 0
+    refs: int = 0
+    close_on_release: bool = False
+    
+    def touch(self):
+        self.last_seen = time.time()
+        self.frames += 1
+    
+    def to_dict(self) -> Dict:
+        return {
+            'camera_id': self.camera_id,
+            'frames': self.frames,
+            'active_tracks': len(self.tracker.track_history),
+            'open_incidents': self.debouncer.open_count,
+            'users': self.refs,
+            'created_at': int(self.created_at * 1000),
+            'last_seen': int(self.last_seen * 1000)
+        }
+
+
+class CameraSessionRegistry:
+    
+    def __init__(
+        self,
+        max_sessions: Optional[int] = None,
+        idle_ttl_s: Optional[float] = None,
+        tracker_factory: Callable[[], ObjectTracker] = default_tracker_factory,
+        on_remove: Optional[Callable[[CameraSession], None]] = None
+    ):
+        self.max_sessions = max(1, max_sessions or settings.SESSION_MAX_CAMERAS)
+        self.idle_ttl_s = idle_ttl_s if idle_ttl_s is not None else settings.SESSION_IDLE_TTL_S
+        self.tracker_factory = tracker_factory
+        self.on_remove = on_remove
+        self._sessions: "OrderedDict[str, CameraSession]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._sessions)
+    
+    def __contains__(self, camera_id: str) -> bool:
+        return camera_id in self._sessions
+    
+    def get(self, camera_id: Optional[str] = None) -> CameraSession:
+        return self._checkout(camera_id, refs=0)
+    
+    def acquire(self, camera_id: Optional[str] = None, stream: bool = False) -> CameraSession:
+        return self._checkout(camera_id, refs=1, stream=stream)
+    
+    def release(self, session: CameraSession):
+        with self._lock:
+            session.refs -= 1
+            if session.refs > 0 or not session.close_on_release:
+                return
+            if self._sessions.get(session.camera_id) is not session:
+                return
+            del self._sessions[session.camera_id]
+        
+        logger.info("camera_session_released", camera_id=session.camera_id)
+        self._removed([session])
+    
+    @contextmanager
+    def hold(self, camera_id: Optional[str] = None) -> Iterator[CameraSession]:
+        session = self.acquire(camera_id)
+        try:
+            yield session
+        finally:
+            self.release(session)
+    
+    def _checkout(self, camera_id: Optional[str], refs: int, stream: bool = False) -> CameraSession:
+        camera_id = camera_id or DEFAULT_CAMERA_ID
+        
+        with self._lock:
+            session = self._sessions.get(camera_id)
+            if session is None:
+                session = CameraSession(camera_id=camera_id, tracker=self.tracker_factory(), close_on_release=stream)
+                self._sessions[camera_id] = session
+                logger.info("camera_session_created", camera_id=camera_id)
+            else:
+                self._sessions.move_to_end(camera_id)
+                session.close_on_release = session.close_on_release and stream
+            session.refs += refs
+            session.last_seen = time.time()
+            
+            evicted = self._evict_locked(keep=camera_id)
+        
+        self._removed(evicted)
+        return session
+    
+    def remove(self, camera_id: str) -> bool:
+        with self._lock:
+            session = self._sessions.pop(camera_id, None)
+        if session is None:
+            return False
+        logger.info("camera_session_removed", camera_id=camera_id)
+        self._removed([session])
+        return True
+    
+    def evict_idle(self) -> List[str]:
+        with self._lock:
+            evicted = self._evict_locked()
+        self._removed(evicted)
+        return [s.camera_id for s in evicted]
+    
+    def _removed(self, removed: List[CameraSession]):
+        if self.on_remove is None:
+            return
+        for session in removed:
+            try:
+                self.on_remove(session)
+            except Exception as e:
+                logger.warning("camera_session_cleanup_failed", camera_id=session.camera_id, error=str(e))
+    
+    def sessions(self) -> List[CameraSession]:
+        with self._lock:
+            return list(self._sessions.values())
+    
+    def total_tracks(self) -> int:
+        return sum(len(s.tracker.track_history) for s in self.sessions())
+    
+    def _evict_locked(self, keep: Optional[str] = None) -> List[CameraSession]:
+        evicted = []
+        
+        if self.idle_ttl_s > 0:
+            cutoff = time.time() - self.idle_ttl_s
+            for camera_id, session in list(self._sessions.items()):
+                if session.last_seen >= cutoff:
+                    break
+                if camera_id != keep and not session.refs:
+                    evicted.append(self._sessions.pop(camera_id))
+        
+        excess = len(self._sessions) - self.max_sessions
+        for camera_id, session in list(self._sessions.items()):
+            if excess <= 0:
+                break
+            if camera_id != keep and not session.refs:
+                evicted.append(self._sessions.pop(camera_id))
+                excess -= 1
+        
+        if evicted:
+            logger.info("camera_sessions_evicted", camera_ids=[s.camera_id for s in evicted])
+        
+        return evicted
@@ -0,0 +1,98 @@
+import asyncio
+import json
+from typing import Dict, List, Optional
+
+from config import settings
+from results import ResultHub
+
+
+class ResultSubscription:
+    
+    def __init__(
+        self,
+        hub: ResultHub,
+        camera_id: Optional[str],
+        loop: asyncio.AbstractEventLoop,
+        maxsize: Optional[int] = None
+    ):
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize or settings.STREAM_PUSH_QUEUE_SIZE)
+        self.dropped = 0
+        self._unsubscribe = hub.subscribe(self._on_result, camera_id)
+    
+    def _on_result(self, camera_id: str, result: Dict):
+        self.loop.call_soon_threadsafe(self._put, result)
+    
+    def _put(self, result: Dict):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(result)
+    
+    async def get(self, timeout: Optional[float] = None) -> Optional[Dict]:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+    
+    def close(self):
+        self._unsubscribe()
+
+
+class DeltaEncoder:
+    
+    def __init__(self, min_move_px: Optional[int] = None):
+        self.min_move_px = min_move_px if min_move_px is not None else settings.STREAM_DELTA_MIN_MOVE_PX
+        self._tracks: Dict[int, Dict] = {}
+    
+    def _changed(self, previous: Dict, current: Dict) -> bool:
+        if previous['class_id'] != current['class_id']:
+            return True
+        return any(abs(a - b) > self.min_move_px for a, b in zip(previous['bbox'], current['bbox']))
+    
+    def encode(self, result: Dict) -> Dict:
+        current: Dict[int, Dict] = {}
+        untracked: List[Dict] = []
+        
+        for det in result.get('detections', []):
+            track_id = det.get('track_id')
+            if track_id is None:
+                untracked.append(det)
+            else:
+                current[track_id] = det
+        
+        added = [d for t, d in current.items() if t not in self._tracks]
+        updated = [d for t, d in current.items() if t in self._tracks and self._changed(self._tracks[t], d)]
+        removed = [t for t in self._tracks if t not in current]
+        
+        for det in added + updated:
+            self._tracks[det['track_id']] = det
+        for track_id in removed:
+            del self._tracks[track_id]
+        
+        payload = {k: v for k, v in result.items() if k != 'detections'}
+        payload.update({
+            'type': 'delta',
+            'added': added,
+            'updated': updated,
+            'removed': removed,
+            'untracked': untracked
+        })
+        return payload
+
+
+def result_message(camera_id: str, result: Dict, encoder: Optional[DeltaEncoder] = None) -> Dict:
+    if encoder is not None:
+        payload = encoder.encode(result)
+    else:
+        payload = dict(result, type='result')
+    payload['camera_id'] = camera_id
+    return payload
+
+
+def sse_event(payload: Dict, event: Optional[str] = None) -> str:
+    lines = []
+    if event:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(payload, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
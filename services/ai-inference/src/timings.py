@@ -0,0 +1,84 @@
+import time
+from typing import Dict, List, Optional, Sequence, Union
+
+STAGES = (
+    "queue",
+    "decode",
+    "preprocess",
+    "inference",
+    "postprocess",
+    "tracking",
+    "safety",
+    "zones",
+    "serialize",
+)
+
+
+class StageTimings:
+    
+    __slots__ = ('durations',)
+    
+    def __init__(self):
+        self.durations: Dict[str, float] = {}
+    
+    def add(self, name: str, seconds: float):
+        self.durations[name] = self.durations.get(name, 0.0) + seconds
+    
+    def to_ms(self) -> Dict[str, float]:
+        return {name: round(seconds * 1000, 3) for name, seconds in self.durations.items()}
+
+
+class TimingsGroup:
+    
+    __slots__ = ('members',)
+    
+    def __init__(self, members: List[StageTimings]):
+        self.members = members
+    
+    def add(self, name: str, seconds: float):
+        for member in self.members:
+            member.add(name, seconds)
+
+
+TimingsTarget = Optional[Union[StageTimings, TimingsGroup]]
+
+
+class _Stage:
+    
+    __slots__ = ('target', 'name', 'start')
+    
+    def __init__(self, target: Union[StageTimings, TimingsGroup], name: str):
+        self.target = target
+        self.name = name
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, *args):
+        self.target.add(self.name, time.perf_counter() - self.start)
+
+
+class _NullStage:
+    
+    __slots__ = ()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *args):
+        pass
+
+
+NULL_STAGE = _NullStage()
+
+
+def stage(target: TimingsTarget, name: str):
+    if target is None:
+        return NULL_STAGE
+    return _Stage(target, name)
+
+
+def group(timings: Optional[Sequence[Optional[StageTimings]]]) -> Optional[TimingsGroup]:
+    members = [t for t in timings or () if t is not None]
+    return TimingsGroup(members) if members else None
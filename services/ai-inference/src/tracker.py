@@ -1,5 +1,6 @@
 import numpy as np
-from typing import List, Dict, Optional
+from collections import OrderedDict
+from typing import List, Dict, Optional, Tuple, Union
 from dataclasses import dataclass
 import structlog
 
@@ -10,23 +11,27 @@ try:
 except ImportError:
     NORFAIR_AVAILABLE = False
 
-from config import settings
+from config import settings, CLASS_NAMES
+from detections import Detections, PERSON_CLASS_ID
+from iou_tracker import IoUTracker
+from nms import box_iou_pairs
+from ppe import PPEVote, PPE_ITEMS, PPE_ITEM_CLASSES, associate_ppe
 
 logger = structlog.get_logger()
 
+TRACKER_BACKENDS = ("iou", "norfair")
 
-@dataclass
+
+@dataclass(slots=True)
 class TrackedObject:
     track_id: int
     class_name: str
-    bbox: List[int]
+    bbox: Tuple[int, int, int, int]
     confidence: float
     age: int = 0
-    violations: List[str] = None
-    
-    def __post_init__(self):
-        if self.violations is None:
-            self.violations = []
+    last_seen: int = 0
+    violations: Tuple[str, ...] = ()
+    ppe: Optional[PPEVote] = None
 
 
 class ObjectTracker:
@@ -34,100 +39,219 @@ class ObjectTracker:
     def __init__(
         self,
         max_distance: int = 100,
-        hit_counter_max: int = 15
+        hit_counter_max: int = 15,
+        backend: Optional[str] = None,
+        max_history: Optional[int] = None
     ):
-        self.enabled = settings.ENABLE_TRACKING and NORFAIR_AVAILABLE
+        self.backend = backend or settings.TRACKER_BACKEND
+        if self.backend not in TRACKER_BACKENDS:
+            raise ValueError(f"Unknown tracker backend: {self.backend}")
+        
+        available = NORFAIR_AVAILABLE or self.backend != "norfair"
+        self.enabled = settings.ENABLE_TRACKING and available
         self.max_distance = max_distance
         self.hit_counter_max = hit_counter_max
+        self.max_history = max(1, max_history or settings.TRACKER_HISTORY_MAX)
+        self.ppe_window = settings.PPE_VOTE_WINDOW
+        self.ppe_reassociate_frames = max(1, settings.PPE_REASSOCIATE_FRAMES)
+        self.ppe_reassociate_iou = settings.PPE_REASSOCIATE_IOU
         self.tracker = None
-        self.track_history: Dict[int, TrackedObject] = {}
+        self.frame_index = 0
+        self.track_history: "OrderedDict[int, TrackedObject]" = OrderedDict()
+        self.last_tracked = Detections.empty()
         
         if self.enabled:
             self._init_tracker()
-            logger.info("tracker_initialized", backend="norfair")
+            logger.info("tracker_initialized", backend=self.backend)
         else:
-            logger.warning("tracker_disabled", reason="norfair not available" if not NORFAIR_AVAILABLE else "disabled in config")
+            logger.warning("tracker_disabled", reason="norfair not available" if not available else "disabled in config")
     
     def _init_tracker(self):
-        self.tracker = NorfairTracker(
-            distance_function=self._euclidean_distance,
-            distance_threshold=self.max_distance,
-            hit_counter_max=self.hit_counter_max,
-            initialization_delay=3
-        )
+        if self.backend == "norfair":
+            self.tracker = NorfairTracker(
+                distance_function=self._euclidean_distance,
+                distance_threshold=self.max_distance,
+                hit_counter_max=self.hit_counter_max,
+                initialization_delay=3
+            )
+        else:
+            self.tracker = IoUTracker(
+                iou_threshold=settings.TRACKER_IOU_THRESHOLD,
+                high_threshold=settings.TRACKER_HIGH_THRESHOLD,
+                min_hits=settings.TRACKER_MIN_HITS,
+                max_age=self.hit_counter_max,
+                assignment=settings.TRACKER_ASSIGNMENT
+            )
     
     def _euclidean_distance(self, detection, tracked_object):
         det_center = detection.points.mean(axis=0)
         track_center = tracked_object.estimate.mean(axis=0)
         return np.linalg.norm(det_center - track_center)
     
-    def _to_norfair_detections(self, detections: List[Dict]) -> List:
+    def _to_norfair_detections(self, detections: Detections) -> List:
         norfair_dets = []
-        for det in detections:
-            x1, y1, x2, y2 = det['bbox']
-            points = np.array([[x1, y1], [x2, y2]])
-            scores = np.array([det['confidence'], det['confidence']])
+        rows = zip(detections.boxes.tolist(), detections.scores.tolist(), detections.class_ids.tolist())
+        for bbox, confidence, class_id in rows:
+            points = np.array(bbox).reshape(2, 2)
+            scores = np.array([confidence, confidence])
             norfair_det = Detection(
                 points=points,
                 scores=scores,
-                data=det
+                data=(bbox, confidence, class_id)
             )
             norfair_dets.append(norfair_det)
         return norfair_dets
     
-    def update(self, detections: List[Dict]) -> List[Dict]:
-        if not self.enabled or not detections:
+    def _update_norfair(self, detections: Detections) -> Detections:
+        if not detections:
             return detections
         
         norfair_dets = self._to_norfair_detections(detections)
         tracked_objects = self.tracker.update(detections=norfair_dets)
         
-        tracked_detections = []
+        rows = []
+        track_ids = []
         for obj in tracked_objects:
             if obj.last_detection is None:
                 continue
-            
-            det = obj.last_detection.data.copy()
-            det['track_id'] = obj.id
-            
-            if obj.id not in self.track_history:
-                self.track_history[obj.id] = TrackedObject(
-                    track_id=obj.id,
-                    class_name=det['class_name'],
-                    bbox=det['bbox'],
-                    confidence=det['confidence']
+            rows.append(obj.last_detection.data)
+            track_ids.append(obj.id)
+        
+        if not rows:
+            return Detections.empty()
+        
+        boxes, scores, class_ids = zip(*rows)
+        return Detections(boxes=boxes, scores=scores, class_ids=class_ids, track_ids=track_ids)
+    
+    def update(
+        self,
+        detections: Union[Detections, List[Dict]],
+        conf_threshold: Optional[float] = None
+    ) -> Detections:
+        detections = Detections.from_any(detections)
+        if not self.enabled:
+            self.last_tracked = detections
+            return detections
+        
+        if self.backend == "norfair":
+            tracked = self._update_norfair(detections)
+        else:
+            tracked = self.tracker.update(detections, conf_threshold)
+        
+        self.last_tracked = tracked
+        self.frame_index += 1
+        history = self.track_history
+        rows = zip(
+            tracked.track_ids.tolist(),
+            tracked.boxes.tolist(),
+            tracked.scores.tolist(),
+            tracked.class_ids.tolist()
+        )
+        for track_id, bbox, confidence, class_id in rows:
+            track = history.get(track_id)
+            if track is None:
+                history[track_id] = TrackedObject(
+                    track_id=track_id,
+                    class_name=CLASS_NAMES[class_id],
+                    bbox=tuple(bbox),
+                    confidence=confidence,
+                    last_seen=self.frame_index
                 )
             else:
-                self.track_history[obj.id].bbox = det['bbox']
-                self.track_history[obj.id].confidence = det['confidence']
-                self.track_history[obj.id].age += 1
-            
-            tracked_detections.append(det)
+                track.bbox = tuple(bbox)
+                track.confidence = confidence
+                track.age += 1
+                track.last_seen = self.frame_index
+                history.move_to_end(track_id)
+        
+        self._cleanup_old_tracks()
+        
+        return tracked
+    
+    def extrapolate(self, frame_shape: Optional[Tuple[int, int]] = None) -> Detections:
+        tracked = self.last_tracked
+        if not self.enabled or self.backend != "iou" or not tracked:
+            return tracked
         
-        self._cleanup_old_tracks([obj.id for obj in tracked_objects])
+        self.tracker.predict()
+        boxes, found = self.tracker.boxes_for(tracked.track_ids)
+        if frame_shape is not None:
+            boxes[:, [0, 2]] = np.clip(boxes[:, [0, 2]], 0, frame_shape[1])
+            boxes[:, [1, 3]] = np.clip(boxes[:, [1, 3]], 0, frame_shape[0])
         
-        return tracked_detections
+        tracked = tracked.filter(found)
+        self.last_tracked = Detections(
+            boxes=boxes,
+            scores=tracked.scores,
+            class_ids=tracked.class_ids,
+            track_ids=tracked.track_ids
+        )
+        return self.last_tracked
+    
+    def _cleanup_old_tracks(self):
+        history = self.track_history
+        expire_before = self.frame_index - self.hit_counter_max * 2
+        
+        while history:
+            track = next(iter(history.values()))
+            if track.last_seen >= expire_before and len(history) <= self.max_history:
+                break
+            history.popitem(last=False)
     
-    def _cleanup_old_tracks(self, active_ids: List[int]):
-        to_remove = []
-        for track_id in self.track_history:
-            if track_id not in active_ids:
-                self.track_history[track_id].age += 1
-                if self.track_history[track_id].age > self.hit_counter_max * 2:
-                    to_remove.append(track_id)
-        
-        for track_id in to_remove:
-            del self.track_history[track_id]
+    def ppe_status(self, detections: Detections, evidence: Optional[Detections] = None) -> Optional[np.ndarray]:
+        if not self.enabled:
+            return None
+        
+        persons = detections.filter(detections.class_ids == PERSON_CLASS_ID)
+        ppe = (detections if evidence is None else evidence).by_class(PPE_ITEM_CLASSES)
+        if not persons:
+            return associate_ppe(persons, ppe)
+        
+        tracks = [self.track_history.get(track_id) for track_id in persons.track_ids.tolist()]
+        cached = np.array([
+            track is not None and track.ppe is not None
+            and self.frame_index - track.ppe.frame < self.ppe_reassociate_frames
+            for track in tracks
+        ], dtype=bool)
+        
+        stale = ~cached
+        cached_idx = np.flatnonzero(cached)
+        if len(cached_idx):
+            last_boxes = np.stack([tracks[i].ppe.box for i in cached_idx.tolist()])
+            moved = box_iou_pairs(persons.boxes[cached_idx].astype(np.float32), last_boxes) < self.ppe_reassociate_iou
+            stale[cached_idx[moved]] = True
+        
+        status = np.zeros((len(persons), len(PPE_ITEMS)), dtype=np.int8)
+        stale_idx = np.flatnonzero(stale)
+        observed = associate_ppe(persons.select(stale_idx), ppe)
+        boxes = persons.boxes.astype(np.float32)
+        
+        for i, observation in zip(stale_idx.tolist(), observed):
+            track = tracks[i]
+            if track is None:
+                status[i] = observation
+                continue
+            if track.ppe is None:
+                track.ppe = PPEVote(self.ppe_window)
+            track.ppe.add(observation, boxes[i], self.frame_index)
+        
+        for i, track in enumerate(tracks):
+            if track is not None:
+                status[i] = track.ppe.status
+        
+        return status
     
     def get_track_info(self, track_id: int) -> Optional[TrackedObject]:
         return self.track_history.get(track_id)
     
     def add_violation(self, track_id: int, violation: str):
-        if track_id in self.track_history:
-            if violation not in self.track_history[track_id].violations:
-                self.track_history[track_id].violations.append(violation)
+        track = self.track_history.get(track_id)
+        if track is not None and violation not in track.violations:
+            track.violations += (violation,)
     
     def reset(self):
         if self.enabled:
             self._init_tracker()
+        self.frame_index = 0
         self.track_history.clear()
+        self.last_tracked = Detections.empty()
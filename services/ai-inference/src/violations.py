@@ -0,0 +1,478 @@
+import json
+import queue
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import structlog
+
+from config import settings
+from zones import ZoneViolation
+
+logger = structlog.get_logger()
+
+EVENT_TYPES = ["violation", "started", "ended"]
+EVENT_CODES = {name: i for i, name in enumerate(EVENT_TYPES)}
+
+
+class ViolationRing:
+    
+    def __init__(self, zone_id: str, capacity: int):
+        self.zone_id = zone_id
+        self.zone_name = zone_id
+        self.severity = "warning"
+        self.capacity = max(1, capacity)
+        self.seq = np.zeros(self.capacity, dtype=np.int64)
+        self.timestamps = np.zeros(self.capacity, dtype=np.int64)
+        self.index_ts = np.zeros(self.capacity, dtype=np.int64)
+        self.camera_codes = np.zeros(self.capacity, dtype=np.int32)
+        self.track_ids = np.zeros(self.capacity, dtype=np.int64)
+        self.missing_codes = np.zeros(self.capacity, dtype=np.int32)
+        self.event_codes = np.zeros(self.capacity, dtype=np.int8)
+        self.started_at = np.zeros(self.capacity, dtype=np.int64)
+        self.durations = np.zeros(self.capacity, dtype=np.int64)
+        self.boxes = np.zeros((self.capacity, 4), dtype=np.int32)
+        self.size = 0
+        self.head = 0
+        self.max_skew = 0
+        self.total = 0
+    
+    def __len__(self) -> int:
+        return self.size
+    
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (
+            self.seq, self.timestamps, self.index_ts, self.camera_codes,
+            self.track_ids, self.missing_codes, self.event_codes,
+            self.started_at, self.durations, self.boxes
+        ))
+    
+    def append(self, seq: int, violation: ZoneViolation, camera_code: int, missing_code: int):
+        i = self.head
+        timestamp = violation.timestamp
+        last_index_ts = self.index_ts[i - 1] if self.size else timestamp
+        index_ts = max(timestamp, int(last_index_ts))
+        self.max_skew = max(self.max_skew, index_ts - timestamp)
+        
+        self.seq[i] = seq
+        self.timestamps[i] = timestamp
+        self.index_ts[i] = index_ts
+        self.camera_codes[i] = camera_code
+        self.track_ids[i] = violation.person_track_id
+        self.missing_codes[i] = missing_code
+        self.event_codes[i] = EVENT_CODES.get(violation.event, 0)
+        self.started_at[i] = violation.started_at
+        self.durations[i] = violation.duration_ms
+        self.boxes[i] = violation.bbox
+        
+        self.head = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        self.total += 1
+    
+    def _segments(self) -> List[slice]:
+        if self.size < self.capacity:
+            return [slice(0, self.size)]
+        return [slice(self.head, self.capacity), slice(0, self.head)]
+    
+    @property
+    def oldest_timestamp(self) -> Optional[int]:
+        if not self.size:
+            return None
+        return int(self.timestamps[self._segments()[0].start])
+    
+    def select(
+        self,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        before_seq: Optional[int] = None,
+        track_id: Optional[int] = None,
+        camera_code: Optional[int] = None,
+        event_code: Optional[int] = None,
+        limit: int = 100
+    ) -> np.ndarray:
+        selected = []
+        remaining = limit
+        
+        for segment in reversed(self._segments()):
+            if remaining <= 0:
+                break
+            
+            index_ts = self.index_ts[segment]
+            lo = int(np.searchsorted(index_ts, start, 'left')) if start is not None else 0
+            hi = len(index_ts)
+            if end is not None:
+                hi = int(np.searchsorted(index_ts, end + self.max_skew, 'right'))
+            if before_seq is not None:
+                hi = min(hi, int(np.searchsorted(self.seq[segment], before_seq, 'left')))
+            if lo >= hi:
+                continue
+            
+            positions = np.arange(segment.start + lo, segment.start + hi)
+            mask = np.ones(len(positions), dtype=bool)
+            if start is not None:
+                mask &= self.timestamps[positions] >= start
+            if end is not None:
+                mask &= self.timestamps[positions] <= end
+            if track_id is not None:
+                mask &= self.track_ids[positions] == track_id
+            if camera_code is not None:
+                mask &= self.camera_codes[positions] == camera_code
+            if event_code is not None:
+                mask &= self.event_codes[positions] == event_code
+            
+            positions = positions[mask][::-1][:remaining]
+            selected.append(positions)
+            remaining -= len(positions)
+        
+        if not selected:
+            return np.empty(0, dtype=np.intp)
+        return np.concatenate(selected)
+
+
+class ViolationRollups:
+    
+    def __init__(self, bucket_s: int, retention_s: int):
+        self.bucket_ms = max(1, bucket_s) * 1000
+        self.max_buckets = max(1, retention_s // max(1, bucket_s))
+        self.buckets: Dict[str, "OrderedDict[int, Dict]"] = {}
+    
+    def add(self, violation: ZoneViolation):
+        timestamp = violation.timestamp
+        bucket_start = timestamp - timestamp % self.bucket_ms
+        zone_buckets = self.buckets.setdefault(violation.zone_id, OrderedDict())
+        
+        bucket = zone_buckets.get(bucket_start)
+        if bucket is None:
+            bucket = zone_buckets[bucket_start] = {
+                'count': 0, 'ended': 0, 'duration_ms': 0, 'tracks': set(), 'missing_ppe': {}
+            }
+            while len(zone_buckets) > self.max_buckets:
+                zone_buckets.popitem(last=False)
+        
+        if violation.event == "ended":
+            bucket['ended'] += 1
+            bucket['duration_ms'] += violation.duration_ms
+            return
+        
+        bucket['count'] += 1
+        if violation.person_track_id >= 0:
+            bucket['tracks'].add(violation.person_track_id)
+        for item in violation.missing_ppe:
+            bucket['missing_ppe'][item] = bucket['missing_ppe'].get(item, 0) + 1
+    
+    def query(
+        self,
+        zone_id: Optional[str] = None,
+        start: Optional[int] = None,
+        end: Optional[int] = None
+    ) -> List[Dict]:
+        zone_ids = [zone_id] if zone_id is not None else list(self.buckets)
+        
+        rollups = []
+        for zid in zone_ids:
+            for bucket_start, bucket in list(self.buckets.get(zid, {}).items()):
+                if start is not None and bucket_start + self.bucket_ms <= start:
+                    continue
+                if end is not None and bucket_start > end:
+                    continue
+                rollups.append({
+                    'zone_id': zid,
+                    'bucket_start': bucket_start,
+                    'bucket_seconds': self.bucket_ms // 1000,
+                    'count': bucket['count'],
+                    'ended': bucket['ended'],
+                    'duration_ms': bucket['duration_ms'],
+                    'unique_tracks': len(bucket['tracks']),
+                    'missing_ppe': dict(bucket['missing_ppe'])
+                })
+        
+        rollups.sort(key=lambda r: (r['bucket_start'], r['zone_id']))
+        return rollups
+
+
+class ViolationLog:
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS violations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp INTEGER NOT NULL,
+            camera_id TEXT NOT NULL,
+            zone_id TEXT NOT NULL,
+            zone_name TEXT,
+            severity TEXT,
+            track_id INTEGER,
+            missing_ppe TEXT,
+            bbox TEXT,
+            event TEXT,
+            started_at INTEGER,
+            duration_ms INTEGER
+        );
+        CREATE INDEX IF NOT EXISTS idx_violations_zone ON violations (zone_id, id);
+        CREATE INDEX IF NOT EXISTS idx_violations_track ON violations (track_id, id);
+        CREATE INDEX IF NOT EXISTS idx_violations_time ON violations (timestamp);
+    """
+    
+    def __init__(self, path: str, batch_size: Optional[int] = None):
+        self.path = path
+        self.batch_size = max(1, batch_size or settings.VIOLATION_DB_BATCH_SIZE)
+        self._queue: "queue.Queue[Optional[Tuple]]" = queue.Queue(maxsize=self.batch_size * 64)
+        self._local = threading.local()
+        self.written = 0
+        self.dropped = 0
+        
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        conn.executescript(self.SCHEMA)
+        conn.close()
+        
+        self._thread = threading.Thread(target=self._run, name="violation-log", daemon=True)
+        self._thread.start()
+        logger.info("violation_log_opened", path=path)
+    
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+    
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+    
+    def append(self, camera_id: str, violation: ZoneViolation):
+        row = (
+            violation.timestamp,
+            camera_id,
+            violation.zone_id,
+            violation.zone_name,
+            violation.severity,
+            violation.person_track_id,
+            json.dumps(violation.missing_ppe),
+            json.dumps(violation.bbox),
+            violation.event,
+            violation.started_at,
+            violation.duration_ms
+        )
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self.dropped += 1
+    
+    def close(self, timeout: float = 5.0):
+        self._queue.put(None)
+        self._thread.join(timeout)
+    
+    def _run(self):
+        conn = self._connect()
+        stopping = False
+        
+        while not stopping:
+            rows = [self._queue.get()]
+            while len(rows) < self.batch_size:
+                try:
+                    rows.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            if None in rows:
+                stopping = True
+                rows = [r for r in rows if r is not None]
+            if not rows:
+                continue
+            
+            try:
+                with conn:
+                    conn.executemany(
+                        "INSERT INTO violations (timestamp, camera_id, zone_id, zone_name, severity, "
+                        "track_id, missing_ppe, bbox, event, started_at, duration_ms) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        rows
+                    )
+                self.written += len(rows)
+            except sqlite3.Error as e:
+                logger.error("violation_log_write_failed", rows=len(rows), error=str(e))
+        
+        conn.close()
+    
+    def query(
+        self,
+        zone_id: Optional[str] = None,
+        camera_id: Optional[str] = None,
+        track_id: Optional[int] = None,
+        event: Optional[str] = None,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        cursor: Optional[int] = None,
+        limit: int = 100
+    ) -> Tuple[List[Dict], Optional[int]]:
+        clauses, params = [], []
+        for column, op, value in (
+            ('zone_id', '=', zone_id),
+            ('camera_id', '=', camera_id),
+            ('track_id', '=', track_id),
+            ('event', '=', event),
+            ('timestamp', '>=', start),
+            ('timestamp', '<=', end),
+            ('id', '<', cursor)
+        ):
+            if value is not None:
+                clauses.append(f"{column} {op} ?")
+                params.append(value)
+        
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._reader().execute(
+            f"SELECT id, timestamp, camera_id, zone_id, zone_name, severity, track_id, missing_ppe, bbox, "
+            f"event, started_at, duration_ms "
+            f"FROM violations {where} ORDER BY id DESC LIMIT ?",
+            params + [limit]
+        ).fetchall()
+        
+        items = [
+            {
+                'seq': row[0],
+                'timestamp': row[1],
+                'camera_id': row[2],
+                'zone_id': row[3],
+                'zone_name': row[4],
+                'severity': row[5],
+                'person_track_id': row[6],
+                'missing_ppe': json.loads(row[7]),
+                'bbox': json.loads(row[8]),
+                'event': row[9],
+                'started_at': row[10],
+                'duration_ms': row[11]
+            }
+            for row in rows
+        ]
+        next_cursor = items[-1]['seq'] if len(items) == limit else None
+        return items, next_cursor
+
+
+class ViolationStore:
+    
+    def __init__(
+        self,
+        capacity: Optional[int] = None,
+        db_path: Optional[str] = None
+    ):
+        self.capacity = capacity or settings.VIOLATION_RING_SIZE
+        self.rings: Dict[str, ViolationRing] = {}
+        self.rollups = ViolationRollups(settings.VIOLATION_ROLLUP_BUCKET_S, settings.VIOLATION_ROLLUP_RETENTION_S)
+        self._cameras: List[str] = []
+        self._camera_codes: Dict[str, int] = {}
+        self._missing_sets: List[Tuple[str, ...]] = []
+        self._missing_codes: Dict[Tuple[str, ...], int] = {}
+        self._seq = 0
+        self._lock = threading.Lock()
+        
+        db_path = db_path or settings.VIOLATION_DB_PATH
+        self.log = ViolationLog(db_path) if db_path else None
+    
+    def close(self):
+        if self.log:
+            self.log.close()
+    
+    def _intern(self, value, values: List, codes: Dict) -> int:
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(values)
+            values.append(value)
+        return code
+    
+    def record(self, camera_id: str, violations: List[ZoneViolation]):
+        if not violations:
+            return
+        
+        with self._lock:
+            camera_code = self._intern(camera_id, self._cameras, self._camera_codes)
+            
+            for v in violations:
+                ring = self.rings.get(v.zone_id)
+                if ring is None:
+                    ring = self.rings[v.zone_id] = ViolationRing(v.zone_id, self.capacity)
+                ring.zone_name = v.zone_name
+                ring.severity = v.severity
+                
+                missing = tuple(v.missing_ppe)
+                missing_code = self._intern(missing, self._missing_sets, self._missing_codes)
+                
+                self._seq += 1
+                ring.append(self._seq, v, camera_code, missing_code)
+                self.rollups.add(v)
+        
+        if self.log:
+            for v in violations:
+                self.log.append(camera_id, v)
+    
+    def query(
+        self,
+        zone_id: Optional[str] = None,
+        camera_id: Optional[str] = None,
+        track_id: Optional[int] = None,
+        event: Optional[str] = None,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        cursor: Optional[int] = None,
+        limit: int = 100
+    ) -> Tuple[List[Dict], Optional[int]]:
+        event_code = EVENT_CODES.get(event) if event is not None else None
+        if event is not None and event_code is None:
+            return [], None
+        
+        with self._lock:
+            camera_code = None
+            if camera_id is not None:
+                camera_code = self._camera_codes.get(camera_id)
+                if camera_code is None:
+                    return [], None
+            
+            rings = [self.rings[zone_id]] if zone_id in self.rings else []
+            if zone_id is None:
+                rings = list(self.rings.values())
+            
+            candidates = []
+            for ring in rings:
+                positions = ring.select(start, end, cursor, track_id, camera_code, event_code, limit)
+                candidates.extend((int(ring.seq[p]), ring, int(p)) for p in positions)
+            
+            candidates.sort(key=lambda c: c[0], reverse=True)
+            items = [self._to_dict(ring, p) for _, ring, p in candidates[:limit]]
+        
+        next_cursor = items[-1]['seq'] if len(items) == limit else None
+        return items, next_cursor
+    
+    def _to_dict(self, ring: ViolationRing, p: int) -> Dict:
+        return {
+            'seq': int(ring.seq[p]),
+            'timestamp': int(ring.timestamps[p]),
+            'camera_id': self._cameras[ring.camera_codes[p]],
+            'zone_id': ring.zone_id,
+            'zone_name': ring.zone_name,
+            'severity': ring.severity,
+            'person_track_id': int(ring.track_ids[p]),
+            'missing_ppe': list(self._missing_sets[ring.missing_codes[p]]),
+            'bbox': ring.boxes[p].tolist(),
+            'event': EVENT_TYPES[ring.event_codes[p]],
+            'started_at': int(ring.started_at[p]),
+            'duration_ms': int(ring.durations[p])
+        }
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            rings = list(self.rings.values())
+            return {
+                'zones': len(rings),
+                'stored': sum(len(r) for r in rings),
+                'recorded': sum(r.total for r in rings),
+                'capacity_per_zone': self.capacity,
+                'memory_bytes': sum(r.nbytes for r in rings),
+                'oldest_timestamp': min((r.oldest_timestamp for r in rings if len(r)), default=None),
+                'log_path': self.log.path if self.log else None,
+                'log_written': self.log.written if self.log else 0,
+                'log_dropped': self.log.dropped if self.log else 0
+            }
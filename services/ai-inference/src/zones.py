@@ -1,17 +1,27 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
 import yaml
-from typing import List, Dict, Optional, Tuple
+import numpy as np
+import cv2
+from typing import Callable, List, Dict, Optional, Tuple, Union
 from dataclasses import dataclass, field
 from pathlib import Path
 import structlog
 
 try:
-    from shapely.geometry import Point, Polygon
-    from shapely.prepared import prep
+    import shapely
+    from shapely import STRtree
+    from shapely.geometry import Polygon
     SHAPELY_AVAILABLE = True
 except ImportError:
     SHAPELY_AVAILABLE = False
 
-from config import settings, VIOLATION_CLASSES
+from config import settings
+from detections import Detections, CLASS_IDS, PERSON_CLASS_ID
+from ppe import MISSING_NAMES, PPE_ITEM_CLASSES, ppe_flags, worn_matrix
 
 logger = structlog.get_logger()
 
@@ -27,9 +37,14 @@ class Zone:
     _prepared_polygon: object = field(default=None, repr=False)
     
     def __post_init__(self):
+        self.build_polygon()
+    
+    def build_polygon(self):
+        self._prepared_polygon = None
         if SHAPELY_AVAILABLE and len(self.polygon) >= 3:
             poly = Polygon(self.polygon)
-            self._prepared_polygon = prep(poly)
+            shapely.prepare(poly)
+            self._prepared_polygon = poly
 
 
 @dataclass
@@ -41,6 +56,240 @@ class ZoneViolation:
     missing_ppe: List[str]
     timestamp: int
     bbox: List[int]
+    event: str = "violation"
+    started_at: int = 0
+    duration_ms: int = 0
+
+
+ExactQuery = Callable[[np.ndarray], Tuple[np.ndarray, np.ndarray]]
+
+
+class ZoneRaster:
+    
+    SUBPIXEL_SHIFT = 4
+    EDGE_STEP = 0.5
+    EDGE_MARGIN = 1
+    FORMAT_VERSION = 2
+    
+    def __init__(self, labels: np.ndarray, combos: List[List[int]]):
+        self.labels = labels
+        self.shape = labels.shape
+        self.edge_label = len(combos)
+        self.combo_offsets = np.zeros(len(combos) + 2, dtype=np.intp)
+        self.combo_offsets[1:-1] = np.cumsum([len(c) for c in combos])
+        self.combo_offsets[-1] = self.combo_offsets[-2]
+        self.combo_zones = np.asarray([z for c in combos for z in c], dtype=np.intp)
+        self.combos = combos
+    
+    @classmethod
+    def edge_cells(cls, points: np.ndarray, lo: Tuple[float, float], hi: Tuple[float, float]) -> np.ndarray:
+        starts = points
+        delta = np.roll(points, -1, axis=0) - starts
+        inside = (starts >= lo) & (starts <= hi)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t0 = (np.asarray(lo) - starts) / delta
+            t1 = (np.asarray(hi) - starts) / delta
+        moving = delta != 0
+        enter = np.where(moving, np.minimum(t0, t1), np.where(inside, -np.inf, np.inf)).max(axis=1)
+        leave = np.where(moving, np.maximum(t0, t1), np.where(inside, np.inf, -np.inf)).min(axis=1)
+        enter, leave = np.maximum(enter, 0), np.minimum(leave, 1)
+        keep = enter <= leave
+        starts, delta, enter, leave = starts[keep], delta[keep], enter[keep], leave[keep]
+        
+        counts = np.ceil(np.hypot(*delta.T) * (leave - enter) / cls.EDGE_STEP).astype(np.intp) + 1
+        edge = np.repeat(np.arange(len(starts)), counts)
+        step = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        t = enter[edge] + (leave - enter)[edge] * step / np.maximum(counts[edge] - 1, 1)
+        return np.floor(starts[edge] + delta[edge] * t[:, None]).astype(np.intp)
+    
+    @staticmethod
+    def clip_ring(points: np.ndarray, lo: Tuple[float, float], hi: Tuple[float, float]) -> np.ndarray:
+        ring = points.tolist()
+        for axis, bound, sign in ((0, lo[0], 1), (0, hi[0], -1), (1, lo[1], 1), (1, hi[1], -1)):
+            clipped = []
+            for i, current in enumerate(ring):
+                previous = ring[i - 1]
+                current_in = sign * (current[axis] - bound) >= 0
+                if current_in != (sign * (previous[axis] - bound) >= 0):
+                    t = (bound - previous[axis]) / (current[axis] - previous[axis])
+                    clipped.append([p + t * (c - p) for p, c in zip(previous, current)])
+                if current_in:
+                    clipped.append(current)
+            ring = clipped
+        return np.asarray(ring, dtype=np.float64).reshape(-1, 2)
+    
+    @classmethod
+    def build(cls, zones: List[Zone], shape: Tuple[int, int]) -> "ZoneRaster":
+        height, width = shape
+        labels = np.zeros((height, width), dtype=np.int32)
+        combos: List[Tuple[int, ...]] = [()]
+        combo_ids: Dict[Tuple[int, ...], int] = {(): 0}
+        scale = 1 << cls.SUBPIXEL_SHIFT
+        pad = cls.EDGE_MARGIN
+        edges = np.zeros((height + 2 * pad, width + 2 * pad), dtype=np.uint8)
+        
+        for z, zone in enumerate(zones):
+            points = np.asarray(zone.polygon, dtype=np.float64)
+            cells = np.minimum(cls.edge_cells(points, (-pad, -pad), (width + pad, height + pad)) + pad, (
+                width + 2 * pad - 1, height + 2 * pad - 1
+            ))
+            edges[cells[:, 1], cells[:, 0]] = 1
+            
+            ring = cls.clip_ring(points, (-1, -1), (width + 1, height + 1))
+            if len(ring) < 3:
+                continue
+            
+            x0, y0 = np.floor(ring.min(axis=0)).astype(int) - 1
+            x1, y1 = np.ceil(ring.max(axis=0)).astype(int) + 2
+            mask = np.zeros((y1 - y0, x1 - x0), dtype=np.uint8)
+            vertices = np.round((ring - (x0 + 0.5, y0 + 0.5)) * scale).astype(np.int32)
+            cv2.fillPoly(mask, [vertices], 1, lineType=cv2.LINE_8, shift=cls.SUBPIXEL_SHIFT)
+            
+            fx0, fy0 = max(x0, 0), max(y0, 0)
+            fx1, fy1 = min(x1, width), min(y1, height)
+            if fx0 >= fx1 or fy0 >= fy1:
+                continue
+            inside = mask[fy0 - y0:fy1 - y0, fx0 - x0:fx1 - x0].view(bool)
+            
+            region = labels[fy0:fy1, fx0:fx1]
+            previous, inverse = np.unique(region[inside], return_inverse=True)
+            
+            mapped = np.empty(len(previous), dtype=np.int32)
+            for i, label in enumerate(previous.tolist()):
+                key = combos[label] + (z,)
+                combo_id = combo_ids.get(key)
+                if combo_id is None:
+                    combo_id = combo_ids[key] = len(combos)
+                    combos.append(key)
+                mapped[i] = combo_id
+            
+            region[inside] = mapped[inverse.ravel()]
+        
+        size = 2 * pad + 1
+        edges = cv2.dilate(edges, np.ones((size, size), np.uint8))[pad:pad + height, pad:pad + width]
+        labels[edges.view(bool)] = len(combos)
+        if len(combos) < np.iinfo(np.uint16).max:
+            labels = labels.astype(np.uint16)
+        
+        return cls(labels, [list(c) for c in combos])
+    
+    @classmethod
+    def cached(cls, zones: List[Zone], shape: Tuple[int, int], cache_dir: str) -> "ZoneRaster":
+        key = hashlib.sha1(json.dumps(
+            [cls.FORMAT_VERSION, list(shape), [[z.id, [list(p) for p in z.polygon]] for z in zones]]
+        ).encode()).hexdigest()[:16]
+        path = Path(cache_dir) / f"zones-{shape[1]}x{shape[0]}-{key}.npy"
+        combos_path = path.with_suffix('.json')
+        
+        if path.exists() and combos_path.exists():
+            with open(combos_path, 'r') as f:
+                combos = json.load(f)
+            return cls(np.load(path, mmap_mode='r'), combos)
+        
+        raster = cls.build(zones, shape)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        
+        tmp_suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(str(combos_path) + tmp_suffix, 'w') as f:
+            json.dump(raster.combos, f)
+        os.replace(str(combos_path) + tmp_suffix, combos_path)
+        with open(str(path) + tmp_suffix, 'wb') as f:
+            np.save(f, raster.labels)
+        os.replace(str(path) + tmp_suffix, path)
+        
+        logger.info("zone_raster_saved", path=str(path))
+        return cls(np.load(path, mmap_mode='r'), raster.combos)
+    
+    @property
+    def nbytes(self) -> int:
+        return self.labels.nbytes
+    
+    def lookup(self, points: np.ndarray, exact: ExactQuery) -> Tuple[np.ndarray, np.ndarray]:
+        height, width = self.shape
+        cells = np.floor(points).astype(np.intp)
+        xs, ys = cells[:, 0], cells[:, 1]
+        in_frame = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+        
+        labels = np.full(len(points), self.edge_label, dtype=np.intp)
+        labels[in_frame] = self.labels[ys[in_frame], xs[in_frame]]
+        
+        starts = self.combo_offsets[labels]
+        counts = self.combo_offsets[labels + 1] - starts
+        total = int(counts.sum())
+        point_idx = np.repeat(np.arange(len(points)), counts)
+        offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        zone_idx = self.combo_zones[np.repeat(starts, counts) + offsets]
+        
+        exact_idx = np.flatnonzero(labels == self.edge_label)
+        if not len(exact_idx):
+            return point_idx, zone_idx
+        
+        exact_points, exact_zones = exact(points[exact_idx])
+        point_idx = np.concatenate([point_idx, exact_idx[exact_points]])
+        zone_idx = np.concatenate([zone_idx, exact_zones])
+        order = np.lexsort((zone_idx, point_idx))
+        return point_idx[order], zone_idx[order]
+
+
+class ZoneIndex:
+    
+    def __init__(self, zones: List[Zone]):
+        self.zones = [z for z in zones if z.enabled and z._prepared_polygon is not None]
+        self.required_ids = [
+            np.asarray([CLASS_IDS.get(name, -1) for name in z.required_ppe], dtype=np.intp)
+            for z in self.zones
+        ]
+        self.tree = STRtree([z._prepared_polygon for z in self.zones]) if self.zones else None
+        self._rasters: "OrderedDict[Tuple[int, int], ZoneRaster]" = OrderedDict()
+        self._raster_lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self.zones)
+    
+    def raster(self, shape: Tuple[int, int]) -> ZoneRaster:
+        shape = (int(shape[0]), int(shape[1]))
+        
+        with self._raster_lock:
+            raster = self._rasters.get(shape)
+            if raster is not None:
+                self._rasters.move_to_end(shape)
+                return raster
+            
+            if settings.ZONE_RASTER_CACHE_DIR:
+                raster = ZoneRaster.cached(self.zones, shape, settings.ZONE_RASTER_CACHE_DIR)
+            else:
+                raster = ZoneRaster.build(self.zones, shape)
+            
+            self._rasters[shape] = raster
+            while len(self._rasters) > max(1, settings.ZONE_RASTER_MAX_RESOLUTIONS):
+                self._rasters.popitem(last=False)
+        
+        logger.info("zone_raster_built",
+                    width=shape[1],
+                    height=shape[0],
+                    zones=len(self.zones),
+                    combos=len(raster.combos),
+                    bytes=raster.nbytes)
+        return raster
+    
+    def query(
+        self,
+        points: np.ndarray,
+        frame_shape: Optional[Tuple[int, int]] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        if self.tree is None or len(points) == 0:
+            empty = np.empty(0, dtype=np.intp)
+            return empty, empty
+        
+        if frame_shape is not None and settings.ZONE_RASTER_ENABLED:
+            return self.raster(frame_shape[:2]).lookup(points, self.query_exact)
+        
+        return self.query_exact(points)
+    
+    def query_exact(self, points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        point_idx, zone_idx = self.tree.query(shapely.points(points), predicate='within')
+        order = np.lexsort((zone_idx, point_idx))
+        return point_idx[order], zone_idx[order]
 
 
 class ZoneManager:
@@ -48,7 +297,9 @@ class ZoneManager:
     def __init__(self, config_path: Optional[str] = None):
         self.enabled = settings.ENABLE_ZONES and SHAPELY_AVAILABLE
         self.zones: Dict[str, Zone] = {}
-        self.violation_history: Dict[str, List[ZoneViolation]] = {}
+        self._index: Optional[ZoneIndex] = None
+        self._index_lock = threading.Lock()
+        self._version = 0
         
         if not SHAPELY_AVAILABLE:
             logger.warning("zones_disabled", reason="shapely not available")
@@ -64,8 +315,8 @@ class ZoneManager:
         with open(path, 'r') as f:
             config = yaml.safe_load(f)
         
-        for zone_data in config.get('zones', []):
-            zone = Zone(
+        zones = [
+            Zone(
                 id=zone_data['id'],
                 name=zone_data['name'],
                 severity=zone_data.get('severity', 'warning'),
@@ -73,138 +324,158 @@ class ZoneManager:
                 required_ppe=zone_data.get('required_ppe', []),
                 enabled=zone_data.get('enabled', True)
             )
-            self.zones[zone.id] = zone
+            for zone_data in config.get('zones', [])
+        ]
         
+        with self._index_lock:
+            for zone in zones:
+                self.zones[zone.id] = zone
+            self._invalidate_locked()
         logger.info("zones_loaded", count=len(self.zones))
     
     def add_zone(self, zone: Zone):
-        self.zones[zone.id] = zone
+        with self._index_lock:
+            self.zones[zone.id] = zone
+            self._invalidate_locked()
         logger.info("zone_added", zone_id=zone.id, name=zone.name)
     
     def remove_zone(self, zone_id: str) -> bool:
-        if zone_id in self.zones:
-            del self.zones[zone_id]
-            logger.info("zone_removed", zone_id=zone_id)
-            return True
-        return False
+        with self._index_lock:
+            if self.zones.pop(zone_id, None) is None:
+                return False
+            self._invalidate_locked()
+        logger.info("zone_removed", zone_id=zone_id)
+        return True
     
     def update_zone(self, zone_id: str, **kwargs) -> bool:
-        if zone_id not in self.zones:
-            return False
-        
-        zone = self.zones[zone_id]
-        for key, value in kwargs.items():
-            if hasattr(zone, key):
-                setattr(zone, key, value)
+        with self._index_lock:
+            zone = self.zones.get(zone_id)
+            if zone is None:
+                return False
+            
+            for key, value in kwargs.items():
+                if hasattr(zone, key):
+                    setattr(zone, key, value)
+            
+            if 'polygon' in kwargs:
+                zone.build_polygon()
+            
+            self._invalidate_locked()
+        return True
+    
+    def invalidate_index(self):
+        with self._index_lock:
+            self._invalidate_locked()
+    
+    def _invalidate_locked(self):
+        self._version += 1
+        self._index = None
+    
+    @property
+    def index(self) -> ZoneIndex:
+        index = self._index
+        if index is not None:
+            return index
         
-        if 'polygon' in kwargs:
-            poly = Polygon(zone.polygon)
-            zone._prepared_polygon = prep(poly)
+        with self._index_lock:
+            if self._index is not None:
+                return self._index
+            version = self._version
+            zones = list(self.zones.values())
         
-        return True
+        index = ZoneIndex(zones)
+        with self._index_lock:
+            if self._version == version:
+                self._index = index
+                logger.debug("zone_index_built", zones=len(index))
+        return index
     
     def is_point_in_zone(self, x: float, y: float, zone: Zone) -> bool:
         if not zone.enabled or zone._prepared_polygon is None:
             return False
-        point = Point(x, y)
-        return zone._prepared_polygon.contains(point)
+        return bool(shapely.contains_xy(zone._prepared_polygon, x, y))
     
     def get_zone_for_point(self, x: float, y: float) -> Optional[Zone]:
-        for zone in self.zones.values():
-            if self.is_point_in_zone(x, y, zone):
-                return zone
-        return None
+        index = self.index
+        _, zone_idx = index.query(np.array([[x, y]], dtype=np.float64))
+        return index.zones[zone_idx[0]] if len(zone_idx) else None
     
     def check_violations(
         self,
-        detections: List[Dict],
-        timestamp: int
+        detections: Union[Detections, List[Dict]],
+        timestamp: int,
+        frame_shape: Optional[Tuple[int, int]] = None,
+        ppe_status: Optional[np.ndarray] = None
     ) -> List[ZoneViolation]:
+        violations, _ = self.evaluate(detections, timestamp, frame_shape, ppe_status)
+        return violations
+    
+    def evaluate(
+        self,
+        detections: Union[Detections, List[Dict]],
+        timestamp: int,
+        frame_shape: Optional[Tuple[int, int]] = None,
+        ppe_status: Optional[np.ndarray] = None
+    ) -> Tuple[List[ZoneViolation], Dict[str, int]]:
         if not self.enabled or not self.zones:
-            return []
-        
-        violations = []
+            return [], {}
         
-        persons = [d for d in detections if d['class_name'] == 'Person']
-        ppe_detections = [d for d in detections if d['class_name'] not in ['Person', 'machinery', 'vehicle', 'Safety Cone']]
+        index = self.index
+        if not len(index):
+            return [], {}
         
-        for person in persons:
-            px1, py1, px2, py2 = person['bbox']
-            person_center_x = (px1 + px2) / 2
-            person_center_y = (py1 + py2) / 2
-            person_bottom_center_y = py2
-            
-            for zone in self.zones.values():
-                if not self.is_point_in_zone(person_center_x, person_bottom_center_y, zone):
-                    continue
-                
-                person_ppe = self._find_ppe_for_person(person, ppe_detections)
-                
-                missing_ppe = []
-                for required in zone.required_ppe:
-                    if required not in person_ppe:
-                        missing_ppe.append(required)
-                
-                person_violations = [d['class_name'] for d in ppe_detections 
-                                   if d['class_name'] in VIOLATION_CLASSES and
-                                   self._boxes_overlap(person['bbox'], d['bbox'])]
-                
-                if missing_ppe or person_violations:
-                    violation = ZoneViolation(
-                        zone_id=zone.id,
-                        zone_name=zone.name,
-                        severity=zone.severity,
-                        person_track_id=person.get('track_id', -1),
-                        missing_ppe=missing_ppe + person_violations,
-                        timestamp=timestamp,
-                        bbox=person['bbox']
-                    )
-                    violations.append(violation)
-                    
-                    if zone.id not in self.violation_history:
-                        self.violation_history[zone.id] = []
-                    self.violation_history[zone.id].append(violation)
+        detections = Detections.from_any(detections)
+        persons = detections.filter(detections.class_ids == PERSON_CLASS_ID)
+        if not persons:
+            return [], {}
         
-        return violations
-    
-    def _find_ppe_for_person(
-        self,
-        person: Dict,
-        ppe_detections: List[Dict]
-    ) -> List[str]:
-        found_ppe = []
-        px1, py1, px2, py2 = person['bbox']
-        
-        for ppe in ppe_detections:
-            if ppe['class_name'].startswith('NO-'):
-                continue
-            
-            if self._boxes_overlap(person['bbox'], ppe['bbox']):
-                found_ppe.append(ppe['class_name'])
+        person_idx, zone_idx = index.query(persons.bottom_centers, frame_shape)
+        if not len(person_idx):
+            return [], {}
         
-        return found_ppe
-    
-    def _boxes_overlap(self, box1: List[int], box2: List[int]) -> bool:
-        x1_1, y1_1, x2_1, y2_1 = box1
-        x1_2, y1_2, x2_2, y2_2 = box2
+        zone_counts = np.bincount(zone_idx, minlength=len(index))
+        occupancy = {
+            index.zones[z].id: int(zone_counts[z])
+            for z in np.flatnonzero(zone_counts).tolist()
+        }
         
-        if x2_1 < x1_2 or x2_2 < x1_1:
-            return False
-        if y2_1 < y1_2 or y2_2 < y1_1:
-            return False
+        if ppe_status is None:
+            present, missing = ppe_flags(persons, detections.by_class(PPE_ITEM_CLASSES))
+        else:
+            present, missing = ppe_status > 0, ppe_status < 0
         
-        inter_x1 = max(x1_1, x1_2)
-        inter_y1 = max(y1_1, y1_2)
-        inter_x2 = min(x2_1, x2_2)
-        inter_y2 = min(y2_1, y2_2)
+        worn = worn_matrix(present)
+        person_violations = {
+            p: MISSING_NAMES[missing[p]].tolist()
+            for p in np.unique(person_idx).tolist()
+        }
         
-        inter_area = max(0, inter_x2 - inter_x1) * max(0, inter_y2 - inter_y1)
-        box2_area = (x2_2 - x1_2) * (y2_2 - y1_2)
+        boxes = persons.boxes.tolist()
+        track_ids = persons.track_ids.tolist()
         
-        if box2_area == 0:
-            return False
+        violations = []
+        for p, z in zip(person_idx.tolist(), zone_idx.tolist()):
+            zone = index.zones[z]
+            required_ids = index.required_ids[z]
+            
+            missing_ppe = [
+                name for name, class_id in zip(zone.required_ppe, required_ids.tolist())
+                if class_id < 0 or not worn[p, class_id]
+            ]
+            
+            if missing_ppe or person_violations[p]:
+                violation = ZoneViolation(
+                    zone_id=zone.id,
+                    zone_name=zone.name,
+                    severity=zone.severity,
+                    person_track_id=track_ids[p],
+                    missing_ppe=missing_ppe + person_violations[p],
+                    timestamp=timestamp,
+                    bbox=boxes[p]
+                )
+                violations.append(violation)
         
-        return (inter_area / box2_area) > 0.3
+        return violations, occupancy
     
     def get_all_zones(self) -> List[Dict]:
         return [
@@ -216,5 +487,5 @@ class ZoneManager:
                 'required_ppe': z.required_ppe,
                 'enabled': z.enabled
             }
-            for z in self.zones.values()
+            for z in list(self.zones.values())
         ]
@@ -0,0 +1,113 @@
+from debounce import ViolationDebouncer, OPEN, COOLDOWN
+from zones import ZoneViolation
+
+
+def violation(track_id: int = 1, zone_id: str = "zone-1", missing=("Hardhat",)) -> ZoneViolation:
+    return ZoneViolation(
+        zone_id=zone_id,
+        zone_name=zone_id,
+        severity="danger",
+        person_track_id=track_id,
+        missing_ppe=list(missing),
+        timestamp=0,
+        bbox=[0, 0, 10, 10]
+    )
+
+
+def events(items):
+    return [(e.event, e.person_track_id, e.zone_id) for e in items]
+
+
+def debouncer() -> ViolationDebouncer:
+    return ViolationDebouncer(min_dwell_ms=1000, close_after_ms=2000, cooldown_ms=5000)
+
+
+def test_incident_starts_after_min_dwell():
+    d = debouncer()
+    
+    assert d.update([violation()], 0) == []
+    assert d.update([violation()], 500) == []
+    assert events(d.update([violation()], 1000)) == [("started", 1, "zone-1")]
+    assert d.update([violation()], 1500) == []
+    assert d.open_count == 1
+
+
+def test_short_violation_never_starts():
+    d = debouncer()
+    
+    d.update([violation()], 0)
+    d.update([violation()], 500)
+    
+    assert d.update([], 3000) == []
+    assert d.incidents == {}
+
+
+def test_incident_ends_after_close_window_with_duration():
+    d = debouncer()
+    for t in (0, 1000, 1500):
+        d.update([violation()], t)
+    
+    assert d.update([], 3000) == []
+    ended = d.update([], 3501)
+    
+    assert events(ended) == [("ended", 1, "zone-1")]
+    assert ended[0].started_at == 0
+    assert ended[0].duration_ms == 1500
+    assert d.incidents[(1, "zone-1")].state == COOLDOWN
+
+
+def test_cooldown_blocks_a_new_incident():
+    d = debouncer()
+    for t in (0, 1000):
+        d.update([violation()], t)
+    d.update([], 3001)
+    
+    assert d.update([violation()], 4000) == []
+    assert d.update([violation()], 5500) == []
+    assert events(d.update([violation()], 6000)) == [("started", 1, "zone-1")]
+
+
+def test_missing_ppe_is_merged_over_the_incident():
+    d = debouncer()
+    d.update([violation(missing=("Hardhat",))], 0)
+    started = d.update([violation(missing=("Safety Vest",))], 1000)
+    
+    assert started[0].missing_ppe == ["Hardhat", "Safety Vest"]
+
+
+def test_sweep_ends_incidents_without_new_frames():
+    d = debouncer()
+    for t in (0, 1000):
+        d.update([violation()], t)
+    
+    assert d.sweep(2500) == []
+    assert events(d.sweep(3001)) == [("ended", 1, "zone-1")]
+    assert d.sweep(6001) == []
+    assert d.incidents == {}
+
+
+def test_untracked_violations_are_skipped():
+    d = debouncer()
+    
+    for t in (0, 1000, 2000):
+        assert d.update([violation(track_id=-1), violation(track_id=-1, zone_id="zone-2")], t) == []
+    assert d.incidents == {}
+
+
+def test_persons_and_zones_are_debounced_separately():
+    d = debouncer()
+    d.update([violation(1), violation(2), violation(1, "zone-2")], 0)
+    
+    started = d.update([violation(1), violation(2), violation(1, "zone-2")], 1000)
+    
+    assert sorted(events(started)) == [("started", 1, "zone-1"), ("started", 1, "zone-2"), ("started", 2, "zone-1")]
+    assert sum(1 for i in d.incidents.values() if i.state == OPEN) == 3
+
+
+def test_flush_ends_open_incidents():
+    d = debouncer()
+    for t in (0, 1000):
+        d.update([violation()], t)
+    
+    assert events(d.flush()) == [("ended", 1, "zone-1")]
+    assert d.incidents == {}
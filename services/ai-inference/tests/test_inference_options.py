@@ -0,0 +1,76 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from config import settings
+from detections import CLASS_IDS
+from detector import Detector, InferenceOptions
+
+
+@pytest.fixture
+def detector(monkeypatch):
+    monkeypatch.setattr(settings, "STUB_INFERENCE_MS", 0.0)
+    monkeypatch.setattr(settings, "STUB_PERSONS", 6)
+    return Detector(backend="stub", conf_threshold=0.5)
+
+
+def frame() -> np.ndarray:
+    return np.zeros((480, 640, 3), dtype=np.uint8)
+
+
+def test_create_returns_none_for_defaults():
+    assert InferenceOptions.create() is None
+    assert InferenceOptions.create(0, []) is None
+
+
+def test_create_validates_and_dedupes():
+    options = InferenceOptions.create(0.7, ["Person", " Person", "Hardhat", ""])
+    
+    assert options.conf_threshold == 0.7
+    assert options.classes == ("Person", "Hardhat")
+    with pytest.raises(ValueError):
+        InferenceOptions.create(1.5)
+    with pytest.raises(ValueError):
+        InferenceOptions.create(classes=["Forklift-ish"])
+
+
+def test_options_filter_only_their_own_request(detector):
+    person = InferenceOptions.create(classes=["Person"])
+    strict = InferenceOptions.create(0.85)
+    
+    only_persons = detector.detect(frame(), person)
+    confident = detector.detect(frame(), strict)
+    
+    assert set(only_persons.class_ids.tolist()) == {CLASS_IDS["Person"]}
+    assert len(set(detector.detect(frame()).class_ids.tolist())) > 1
+    assert len(confident) and (confident.scores >= 0.85).all()
+    assert detector.conf_threshold == 0.5
+
+
+def test_mixed_options_in_one_batch(detector):
+    person = InferenceOptions.create(classes=["Person"])
+    strict = InferenceOptions.create(0.85)
+    
+    results = detector.detect_batch([frame(), frame(), frame()], [person, None, strict], [None, None, None])
+    
+    assert set(results[0].class_ids.tolist()) == {CLASS_IDS["Person"]}
+    assert (results[1].scores >= 0.5).all()
+    assert len(results[2]) and (results[2].scores >= 0.85).all()
+
+
+def test_concurrent_requests_do_not_share_options(detector):
+    person = InferenceOptions.create(classes=["Person"])
+    
+    def run(i):
+        options = person if i % 2 else None
+        return options, detector.detect(frame(), options)
+    
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(run, range(200)))
+    
+    for options, detections in results:
+        if options is not None:
+            assert set(detections.class_ids.tolist()) <= {CLASS_IDS["Person"]}
+        assert (detections.scores >= 0.5).all()
+    assert detector.conf_threshold == 0.5
@@ -0,0 +1,94 @@
+import numpy as np
+
+from detections import Detections, PERSON_CLASS_ID
+from iou_tracker import IoUTracker
+
+
+def persons(boxes, scores=None) -> Detections:
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    if scores is None:
+        scores = np.full(len(boxes), 0.9)
+    return Detections(boxes=boxes, scores=scores, class_ids=np.full(len(boxes), PERSON_CLASS_ID))
+
+
+def walk(start, step, frames):
+    start = np.asarray(start, dtype=np.float64)
+    return [start + np.array([step, 0, step, 0]) * i for i in range(frames)]
+
+
+def test_track_is_reported_after_min_hits():
+    tracker = IoUTracker(min_hits=3)
+    box = [100, 100, 150, 250]
+    
+    reported = [len(tracker.update(persons([box]))) for _ in range(4)]
+    
+    assert reported == [0, 0, 1, 1]
+
+
+def test_low_score_detection_does_not_start_a_track():
+    tracker = IoUTracker(high_threshold=0.5, min_hits=1)
+    
+    for _ in range(3):
+        assert len(tracker.update(persons([[100, 100, 150, 250]], [0.3]))) == 0
+    assert len(tracker) == 0
+
+
+def test_low_score_detection_extends_a_track():
+    tracker = IoUTracker(high_threshold=0.5, min_hits=1)
+    first = tracker.update(persons([[100, 100, 150, 250]], [0.9]))
+    second = tracker.update(persons([[102, 100, 152, 250]], [0.3]))
+    
+    assert second.track_ids.tolist() == first.track_ids.tolist()
+
+
+def test_ids_stay_stable_for_moving_persons():
+    tracker = IoUTracker(min_hits=2)
+    left = walk([100, 100, 150, 250], 4, 30)
+    right = walk([600, 100, 650, 250], -4, 30)
+    
+    ids = []
+    for a, b in zip(left, right):
+        out = tracker.update(persons([a, b]))
+        if len(out) == 2:
+            ids.append(out.track_ids.tolist())
+    
+    assert len(ids) == 29
+    assert all(i == ids[0] for i in ids)
+    assert len(set(ids[0])) == 2
+
+
+def test_track_survives_missed_frames_up_to_max_age():
+    tracker = IoUTracker(min_hits=1, max_age=3)
+    path = walk([100, 100, 150, 250], 2, 10)
+    
+    first = tracker.update(persons([path[0]]))
+    for _ in range(3):
+        tracker.update(persons([]))
+    again = tracker.update(persons([path[4]]))
+    
+    assert again.track_ids.tolist() == first.track_ids.tolist()
+
+
+def test_track_expires_after_max_age():
+    tracker = IoUTracker(min_hits=1, max_age=3)
+    box = [100, 100, 150, 250]
+    
+    first = tracker.update(persons([box]))
+    for _ in range(4):
+        tracker.update(persons([]))
+    again = tracker.update(persons([box]))
+    
+    assert len(again) == 1
+    assert again.track_ids.tolist() != first.track_ids.tolist()
+
+
+def test_classes_are_tracked_separately():
+    tracker = IoUTracker(min_hits=1)
+    box = [100, 100, 150, 250]
+    detections = Detections(boxes=[box, box], scores=[0.9, 0.9], class_ids=[PERSON_CLASS_ID, PERSON_CLASS_ID + 1])
+    
+    first = tracker.update(detections)
+    second = tracker.update(detections)
+    
+    assert len(set(first.track_ids.tolist())) == 2
+    assert second.track_ids.tolist() == first.track_ids.tolist()
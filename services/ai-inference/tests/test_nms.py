@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from nms import CV2_NMS_AVAILABLE, nms_cv2, nms_numpy, non_max_suppression
+
+
+def candidates(count: int, seed: int, num_classes: int = 10, imgsz: int = 640):
+    rng = np.random.default_rng(seed)
+    num_objects = max(1, count // 50)
+    centers = rng.uniform(0, imgsz, (num_objects, 2))
+    sizes = rng.uniform(20, 160, (num_objects, 2))
+    object_classes = rng.integers(0, num_classes, num_objects)
+    
+    picks = rng.integers(0, num_objects, count)
+    xy = centers[picks] + rng.normal(0, 4, (count, 2))
+    wh = sizes[picks] * rng.uniform(0.85, 1.15, (count, 2))
+    boxes = np.concatenate([xy - wh / 2, xy + wh / 2], axis=1).astype(np.float32)
+    scores = rng.uniform(0.25, 1.0, count).astype(np.float32)
+    return boxes, scores, object_classes[picks]
+
+
+def test_empty_input():
+    boxes = np.empty((0, 4), dtype=np.float32)
+    scores = np.empty(0, dtype=np.float32)
+    
+    assert len(non_max_suppression(boxes, scores)) == 0
+    assert len(nms_numpy(boxes, scores)) == 0
+
+
+def test_overlapping_boxes_of_different_classes_are_kept():
+    boxes = np.array([[0, 0, 100, 100], [2, 2, 100, 100], [0, 0, 100, 100]], dtype=np.float32)
+    scores = np.array([0.9, 0.8, 0.7], dtype=np.float32)
+    class_ids = np.array([0, 0, 1])
+    
+    assert nms_numpy(boxes, scores, class_ids).tolist() == [0, 2]
+    assert nms_numpy(boxes, scores).tolist() == [0]
+
+
+def test_top_k_limits_kept_boxes():
+    boxes, scores, class_ids = candidates(500, seed=0)
+    
+    kept = nms_numpy(boxes, scores, class_ids, top_k=5)
+    
+    assert kept.tolist() == nms_numpy(boxes, scores, class_ids)[:5].tolist()
+
+
+@pytest.mark.skipif(not CV2_NMS_AVAILABLE, reason="cv2.dnn.NMSBoxesBatched not available")
+@pytest.mark.parametrize("seed", [0, 1, 2, 3])
+@pytest.mark.parametrize("count", [1, 50, 1000, 8400])
+@pytest.mark.parametrize("rounded", [False, True])
+def test_numpy_matches_cv2(seed, count, rounded):
+    boxes, scores, class_ids = candidates(count, seed)
+    if rounded:
+        scores = np.round(scores, 2)
+    
+    for kwargs in ({}, {'top_k': 300}, {'max_candidates': 200, 'top_k': 100}):
+        for classes in (class_ids, None):
+            expected = nms_cv2(boxes, scores, classes, 0.45, **kwargs)
+            assert nms_numpy(boxes, scores, classes, 0.45, **kwargs).tolist() == expected.tolist()
@@ -0,0 +1,134 @@
+import numpy as np
+import pytest
+
+from violations import ViolationLog, ViolationStore
+from zones import ZoneViolation
+
+EVENTS = ["violation", "started", "ended"]
+
+
+def violation(i: int, rng: np.random.Generator) -> ZoneViolation:
+    return ZoneViolation(
+        zone_id=f"zone-{rng.integers(3)}",
+        zone_name="zone",
+        severity="danger",
+        person_track_id=int(rng.integers(5)),
+        missing_ppe=["Hardhat"],
+        timestamp=1_000_000 + i * 10 - int(rng.integers(0, 30)),
+        bbox=[i, 0, i + 10, 10],
+        event=EVENTS[rng.integers(3)]
+    )
+
+
+def fill(store: ViolationStore, count: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    recorded = []
+    for i in range(count):
+        camera_id = f"cam-{rng.integers(2)}"
+        v = violation(i, rng)
+        store.record(camera_id, [v])
+        recorded.append((i + 1, camera_id, v))
+    return recorded
+
+
+def page_all(query, limit: int, **filters):
+    items, cursor, pages = [], None, 0
+    while True:
+        page, cursor = query(cursor=cursor, limit=limit, **filters)
+        items.extend(page)
+        pages += 1
+        if cursor is None:
+            return items, pages
+
+
+def expected(recorded, capacity=None, zone_id=None, camera_id=None, track_id=None, event=None, start=None, end=None):
+    kept = recorded
+    if capacity is not None:
+        per_zone = {}
+        for seq, camera, v in recorded:
+            per_zone.setdefault(v.zone_id, []).append((seq, camera, v))
+        kept = [r for rows in per_zone.values() for r in rows[-capacity:]]
+    
+    seqs = [
+        seq for seq, camera, v in kept
+        if (zone_id is None or v.zone_id == zone_id)
+        and (camera_id is None or camera == camera_id)
+        and (track_id is None or v.person_track_id == track_id)
+        and (event is None or v.event == event)
+        and (start is None or v.timestamp >= start)
+        and (end is None or v.timestamp <= end)
+    ]
+    return sorted(seqs, reverse=True)
+
+
+FILTERS = [
+    {},
+    {'zone_id': 'zone-1'},
+    {'camera_id': 'cam-0'},
+    {'track_id': 3, 'event': 'started'},
+    {'start': 1_001_000, 'end': 1_002_000},
+    {'zone_id': 'zone-2', 'camera_id': 'cam-1', 'start': 1_000_500}
+]
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+@pytest.mark.parametrize("limit", [1, 7, 50])
+def test_cursor_pages_cover_every_match_once(filters, limit):
+    store = ViolationStore(capacity=1000)
+    recorded = fill(store, 400)
+    
+    items, pages = page_all(store.query, limit, **filters)
+    seqs = [item['seq'] for item in items]
+    
+    assert seqs == expected(recorded, **filters)
+    assert pages == len(seqs) // limit + 1
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_cursor_paging_after_ring_wraps(filters):
+    store = ViolationStore(capacity=60)
+    recorded = fill(store, 400, seed=1)
+    
+    items, _ = page_all(store.query, 13, **filters)
+    
+    assert [item['seq'] for item in items] == expected(recorded, capacity=60, **filters)
+
+
+def test_page_contents():
+    store = ViolationStore(capacity=100)
+    recorded = fill(store, 20, seed=2)
+    
+    items, cursor = store.query(limit=3)
+    
+    assert cursor == items[-1]['seq']
+    seq, camera_id, v = recorded[-1]
+    assert items[0]['seq'] == seq
+    assert items[0]['camera_id'] == camera_id
+    assert items[0]['zone_id'] == v.zone_id
+    assert items[0]['event'] == v.event
+    assert items[0]['bbox'] == v.bbox
+
+
+def test_unknown_filters_return_nothing():
+    store = ViolationStore(capacity=100)
+    fill(store, 20)
+    
+    assert store.query(camera_id="missing") == ([], None)
+    assert store.query(zone_id="missing") == ([], None)
+    assert store.query(event="missing") == ([], None)
+
+
+def test_log_cursor_paging(tmp_path):
+    log = ViolationLog(str(tmp_path / "violations.db"), batch_size=16)
+    rng = np.random.default_rng(3)
+    recorded = []
+    for i in range(100):
+        camera_id = f"cam-{rng.integers(2)}"
+        v = violation(i, rng)
+        log.append(camera_id, v)
+        recorded.append((i + 1, camera_id, v))
+    log.close()
+    
+    for filters in FILTERS:
+        items, _ = page_all(log.query, 9, **filters)
+        assert [item['seq'] for item in items] == expected(recorded, **filters)
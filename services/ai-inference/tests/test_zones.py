@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from zones import SHAPELY_AVAILABLE, Zone, ZoneIndex
+
+pytestmark = pytest.mark.skipif(not SHAPELY_AVAILABLE, reason="shapely not installed")
+
+WIDTH, HEIGHT = 1280, 720
+
+
+def square(zone_id: str, x0: float, y0: float, x1: float, y1: float) -> Zone:
+    return Zone(id=zone_id, name=zone_id, severity="warning", polygon=[(x0, y0), (x1, y0), (x1, y1), (x0, y1)])
+
+
+def random_zones(rng: np.random.Generator, count: int):
+    zones = []
+    for i in range(count):
+        center = rng.uniform((-100, -100), (WIDTH + 100, HEIGHT + 100))
+        angles = np.sort(rng.uniform(0, 2 * np.pi, rng.integers(3, 12)))
+        radii = rng.uniform(10, 300, len(angles))
+        points = center + np.stack([np.cos(angles), np.sin(angles)], axis=1) * radii[:, None]
+        if rng.random() < 0.5:
+            points = np.round(points)
+        zones.append(Zone(id=f"z{i}", name=f"z{i}", severity="warning", polygon=[tuple(p) for p in points.tolist()]))
+    return zones
+
+
+def random_points(rng: np.random.Generator, zones, count: int) -> np.ndarray:
+    uniform = rng.uniform((-50, -50), (WIDTH + 50, HEIGHT + 50), (count, 2))
+    grid = np.round(rng.uniform((-5, -5), (WIDTH + 5, HEIGHT + 5), (count // 4, 2)) * 2) / 2
+    vertices = np.asarray([p for z in zones for p in z.polygon])
+    return np.concatenate([uniform, grid, vertices, vertices + 0.4, vertices - 0.4])
+
+
+def pairs(index: ZoneIndex, points: np.ndarray, frame_shape=None):
+    point_idx, zone_idx = index.query(points, frame_shape)
+    return list(zip(point_idx.tolist(), zone_idx.tolist()))
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_raster_matches_strtree(seed):
+    rng = np.random.default_rng(seed)
+    zones = random_zones(rng, 40)
+    index = ZoneIndex(zones)
+    points = random_points(rng, zones, 200_000)
+    
+    assert pairs(index, points, (HEIGHT, WIDTH)) == pairs(index, points)
+
+
+def test_raster_square_boundaries_follow_within():
+    index = ZoneIndex([square("a", 100, 100, 400, 400)])
+    points = np.array([
+        [250, 100], [250, 400], [100, 250], [400, 250],
+        [250, 400.4], [250, 399.6], [100.4, 250], [99.6, 250],
+        [250, 250], [-10, 250], [1500, 250], [250, 800]
+    ], dtype=np.float64)
+    
+    inside = {p for p, _ in pairs(index, points, (HEIGHT, WIDTH))}
+    assert inside == {5, 6, 8}
+    assert pairs(index, points, (HEIGHT, WIDTH)) == pairs(index, points)
+
+
+def test_raster_ignores_out_of_frame_clipping():
+    index = ZoneIndex([square("edge", 0, 0, 50, 50), square("outside", -200, -200, -100, -100)])
+    points = np.array([[-150, -150], [-1, 10], [10, 10], [WIDTH + 5, 10]], dtype=np.float64)
+    
+    assert pairs(index, points, (HEIGHT, WIDTH)) == [(0, 1), (2, 0)]
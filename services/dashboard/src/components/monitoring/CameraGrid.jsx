@@ -2,6 +2,8 @@ import React, { useRef, useEffect, useState, useCallback } from 'react';
 import useStore from '../../store/store';
 
 const AI_API_URL = import.meta.env.VITE_AI_API_URL || 'http://localhost:8000';
+const AI_WS_URL = AI_API_URL.replace(/^http/, 'ws');
+const FRAME_INTERVAL_MS = 200;
 
 const ALL_CAMERAS = [
   { id: 'cam-1', name: 'Main Entrance', type: 'video', videoUrl: '/videos/cam1.mp4' },
@@ -60,60 +62,70 @@ function CameraFeed({ camera }) {
   });
   const [processingTime, setProcessingTime] = useState(0);
   const [connectionStatus, setConnectionStatus] = useState('connecting');
+  const [streamMode, setStreamMode] = useState('socket');
   const { confidenceThreshold, updateMetrics, addAlert } = useStore();
   
-  const detectFrame = useCallback(async () => {
+  const captureFrame = useCallback(async () => {
     const video = videoRef.current;
     const canvas = document.createElement('canvas');
     
-    if (!video || video.paused || video.ended) return;
+    if (!video || video.paused || video.ended) return null;
     
     canvas.width = 640;
     canvas.height = 360;
     const ctx = canvas.getContext('2d');
     ctx.drawImage(video, 0, 0, canvas.width, canvas.height);
     
+    return new Promise(resolve => canvas.toBlob(resolve, 'image/jpeg', 0.8));
+  }, []);
+  
+  const handleResult = useCallback((result) => {
+    setDetections(result.detections || []);
+    setSafetyCheck(result.safety_check || {
+      people_count: 0,
+      violation_count: 0,
+      compliance_rate: 100
+    });
+    setProcessingTime(result.processing_time_ms || 0);
+    
+    updateMetrics({
+      latency: result.processing_time_ms || 0,
+      peopleCount: result.safety_check?.people_count || 0,
+      violationCount: result.safety_check?.violation_count || 0,
+      complianceRate: result.safety_check?.compliance_rate || 100
+    });
+    
+    if (result.safety_check?.has_violations) {
+      result.safety_check.violations?.forEach(v => {
+        addAlert({
+          id: Date.now() + Math.random(),
+          type: 'danger',
+          title: v,
+          cameraId: camera.id,
+          timestamp: Date.now()
+        });
+      });
+    }
+  }, [camera.id, updateMetrics, addAlert]);
+  
+  const detectFrame = useCallback(async () => {
     try {
-      const blob = await new Promise(resolve => canvas.toBlob(resolve, 'image/jpeg', 0.8));
+      const blob = await captureFrame();
+      if (!blob) return;
+      
       const formData = new FormData();
       formData.append('file', blob, 'frame.jpg');
       
-      const response = await fetch(`${AI_API_URL}/detect?confidence=${confidenceThreshold}`, {
+      const response = await fetch(`${AI_API_URL}/detect?camera_id=${encodeURIComponent(camera.id)}&confidence=${confidenceThreshold}`, {
         method: 'POST',
         body: formData
       });
       
       if (response.ok) {
-        const result = await response.json();
-        setDetections(result.detections || []);
-        setSafetyCheck(result.safety_check || {
-          people_count: 0,
-          violation_count: 0,
-          compliance_rate: 100
-        });
-        setProcessingTime(result.processing_time_ms || 0);
-        
-        updateMetrics({
-          latency: result.processing_time_ms || 0,
-          peopleCount: result.safety_check?.people_count || 0,
-          violationCount: result.safety_check?.violation_count || 0,
-          complianceRate: result.safety_check?.compliance_rate || 100
-        });
-        
-        if (result.safety_check?.has_violations) {
-          result.safety_check.violations?.forEach(v => {
-            addAlert({
-              id: Date.now() + Math.random(),
-              type: 'danger',
-              title: v,
-              cameraId: camera.id,
-              timestamp: Date.now()
-            });
-          });
-        }
+        handleResult(await response.json());
       }
     } catch (e) {}
-  }, [confidenceThreshold, camera.id, updateMetrics, addAlert]);
+  }, [confidenceThreshold, camera.id, captureFrame, handleResult]);
   
   useEffect(() => {
     const video = videoRef.current;
@@ -143,12 +155,49 @@ function CameraFeed({ camera }) {
   }, [camera]);
   
   useEffect(() => {
-    if (!isPlaying) return;
+    if (!isPlaying || streamMode !== 'socket') return;
+    
+    const socket = new WebSocket(`${AI_WS_URL}/ws/${encodeURIComponent(camera.id)}`);
+    let timer;
+    let closed = false;
+    
+    const sendFrame = async () => {
+      const blob = await captureFrame();
+      if (closed || socket.readyState !== WebSocket.OPEN) return;
+      if (blob) {
+        socket.send(blob);
+      } else {
+        timer = setTimeout(sendFrame, FRAME_INTERVAL_MS);
+      }
+    };
+    
+    socket.onopen = () => sendFrame();
+    socket.onmessage = (event) => {
+      const message = JSON.parse(event.data);
+      if (message.type === 'result') {
+        handleResult(message);
+      }
+      clearTimeout(timer);
+      timer = setTimeout(sendFrame, FRAME_INTERVAL_MS);
+    };
+    socket.onerror = () => {
+      if (!closed) setStreamMode('polling');
+    };
+    
+    return () => {
+      closed = true;
+      clearTimeout(timer);
+      socket.close();
+    };
+  }, [isPlaying, streamMode, camera.id, captureFrame, handleResult]);
+  
+  useEffect(() => {
+    if (!isPlaying || streamMode !== 'polling') return;
     
     const interval = setInterval(detectFrame, 1500);
     
     return () => clearInterval(interval);
-  }, [isPlaying, detectFrame]);
+  }, [isPlaying, streamMode, detectFrame]);
   
   useEffect(() => {
     const video = videoRef.current;